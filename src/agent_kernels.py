@@ -0,0 +1,111 @@
+"""
+Numeric kernels for agent world simulation.
+Compiled with Numba when available; otherwise they run as plain Python.
+"""
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:
+    def njit(*args, **kwargs):
+        """Fallback decorator used when Numba is not installed."""
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+
+@njit(cache=True, fastmath=True)
+def detect_collisions(positions, radii, aabbs):
+    """
+    Find the first solid box each agent overlaps.
+    
+    Args:
+        positions: Agent centres, float64 array of shape (N, 3)
+        radii: Agent radii, float64 array of shape (N,)
+        aabbs: Solid boxes as (min_x, min_y, min_z, max_x, max_y, max_z), shape (M, 6)
+    
+    Returns:
+        int64 array of shape (N,) with the colliding box index, or -1
+    """
+    n = positions.shape[0]
+    hits = np.full(n, -1, dtype=np.int64)
+    for i in range(n):
+        r2 = radii[i] * radii[i]
+        for j in range(aabbs.shape[0]):
+            # Squared distance from the sphere centre to the closest point on the box
+            d2 = 0.0
+            for k in range(3):
+                p = positions[i, k]
+                if p < aabbs[j, k]:
+                    d2 += (aabbs[j, k] - p) ** 2
+                elif p > aabbs[j, k + 3]:
+                    d2 += (p - aabbs[j, k + 3]) ** 2
+            if d2 < r2:
+                hits[i] = j
+                break
+    return hits
+
+
+@njit(cache=True, fastmath=True)
+def check_boundary(positions, bounds):
+    """
+    Flag agents that are outside the scene bounds.
+    
+    Args:
+        positions: Agent centres, float64 array of shape (N, 3)
+        bounds: Scene extent as (min_x, min_y, min_z, max_x, max_y, max_z)
+    
+    Returns:
+        Boolean array of shape (N,), True where the agent is out of bounds
+    """
+    n = positions.shape[0]
+    outside = np.zeros(n, dtype=np.bool_)
+    for i in range(n):
+        for k in range(3):
+            if positions[i, k] < bounds[k] or positions[i, k] > bounds[k + 3]:
+                outside[i] = True
+                break
+    return outside
+
+
+@njit(cache=True, fastmath=True)
+def physics_step(pos, vel, dt):
+    """
+    Advance agent positions in place by one explicit Euler step.
+    
+    Args:
+        pos: Agent positions, float64 array of shape (N, 3), updated in place
+        vel: Agent velocities, float64 array of shape (N, 3)
+        dt: Timestep in seconds
+    """
+    for i in range(pos.shape[0]):
+        for k in range(3):
+            pos[i, k] += vel[i, k] * dt
+
+
+# No fastmath here: it lets LLVM assume values are finite, defeating the check
+@njit(cache=True)
+def check_stability(pos, vel, max_speed):
+    """
+    Flag agents whose state has diverged (non-finite or runaway velocity).
+    
+    Args:
+        pos: Agent positions, float64 array of shape (N, 3)
+        vel: Agent velocities, float64 array of shape (N, 3)
+        max_speed: Largest plausible speed in units per second
+    
+    Returns:
+        Boolean array of shape (N,), True where the agent is unstable
+    """
+    n = pos.shape[0]
+    unstable = np.zeros(n, dtype=np.bool_)
+    limit = max_speed * max_speed
+    for i in range(n):
+        speed2 = 0.0
+        for k in range(3):
+            if not np.isfinite(pos[i, k]):
+                unstable[i] = True
+            speed2 += vel[i, k] * vel[i, k]
+        if not speed2 <= limit:
+            unstable[i] = True
+    return unstable
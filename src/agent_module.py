@@ -2,20 +2,309 @@
 Agent-based world testing module.
 Simulates agents exploring 3D worlds to detect physics violations and issues.
 """
+import copy
+import functools
+import hashlib
+import io
+import mmap
+import os
+import sys
+import threading
 import time
-import random
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Final
+
+import numpy as np
 
 from .config import Config
 from .utils.logger import setup_logger
 
 logger = setup_logger(__name__)
 
+# Sentinel meaning "use the agent pooled with the world being tested"
+_NEW_AGENT = object()
+
+# Scenario handlers running at once across all requests, including timed-out
+# ones still finishing in the background
+_scenario_slots = threading.BoundedSemaphore(max(1, Config.WORKER_THREADS))
+
+
+class AgentTrajectory:
+    """
+    Agent positions over time stored as parallel float32 arrays (structure of arrays).
+    
+    Samples are appended in bulk from the simulation kernels; dictionaries are only
+    built when the trajectory is converted to violations for the API response.
+    """
+    
+    __slots__ = ('px', 'py', 'pz', 't', 'n')
+    
+    def __init__(self, capacity: int = 64):
+        """
+        Initialize an empty trajectory.
+        
+        Args:
+            capacity: Number of samples to preallocate
+        """
+        capacity = max(1, capacity)
+        self.px = np.empty(capacity, dtype=np.float32)
+        self.py = np.empty(capacity, dtype=np.float32)
+        self.pz = np.empty(capacity, dtype=np.float32)
+        self.t = np.empty(capacity, dtype=np.float32)
+        self.n = 0
+    
+    def __len__(self) -> int:
+        return self.n
+    
+    def extend(self, positions, timestamp: float):
+        """
+        Append a batch of samples taken at the same time.
+        
+        Args:
+            positions: Array of shape (K, 3) with x, y, z per sample
+            timestamp: Simulation time of the samples in seconds
+        """
+        count = len(positions)
+        if count == 0:
+            return
+        
+        end = self.n + count
+        if end > len(self.t):
+            self._grow(end)
+        
+        self.px[self.n:end] = positions[:, 0]
+        self.py[self.n:end] = positions[:, 1]
+        self.pz[self.n:end] = positions[:, 2]
+        self.t[self.n:end] = timestamp
+        self.n = end
+    
+    def _grow(self, min_capacity: int):
+        """Reallocate the arrays with at least min_capacity slots."""
+        capacity = max(min_capacity, 2 * len(self.t))
+        for name in ('px', 'py', 'pz', 't'):
+            grown = np.empty(capacity, dtype=np.float32)
+            grown[:self.n] = getattr(self, name)[:self.n]
+            setattr(self, name, grown)
+    
+    def to_violations(self, violation_type: str, description: str, severity: str) -> List[Dict]:
+        """
+        Materialize each sample as a violation dictionary.
+        
+        Args:
+            violation_type: Violation type name (e.g., 'PhysicsViolation')
+            description: Human-readable description
+            severity: 'low', 'medium' or 'high'
+        
+        Returns:
+            List of violation dictionaries
+        """
+        n = self.n
+        return [
+            {
+                'type': violation_type,
+                'description': description,
+                'severity': severity,
+                'location': {'x': x, 'y': y, 'z': z},
+                'timestamp': round(t, 3)
+            }
+            for x, y, z, t in zip(
+                self.px[:n].tolist(), self.py[:n].tolist(), self.pz[:n].tolist(), self.t[:n].tolist()
+            )
+        ]
+
+
+# Record layout of the .splat format: position, scale, RGBA, quantized rotation
+SPLAT_DTYPE = np.dtype([
+    ('position', '<f4', (3,)),
+    ('scale', '<f4', (3,)),
+    ('color', 'u1', (4,)),
+    ('rotation', 'u1', (4,)),
+])
+
+# PLY property types mapped to NumPy dtype codes
+PLY_TYPES = {
+    'char': 'i1', 'int8': 'i1', 'uchar': 'u1', 'uint8': 'u1',
+    'short': 'i2', 'int16': 'i2', 'ushort': 'u2', 'uint16': 'u2',
+    'int': 'i4', 'int32': 'i4', 'uint': 'u4', 'uint32': 'u4',
+    'float': 'f4', 'float32': 'f4', 'double': 'f8', 'float64': 'f8',
+}
+
+
+def _read_splat_points(mm) -> np.ndarray:
+    """Return splat positions as a zero-copy (N, 3) view over the mapped file."""
+    if len(mm) % SPLAT_DTYPE.itemsize:
+        raise ValueError("Splat file size is not a multiple of the record size")
+    return np.frombuffer(mm, dtype=SPLAT_DTYPE)['position']
+
+
+def _read_ply_points(mm) -> np.ndarray:
+    """Return vertex positions of a PLY file as an (N, 3) array."""
+    header_end = mm.find(b'end_header')
+    if mm[:3] != b'ply' or header_end < 0:
+        raise ValueError("Not a PLY file")
+    data_offset = mm.find(b'\n', header_end) + 1
+    
+    fmt = None
+    num_vertices = 0
+    properties = []
+    in_vertex = False
+    for line in mm[:header_end].decode('ascii').splitlines():
+        parts = line.split()
+        if not parts:
+            continue
+        if parts[0] == 'format':
+            fmt = parts[1]
+        elif parts[0] == 'element':
+            in_vertex = parts[1] == 'vertex'
+            if in_vertex:
+                num_vertices = int(parts[2])
+            elif not properties:
+                raise ValueError("PLY vertex element must come first")
+        elif parts[0] == 'property' and in_vertex:
+            if parts[1] == 'list':
+                raise ValueError("PLY vertex list properties are not supported")
+            properties.append((parts[2], PLY_TYPES[parts[1]]))
+    
+    names = [name for name, _ in properties]
+    
+    if fmt == 'ascii':
+        columns = [names.index(axis) for axis in ('x', 'y', 'z')]
+        return np.loadtxt(
+            io.BytesIO(mm[data_offset:]), usecols=columns, max_rows=num_vertices, ndmin=2
+        )
+    
+    byte_order = {'binary_little_endian': '<', 'binary_big_endian': '>'}.get(fmt)
+    if byte_order is None:
+        raise ValueError(f"Unsupported PLY format: {fmt}")
+    
+    vertex_dtype = np.dtype([(name, byte_order + code) for name, code in properties])
+    vertices = np.frombuffer(mm, dtype=vertex_dtype, count=num_vertices, offset=data_offset)
+    return np.column_stack((vertices['x'], vertices['y'], vertices['z']))
+
+
+class AgentWorld:
+    """
+    A 3D world loaded for agent simulation.
+    
+    Solid geometry is approximated by the occupied cells of a voxel grid over the
+    asset's points; the lowest occupied layer is treated as walkable ground.
+    """
+    
+    __slots__ = ('points', 'bounds', 'aabbs', '_mmap')
+    
+    def __init__(self, points: np.ndarray, voxel_size: float, mm=None):
+        """
+        Initialize the world from its point cloud.
+        
+        Args:
+            points: Array of shape (N, 3) with point positions
+            voxel_size: Edge length of the solid voxels
+            mm: Memory map backing the points, closed by close()
+        """
+        self.points = points
+        self._mmap = mm
+        self.bounds = np.concatenate((points.min(axis=0), points.max(axis=0))).astype(np.float64)
+        
+        cells = np.unique(np.floor(points / voxel_size).astype(np.int64), axis=0)
+        cells = cells[cells[:, 1] > cells[:, 1].min()]
+        self.aabbs = np.hstack((cells, cells + 1)).astype(np.float64) * voxel_size
+    
+    def close(self):
+        """Release the memory map backing the points."""
+        self.points = None
+        if self._mmap is not None:
+            try:
+                self._mmap.close()
+            except BufferError:
+                # A caller still holds a view; the map is freed with it
+                pass
+            self._mmap = None
+
 
 class AgentModule:
     """Simulates agents testing 3D worlds for physics and coherence issues."""
     
+    __slots__ = (
+        'use_mock',
+        'model_path',
+        'simulation_duration',
+        '_cache',
+        '_cache_lock',
+        '_world_pool',
+        '_pool_lock',
+    )
+    
+    # Scenarios run when the caller does not choose any
+    _DEFAULT_SCENARIOS: Final = tuple(sys.intern(scenario) for scenario in (
+        'collision_detection',
+        'path_traversal',
+        'physics_stability',
+        'boundary_integrity',
+        'object_persistence',
+    ))
+    
+    # Simulation parameters for the real scenario kernels
+    NUM_AGENTS = 16
+    AGENT_RADIUS = 0.3
+    MAX_AGENT_SPEED = 1.5
+    UNSTABLE_SPEED = 10.0
+    SIMULATION_TIMESTEP = 0.1
+    
+    # Size of the voxels used as solid collision boxes
+    VOXEL_SIZE = 0.5
+    
+    # Assets smaller than this are hashed with a single read
+    SMALL_ASSET_BYTES = 4096
+    
+    # Assets larger than this get a sequential-read hint for the pager
+    LARGE_ASSET_BYTES = 1 << 30
+    
+    # Maximum number of test results kept in the in-memory cache
+    RESULT_CACHE_SIZE = 128
+    
+    # Maximum number of loaded worlds (and their agents) kept for reuse
+    WORLD_POOL_SIZE = 4
+    
+    # Candidate mock violations: (type, description, severity)
+    MOCK_VIOLATIONS = (
+        ('PhysicsViolation', 'Agent path collided with an object that should be solid.', 'high'),
+        ('BoundaryViolation', 'Agent was able to exit the expected scene boundaries.', 'medium'),
+        ('ObjectPersistence', 'Object appearance changed unexpectedly during traversal.', 'medium'),
+        ('DepthInconsistency', 'Depth mapping inconsistent with expected scene geometry.', 'low'),
+    )
+    # Sampling ranges per mock violation as (x, y, z, timestamp); the timestamp
+    # upper bound is replaced by the simulation duration at call time
+    MOCK_VIOLATION_LOW = np.array([
+        [-5.0, 0.0, -5.0, 1.0],
+        [-10.0, 0.0, -10.0, 1.0],
+        [-5.0, 0.0, -5.0, 1.0],
+        [-5.0, 0.0, -5.0, 1.0],
+    ])
+    MOCK_VIOLATION_HIGH = np.array([
+        [5.0, 0.0, 5.0, 1.0],
+        [10.0, 0.0, 10.0, 1.0],
+        [5.0, 2.0, 5.0, 1.0],
+        [5.0, 2.0, 5.0, 1.0],
+    ])
+    # Mock metric ranges: collision_rate, path_completion, physics_score, stability_score
+    MOCK_METRICS_LOW = np.array([0.0, 0.70, 0.75, 0.80])
+    MOCK_METRICS_HIGH = np.array([0.15, 1.0, 0.95, 0.98])
+    
+    # Violation reported by each kernel-backed scenario: (type, description, severity)
+    SCENARIO_VIOLATIONS = {
+        'collision_detection': (
+            'PhysicsViolation', 'Agent path collided with an object that should be solid.', 'high'
+        ),
+        'physics_stability': (
+            'PhysicsViolation', 'Agent state diverged during physics simulation.', 'high'
+        ),
+        'boundary_integrity': (
+            'BoundaryViolation', 'Agent was able to exit the expected scene boundaries.', 'medium'
+        ),
+    }
+    
     def __init__(self, use_mock: bool = None):
         """
         Initialize the agent module.
@@ -27,7 +316,15 @@ class AgentModule:
         self.model_path = Config.AGENT_MODEL_PATH
         self.simulation_duration = Config.AGENT_SIMULATION_DURATION
         
-        logger.info(f"AgentModule initialized in {'MOCK' if self.use_mock else 'PRODUCTION'} mode")
+        # LRU cache of test results: key -> (created_at, results)
+        self._cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+        
+        # LRU pool of loaded worlds: (asset digest, model path) -> (world, agent)
+        self._world_pool = OrderedDict()
+        self._pool_lock = threading.Lock()
+        
+        logger.info("AgentModule initialized in %s mode", 'MOCK' if self.use_mock else 'PRODUCTION')
     
     def test_world(
         self,
@@ -44,28 +341,149 @@ class AgentModule:
         Returns:
             Dictionary with test results including violations found
         """
-        if not asset_path.exists():
+        try:
+            st = asset_path.stat()
+        except FileNotFoundError:
             raise FileNotFoundError(f"Asset file not found: {asset_path}")
         
-        logger.info(f"Starting agent world test: {asset_path}")
+        logger.info("Starting agent world test: %s", asset_path)
         
         if test_scenarios is None:
-            test_scenarios = [
-                'collision_detection',
-                'path_traversal',
-                'physics_stability',
-                'boundary_integrity',
-                'object_persistence'
-            ]
+            test_scenarios = self._DEFAULT_SCENARIOS
+        
+        results = self._run_tests(asset_path, test_scenarios, st=st)
+        
+        logger.info("Agent testing complete: %d violations found", len(results['violations']))
+        return results
+    
+    def test_worlds(
+        self,
+        asset_paths: List[Path],
+        test_scenarios: List[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Run agent tests on several 3D world assets.
+        
+        The agent is initialized once and shared by all assets, instead of once
+        per test_world call.
+        
+        Args:
+            asset_paths: Paths to 3D asset files
+            test_scenarios: List of test scenarios to run (default: all)
+        
+        Returns:
+            List of test results, in the same order as asset_paths
+        """
+        stats = []
+        for asset_path in asset_paths:
+            try:
+                stats.append(asset_path.stat())
+            except FileNotFoundError:
+                raise FileNotFoundError(f"Asset file not found: {asset_path}")
+        
+        logger.info("Starting agent world tests for %d assets", len(asset_paths))
+        
+        if test_scenarios is None:
+            test_scenarios = self._DEFAULT_SCENARIOS
+        
+        agent = _NEW_AGENT if self.use_mock else self._initialize_agent()
+        batch_results = [
+            self._run_tests(asset_path, test_scenarios, agent, st)
+            for asset_path, st in zip(asset_paths, stats)
+        ]
+        
+        total_violations = sum(len(results['violations']) for results in batch_results)
+        logger.info(
+            "Agent testing complete: %d violations found across %d assets",
+            total_violations, len(asset_paths)
+        )
+        return batch_results
+    
+    def _run_tests(
+        self,
+        asset_path: Path,
+        test_scenarios: List[str],
+        agent=_NEW_AGENT,
+        st: os.stat_result = None
+    ) -> Dict[str, Any]:
+        """
+        Test one asset, serving repeated assets from the result cache.
+        
+        Args:
+            asset_path: Path to 3D asset
+            test_scenarios: List of scenarios to test
+            agent: Already initialized agent to reuse (real mode only; default: initialize one)
+            st: Stat result the caller already took for asset_path (default: stat again)
+        
+        Returns:
+            Test results
+        """
+        digest = None
+        cache_key = None
+        # Mock results are cheap and seeded by the asset path, so they are not
+        # worth hashing the asset for (and must not be shared between paths)
+        if Config.ENABLE_CACHING and not self.use_mock:
+            digest = self._asset_digest(asset_path, st)
+            cache_key = (
+                digest,
+                tuple(sorted(test_scenarios)),
+                self.model_path,
+                self.use_mock
+            )
+            cached = self._get_cached_result(cache_key)
+            if cached is not None:
+                logger.info("Returning cached agent test results for %s", asset_path)
+                return {**copy.deepcopy(cached), 'asset_path': os.fspath(asset_path), 'test_scenarios': test_scenarios}
         
         if self.use_mock:
             results = self._test_world_mock(asset_path, test_scenarios)
         else:
-            results = self._test_world_real(asset_path, test_scenarios)
+            results = self._test_world_real(asset_path, test_scenarios, agent, digest)
+        
+        if cache_key is not None:
+            # Keep a private copy, so callers editing their results cannot change later hits
+            self._store_cached_result(cache_key, copy.deepcopy(results))
         
-        logger.info(f"Agent testing complete: {len(results['violations'])} violations found")
         return results
     
+    @classmethod
+    def _asset_digest(cls, asset_path: Path, st: os.stat_result = None) -> str:
+        """
+        Return a BLAKE2b digest of the asset file contents.
+        
+        Large files are streamed through hashlib.file_digest in fixed-size chunks,
+        so hashing never holds the whole asset in memory. If the caller already
+        has a stat result for the file it is used instead of statting again.
+        """
+        with asset_path.open('rb', buffering=0) as f:
+            size = st.st_size if st is not None else os.fstat(f.fileno()).st_size
+            if size < cls.SMALL_ASSET_BYTES:
+                return hashlib.blake2b(f.read()).hexdigest()
+            return hashlib.file_digest(f, 'blake2b').hexdigest()
+    
+    def _get_cached_result(self, key: tuple):
+        """Return cached results for key, or None if missing or older than CACHE_TTL_SECONDS."""
+        with self._cache_lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                return None
+            
+            created_at, results = entry
+            if time.monotonic() - created_at >= Config.CACHE_TTL_SECONDS:
+                del self._cache[key]
+                return None
+            
+            self._cache.move_to_end(key)
+            return results
+    
+    def _store_cached_result(self, key: tuple, results: Dict[str, Any]):
+        """Store results under key, evicting the least recently used entries."""
+        with self._cache_lock:
+            self._cache[key] = (time.monotonic(), results)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.RESULT_CACHE_SIZE:
+                self._cache.popitem(last=False)
+    
     def _test_world_mock(
         self,
         asset_path: Path,
@@ -82,64 +500,52 @@ class AgentModule:
             Mock test results
         """
         # Simulate processing time
-        logger.info(f"Simulating agent test (duration: {self.simulation_duration}s)")
-        time.sleep(min(2.0, self.simulation_duration / 10))  # Shortened for mock
+        if Config.MOCK_SIMULATE_LATENCY:
+            logger.info("Simulating agent test (duration: %ss)", self.simulation_duration)
+            time.sleep(min(2.0, self.simulation_duration / 10))  # Shortened for mock
         
         # Generate deterministic but varied violations based on file path
-        seed = hash(str(asset_path)) % 100
-        random.seed(seed)
+        # (BLAKE2b rather than hash(), which is salted per process)
+        asset_str = os.fspath(asset_path)
+        digest = hashlib.blake2b(asset_str.encode('utf-8'), digest_size=8).digest()
+        rng = np.random.default_rng(int.from_bytes(digest, 'little'))
         
         # Randomly decide how many violations (0-3)
-        num_violations = random.randint(0, 3)
+        num_violations = int(rng.integers(0, 4))
         
-        violations = []
-        violation_types = [
-            {
-                'type': 'PhysicsViolation',
-                'description': 'Agent path collided with an object that should be solid.',
-                'severity': 'high',
-                'location': {'x': random.uniform(-5, 5), 'y': 0, 'z': random.uniform(-5, 5)},
-                'timestamp': random.uniform(1, self.simulation_duration)
-            },
-            {
-                'type': 'BoundaryViolation',
-                'description': 'Agent was able to exit the expected scene boundaries.',
-                'severity': 'medium',
-                'location': {'x': random.uniform(-10, 10), 'y': 0, 'z': random.uniform(-10, 10)},
-                'timestamp': random.uniform(1, self.simulation_duration)
-            },
-            {
-                'type': 'ObjectPersistence',
-                'description': 'Object appearance changed unexpectedly during traversal.',
-                'severity': 'medium',
-                'location': {'x': random.uniform(-5, 5), 'y': random.uniform(0, 2), 'z': random.uniform(-5, 5)},
-                'timestamp': random.uniform(1, self.simulation_duration)
-            },
-            {
-                'type': 'DepthInconsistency',
-                'description': 'Depth mapping inconsistent with expected scene geometry.',
-                'severity': 'low',
-                'location': {'x': random.uniform(-5, 5), 'y': random.uniform(0, 2), 'z': random.uniform(-5, 5)},
-                'timestamp': random.uniform(1, self.simulation_duration)
-            }
-        ]
+        # Draw x, y, z, timestamp for every candidate violation in one call
+        low = self.MOCK_VIOLATION_LOW.copy()
+        high = self.MOCK_VIOLATION_HIGH.copy()
+        high[:, 3] = self.simulation_duration
+        samples = rng.uniform(low, high).tolist()
         
         # Select random violations
-        violations = random.sample(violation_types, min(num_violations, len(violation_types)))
-        
-        # Reset random seed
-        random.seed()
+        chosen = rng.choice(len(self.MOCK_VIOLATIONS), size=num_violations, replace=False)
+        violations = []
+        for i in chosen.tolist():
+            violation_type, description, severity = self.MOCK_VIOLATIONS[i]
+            x, y, z, timestamp = samples[i]
+            violations.append({
+                'type': violation_type,
+                'description': description,
+                'severity': severity,
+                'location': {'x': x, 'y': y, 'z': z},
+                'timestamp': timestamp
+            })
         
         # Compute metrics
+        collision_rate, path_completion, physics_score, stability_score = rng.uniform(
+            self.MOCK_METRICS_LOW, self.MOCK_METRICS_HIGH
+        ).tolist()
         metrics = {
-            'collision_rate': random.uniform(0.0, 0.15) if num_violations > 0 else 0.0,
-            'path_completion': random.uniform(0.70, 1.0),
-            'physics_score': random.uniform(0.75, 0.95),
-            'stability_score': random.uniform(0.80, 0.98)
+            'collision_rate': collision_rate if num_violations > 0 else 0.0,
+            'path_completion': path_completion,
+            'physics_score': physics_score,
+            'stability_score': stability_score
         }
         
         return {
-            'asset_path': str(asset_path),
+            'asset_path': asset_str,
             'test_scenarios': test_scenarios,
             'violations': violations,
             'metrics': metrics,
@@ -150,7 +556,9 @@ class AgentModule:
     def _test_world_real(
         self,
         asset_path: Path,
-        test_scenarios: List[str]
+        test_scenarios: List[str],
+        agent=_NEW_AGENT,
+        digest: str = None
     ) -> Dict[str, Any]:
         """
         Run real agent tests using VLA model.
@@ -158,30 +566,26 @@ class AgentModule:
         Args:
             asset_path: Path to 3D asset
             test_scenarios: List of scenarios to test
+            agent: Already initialized agent to reuse (default: the pooled agent)
+            digest: Precomputed asset digest (default: hash the file)
         
         Returns:
             Real test results
         """
         try:
-            # Load the 3D world
-            world = self._load_world(asset_path)
-            
-            # Initialize agent
-            agent = self._initialize_agent()
+            # Load the 3D world and initialize the agent, or reuse pooled ones
+            world, pooled_agent = self._acquire_world(asset_path, digest, agent)
+            if agent is _NEW_AGENT:
+                agent = pooled_agent
             
-            violations = []
-            
-            # Run each test scenario
-            for scenario in test_scenarios:
-                logger.info(f"Running scenario: {scenario}")
-                scenario_violations = self._run_scenario(world, agent, scenario)
-                violations.extend(scenario_violations)
+            # Scenarios are independent, so run them concurrently
+            violations = self._run_scenarios(world, agent, test_scenarios)
             
             # Compute metrics
             metrics = self._compute_agent_metrics(world, agent, violations)
             
             return {
-                'asset_path': str(asset_path),
+                'asset_path': os.fspath(asset_path),
                 'test_scenarios': test_scenarios,
                 'violations': violations,
                 'metrics': metrics,
@@ -190,15 +594,87 @@ class AgentModule:
             }
         
         except Exception as e:
-            logger.error(f"Real agent testing failed: {e}")
+            logger.error("Real agent testing failed: %s", e)
             logger.warning("Falling back to mock testing")
             return self._test_world_mock(asset_path, test_scenarios)
     
-    def _load_world(self, asset_path: Path):
-        """Load 3D world from asset file."""
-        # Implementation would depend on asset format (splat, ply, glb)
-        # Would use appropriate 3D engine (e.g., PyBullet, MuJoCo, Unity via API)
-        pass
+    def _acquire_world(self, asset_path: Path, digest: str = None, agent=_NEW_AGENT):
+        """
+        Return a loaded world and initialized agent for an asset.
+        
+        Pairs are kept in a small LRU pool keyed on (asset digest, model path), so
+        re-testing the same asset skips loading the world and the model. Evicted
+        worlds are closed to release their memory maps.
+        
+        Args:
+            asset_path: Path to 3D asset
+            digest: Precomputed asset digest (default: hash the file)
+            agent: Agent to pool with a newly loaded world (default: initialize one)
+        
+        Returns:
+            Tuple of (world, agent)
+        """
+        key = (digest or self._asset_digest(asset_path), self.model_path)
+        with self._pool_lock:
+            entry = self._world_pool.get(key)
+            if entry is not None:
+                self._world_pool.move_to_end(key)
+                return entry
+        
+        world = self._load_world(asset_path)
+        if agent is _NEW_AGENT:
+            agent = self._initialize_agent()
+        
+        with self._pool_lock:
+            entry = self._world_pool.get(key)
+            if entry is not None:
+                # Another thread loaded the same asset first; keep its copy
+                world.close()
+                self._world_pool.move_to_end(key)
+                return entry
+            
+            self._world_pool[key] = (world, agent)
+            while len(self._world_pool) > self.WORLD_POOL_SIZE:
+                _, (evicted_world, _) = self._world_pool.popitem(last=False)
+                evicted_world.close()
+        
+        return world, agent
+    
+    def _load_world(self, asset_path: Path) -> 'AgentWorld':
+        """
+        Load 3D world from asset file.
+        
+        The file is memory-mapped read-only and points are parsed as NumPy views
+        over the mapping, so only the pages actually touched are read from disk.
+        
+        Args:
+            asset_path: Path to a .splat or .ply asset
+        
+        Returns:
+            AgentWorld with points, bounds and solid voxel boxes
+        """
+        with asset_path.open('rb') as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        
+        try:
+            if len(mm) > self.LARGE_ASSET_BYTES and hasattr(mmap, 'MADV_SEQUENTIAL'):
+                mm.madvise(mmap.MADV_SEQUENTIAL)
+            
+            suffix = asset_path.suffix.lower()
+            if suffix == '.splat':
+                points = _read_splat_points(mm)
+            elif suffix == '.ply':
+                points = _read_ply_points(mm)
+            else:
+                raise ValueError(f"Unsupported asset format: {suffix}")
+            
+            if len(points) == 0:
+                raise ValueError(f"Asset contains no points: {asset_path}")
+            
+            return AgentWorld(points, self.VOXEL_SIZE, mm)
+        except Exception:
+            mm.close()
+            raise
     
     def _initialize_agent(self):
         """Initialize the VLA agent with the model."""
@@ -206,27 +682,188 @@ class AgentModule:
         # Set up policy, observation space, action space
         pass
     
+    def _run_scenarios(self, world, agent, test_scenarios: List[str]) -> List[Dict]:
+        """
+        Run all scenarios concurrently, bounded by Config.WORKER_THREADS.
+        
+        A scenario that fails or is still running after Config.AGENT_SCENARIO_TIMEOUT
+        is logged and skipped so the remaining scenarios still report their
+        violations. Threads cannot be interrupted, so a hung scenario is left to
+        finish in the background rather than holding up the results; it keeps
+        its slot until then, so hung scenarios cannot pile up past the bound.
+        
+        Args:
+            world: Loaded 3D world
+            agent: Initialized agent
+            test_scenarios: List of scenarios to run
+        
+        Returns:
+            Combined list of violations from all scenarios
+        """
+        plan = self._scenario_plan(tuple(test_scenarios))
+        if not plan:
+            return []
+        
+        # A pool per run: shutting it down without waiting must not strand
+        # other callers' work behind a hung scenario
+        executor = ThreadPoolExecutor(max_workers=len(plan), thread_name_prefix='scenario')
+        deadline = time.monotonic() + Config.AGENT_SCENARIO_TIMEOUT
+        try:
+            futures = []
+            for scenario, handler in plan:
+                logger.info("Running scenario: %s", scenario)
+                futures.append(executor.submit(self._run_in_slot, handler, world, agent, deadline))
+            wait(futures, timeout=Config.AGENT_SCENARIO_TIMEOUT)
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+        
+        violations = []
+        for (scenario, _), future in zip(plan, futures):
+            if not future.done() or isinstance(future.exception(), TimeoutError):
+                logger.warning("Scenario %s timed out after %ss", scenario, Config.AGENT_SCENARIO_TIMEOUT)
+            elif future.exception() is not None:
+                logger.error("Scenario %s failed: %s", scenario, future.exception())
+            else:
+                violations.extend(future.result())
+        
+        return violations
+    
+    def _run_in_slot(self, handler, world, agent, deadline: float) -> List[Dict]:
+        """Run a scenario handler once a slot frees up, giving up at deadline."""
+        if not _scenario_slots.acquire(timeout=max(0.0, deadline - time.monotonic())):
+            raise TimeoutError("No free scenario slot before the deadline")
+        try:
+            return handler(self, world, agent)
+        finally:
+            _scenario_slots.release()
+    
+    @classmethod
+    @functools.lru_cache(maxsize=16)
+    def _scenario_plan(cls, scenarios: tuple) -> tuple:
+        """
+        Resolve a scenario list to its (scenario, handler) pairs.
+        
+        Callers use a handful of scenario combinations, so the resolved plan is
+        cached per combination; unknown scenarios are dropped here instead of
+        being dispatched to a worker thread on every run.
+        
+        Args:
+            scenarios: Tuple of scenario names
+        
+        Returns:
+            Tuple of (scenario, handler) pairs in the requested order
+        """
+        return tuple(
+            (scenario, cls._SCENARIO_HANDLERS[scenario])
+            for scenario in scenarios
+            if scenario in cls._SCENARIO_HANDLERS
+        )
+    
     def _run_scenario(self, world, agent, scenario: str) -> List[Dict]:
         """Run a specific test scenario and detect violations."""
-        violations = []
+        handler = self._SCENARIO_HANDLERS.get(scenario)
+        if handler is None:
+            return []
+        return handler(self, world, agent)
+    
+    def _scn_collision(self, world, agent) -> List[Dict]:
+        """Test for physics collisions."""
+        return self._simulate(world, agent, 'collision_detection')
+    
+    def _scn_path_traversal(self, world, agent) -> List[Dict]:
+        """Test navigation paths."""
+        return []
+    
+    def _scn_physics(self, world, agent) -> List[Dict]:
+        """Test physics simulation stability."""
+        return self._simulate(world, agent, 'physics_stability')
+    
+    def _scn_boundary(self, world, agent) -> List[Dict]:
+        """Test scene boundaries."""
+        return self._simulate(world, agent, 'boundary_integrity')
+    
+    def _scn_object_persistence(self, world, agent) -> List[Dict]:
+        """Test object consistency."""
+        return []
+    
+    # Scenario name -> handler, looked up once per scenario
+    _SCENARIO_HANDLERS = {
+        sys.intern('collision_detection'): _scn_collision,
+        sys.intern('path_traversal'): _scn_path_traversal,
+        sys.intern('physics_stability'): _scn_physics,
+        sys.intern('boundary_integrity'): _scn_boundary,
+        sys.intern('object_persistence'): _scn_object_persistence,
+    }
+    
+    def _spawn_agents(self, world):
+        """
+        Place agents inside the world as contiguous position/velocity/radius arrays.
         
-        if scenario == 'collision_detection':
-            # Test for physics collisions
-            pass
-        elif scenario == 'path_traversal':
-            # Test navigation paths
-            pass
-        elif scenario == 'physics_stability':
-            # Test physics simulation stability
-            pass
-        elif scenario == 'boundary_integrity':
-            # Test scene boundaries
-            pass
-        elif scenario == 'object_persistence':
-            # Test object consistency
-            pass
+        Args:
+            world: Loaded 3D world exposing ``bounds`` (min_x, min_y, min_z, max_x, max_y, max_z)
         
-        return violations
+        Returns:
+            Tuple of (positions, velocities, radii) NumPy arrays
+        """
+        rng = np.random.default_rng(0)
+        bounds = np.asarray(world.bounds, dtype=np.float64)
+        
+        positions = np.empty((self.NUM_AGENTS, 3), dtype=np.float64)
+        positions[:, 0] = rng.uniform(bounds[0], bounds[3], self.NUM_AGENTS)
+        positions[:, 1] = bounds[1] + self.AGENT_RADIUS
+        positions[:, 2] = rng.uniform(bounds[2], bounds[5], self.NUM_AGENTS)
+        
+        # Agents walk on the ground plane
+        velocities = np.zeros((self.NUM_AGENTS, 3), dtype=np.float64)
+        velocities[:, [0, 2]] = rng.uniform(-self.MAX_AGENT_SPEED, self.MAX_AGENT_SPEED, (self.NUM_AGENTS, 2))
+        
+        radii = np.full(self.NUM_AGENTS, self.AGENT_RADIUS, dtype=np.float64)
+        return positions, velocities, radii
+    
+    def _simulate(self, world, agent, scenario: str) -> List[Dict]:
+        """
+        Step agents through the world and record the first violation per agent.
+        
+        Args:
+            world: Loaded 3D world exposing ``bounds`` and ``aabbs`` (M, 6 solid boxes)
+            agent: Initialized agent
+            scenario: One of collision_detection, physics_stability, boundary_integrity
+        
+        Returns:
+            List of violation dictionaries
+        """
+        if world is None:
+            return []
+        
+        # Deferred so mock mode never pays the Numba import/compile cost
+        from . import agent_kernels
+        
+        positions, velocities, radii = self._spawn_agents(world)
+        aabbs = np.ascontiguousarray(world.aabbs, dtype=np.float64).reshape(-1, 6)
+        bounds = np.ascontiguousarray(world.bounds, dtype=np.float64)
+        
+        violation_type, description, severity = self.SCENARIO_VIOLATIONS[scenario]
+        reported = np.zeros(self.NUM_AGENTS, dtype=bool)
+        trajectory = AgentTrajectory(self.NUM_AGENTS)
+        
+        num_steps = int(self.simulation_duration / self.SIMULATION_TIMESTEP)
+        for step in range(1, num_steps + 1):
+            agent_kernels.physics_step(positions, velocities, self.SIMULATION_TIMESTEP)
+            
+            if scenario == 'collision_detection':
+                flagged = agent_kernels.detect_collisions(positions, radii, aabbs) >= 0
+            elif scenario == 'boundary_integrity':
+                flagged = agent_kernels.check_boundary(positions, bounds)
+            else:
+                flagged = agent_kernels.check_stability(positions, velocities, self.UNSTABLE_SPEED)
+            
+            trajectory.extend(positions[flagged & ~reported], step * self.SIMULATION_TIMESTEP)
+            reported |= flagged
+            
+            if reported.all():
+                break
+        
+        return trajectory.to_violations(violation_type, description, severity)
     
     def _compute_agent_metrics(self, world, agent, violations) -> Dict[str, float]:
         """Compute performance metrics from agent run."""
@@ -257,7 +894,7 @@ class AgentModule:
             output_path.parent.mkdir(parents=True, exist_ok=True)
             output_path.touch()
             output_path.write_text("Mock agent path visualization")
-            logger.info(f"Created mock visualization: {output_path}")
+            logger.info("Created mock visualization: %s", output_path)
         else:
             # Generate real visualization
             pass
@@ -281,3 +918,9 @@ def test_world(asset_path: Path, test_scenarios: List[str] = None) -> Dict[str,
     module = get_agent_module()
     return module.test_world(asset_path, test_scenarios)
 
+
+def test_worlds(asset_paths: List[Path], test_scenarios: List[str] = None) -> List[Dict[str, Any]]:
+    """Convenience function to test several worlds."""
+    module = get_agent_module()
+    return module.test_worlds(asset_paths, test_scenarios)
+
@@ -2,105 +2,243 @@
 Configuration management for the Sora Director application.
 Loads settings from environment variables with sensible defaults.
 """
+import functools
 import os
+from dataclasses import dataclass
 from pathlib import Path
-from dotenv import load_dotenv
+
+
+def _load_env(path: Path = Path(__file__).parent.parent / '.env'):
+    """
+    Load KEY=value pairs from a .env file into os.environ.
+    
+    Variables already set in the environment win over the file. Blank lines,
+    '#' comments (including trailing ones on unquoted values), an optional
+    'export ' prefix and single- or double-quoted values are supported.
+    """
+    if not path.is_file():
+        return
+    
+    for line in path.read_text().splitlines():
+        line = line.strip()
+        if not line or line.startswith('#') or '=' not in line:
+            continue
+        if line.startswith('export '):
+            line = line[len('export '):]
+        
+        key, value = line.split('=', 1)
+        value = value.strip()
+        closing = value.find(value[0], 1) if value[:1] in ('"', "'") else -1
+        if closing > 0:
+            value = value[1:closing]
+        else:
+            value = value.split(' #', 1)[0].rstrip()
+        
+        os.environ.setdefault(key.strip(), value)
+
 
 # Load environment variables from .env file
-load_dotenv()
+_load_env()
+
+
+def _env_bool(name: str, default: str) -> bool:
+    """Read a 'true'/'false' environment variable."""
+    return os.getenv(name, default).lower() == 'true'
 
-class Config:
-    """Application configuration with environment variable overrides."""
+
+@dataclass(frozen=True, slots=True)
+class _ConfigData:
+    """
+    Application configuration with environment variable overrides.
+    
+    Built once by from_env() and exposed as the module-level Config instance;
+    attributes are read-only.
+    """
     
     # Flask Configuration
-    FLASK_ENV = os.getenv('FLASK_ENV', 'development')
-    FLASK_DEBUG = os.getenv('FLASK_DEBUG', 'True').lower() == 'true'
-    PORT = int(os.getenv('PORT', 5001))
-    HOST = os.getenv('HOST', '0.0.0.0')
-    SECRET_KEY = os.getenv('SECRET_KEY', 'dev-secret-key-change-in-production')
+    FLASK_ENV: str
+    FLASK_DEBUG: bool
+    PORT: int
+    HOST: str
+    SECRET_KEY: str
     
     # Mode Configuration
-    USE_MOCK = os.getenv('USE_MOCK', 'true').lower() == 'true'
+    USE_MOCK: bool
+    # Sleep in mock mode to imitate real processing time (off by default)
+    MOCK_SIMULATE_LATENCY: bool
     
     # API Configuration
-    # Check both SORA_API_KEY and OPENAI_API_KEY (OpenAI key works for Sora)
-    SORA_API_KEY = os.getenv('SORA_API_KEY') or os.getenv('OPENAI_API_KEY', '')
-    SORA_API_URL = os.getenv('SORA_API_URL', 'https://api.openai.com/v1/sora')
+    SORA_API_KEY: str
+    SORA_API_URL: str
+    # Signing secret of an OpenAI webhook for video events; when set, /api/webhooks/sora
+    # wakes pollers as soon as a Sora job finishes
+    SORA_WEBHOOK_SECRET: str
     
     # 3D Reconstruction Service
-    RECONSTRUCTION_SERVICE_URL = os.getenv('RECONSTRUCTION_SERVICE_URL', 'http://localhost:8001')
-    RECONSTRUCTION_TIMEOUT = int(os.getenv('RECONSTRUCTION_TIMEOUT', 300))
+    RECONSTRUCTION_SERVICE_URL: str
+    RECONSTRUCTION_TIMEOUT: int
     
     # Agent Configuration
-    AGENT_MODEL_PATH = os.getenv('AGENT_MODEL_PATH', 'models/agent_vla.pth')
-    AGENT_SIMULATION_DURATION = int(os.getenv('AGENT_SIMULATION_DURATION', 30))
+    AGENT_MODEL_PATH: str
+    AGENT_SIMULATION_DURATION: int
+    AGENT_SCENARIO_TIMEOUT: int
     
     # Data Storage
-    BASE_DIR = Path(__file__).parent.parent
-    DATA_ROOT = Path(os.getenv('DATA_ROOT', str(BASE_DIR / 'data')))
-    GENERATIONS_DIR = Path(os.getenv('GENERATIONS_DIR', str(DATA_ROOT / 'generations')))
-    RECONSTRUCTIONS_DIR = Path(os.getenv('RECONSTRUCTIONS_DIR', str(DATA_ROOT / 'reconstructions')))
+    BASE_DIR: Path
+    DATA_ROOT: Path
+    GENERATIONS_DIR: Path
+    RECONSTRUCTIONS_DIR: Path
     
     # Video Generation Settings
-    NUM_TAKES_PER_GENERATION = int(os.getenv('NUM_TAKES_PER_GENERATION', 3))
-    # Sora API only supports 4, 8, or 12 seconds
-    VIDEO_DURATION_SECONDS = int(os.getenv('VIDEO_DURATION_SECONDS', 8))
-    # Sora API only supports: '720x1280', '1280x720', '1024x1792', '1792x1024'
-    VIDEO_RESOLUTION = os.getenv('VIDEO_RESOLUTION', '1280x720')
-    VIDEO_FPS = int(os.getenv('VIDEO_FPS', 24))
+    NUM_TAKES_PER_GENERATION: int
+    VIDEO_DURATION_SECONDS: int
+    VIDEO_RESOLUTION: str
+    VIDEO_FPS: int
     
     # Scoring Thresholds
-    MIN_IDENTITY_PERSISTENCE = float(os.getenv('MIN_IDENTITY_PERSISTENCE', 0.85))
-    MIN_PATH_REALISM = float(os.getenv('MIN_PATH_REALISM', 0.80))
-    MIN_PHYSICS_SCORE = float(os.getenv('MIN_PHYSICS_SCORE', 0.75))
+    MIN_IDENTITY_PERSISTENCE: float
+    MIN_PATH_REALISM: float
+    MIN_PHYSICS_SCORE: float
     
     # Logging
-    LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
-    LOG_FILE = os.getenv('LOG_FILE', 'logs/sora_director.log')
+    LOG_LEVEL: str
+    LOG_FILE: str
     
     # Security
-    MAX_UPLOAD_SIZE_MB = int(os.getenv('MAX_UPLOAD_SIZE_MB', 500))
+    MAX_UPLOAD_SIZE_MB: int
+    
+    # Let a fronting nginx send /data files (X-Accel-Redirect)
+    USE_XSENDFILE: bool
+    # How long browsers may reuse /data files before revalidating (0 = always revalidate;
+    # keep it low if prompts get regenerated, since takes are rewritten in place)
+    DATA_MAX_AGE_SECONDS: int
     
     # Performance
-    WORKER_THREADS = int(os.getenv('WORKER_THREADS', 4))
-    ENABLE_CACHING = os.getenv('ENABLE_CACHING', 'true').lower() == 'true'
-    CACHE_TTL_SECONDS = int(os.getenv('CACHE_TTL_SECONDS', 3600))
+    WORKER_THREADS: int
+    SCORER_WORKERS: int
+    # Load and warm the MiDaS depth model at startup instead of on the first request
+    PRELOAD_MODELS: bool
+    
+    # Progress Tracking (shared across workers when set)
+    REDIS_URL: str
+    ENABLE_CACHING: bool
+    CACHE_TTL_SECONDS: int
+    # Disk budget for cached generations and their videos (0 = unlimited)
+    CACHE_MAX_MB: int
+    # How many of the most recent cached prompts /api/cached_prompts lists
+    MAX_CACHED_PROMPTS: int
     
     @classmethod
-    def ensure_directories(cls):
+    def from_env(cls) -> '_ConfigData':
+        """Build the configuration from the current environment."""
+        base_dir = Path(__file__).parent.parent
+        data_root = Path(os.getenv('DATA_ROOT', str(base_dir / 'data')))
+        
+        return cls(
+            FLASK_ENV=os.getenv('FLASK_ENV', 'development'),
+            FLASK_DEBUG=_env_bool('FLASK_DEBUG', 'True'),
+            PORT=int(os.getenv('PORT', 5001)),
+            HOST=os.getenv('HOST', '0.0.0.0'),
+            SECRET_KEY=os.getenv('SECRET_KEY', 'dev-secret-key-change-in-production'),
+            
+            USE_MOCK=_env_bool('USE_MOCK', 'true'),
+            MOCK_SIMULATE_LATENCY=_env_bool('MOCK_SIMULATE_LATENCY', 'false'),
+            
+            # Check both SORA_API_KEY and OPENAI_API_KEY (OpenAI key works for Sora)
+            SORA_API_KEY=os.getenv('SORA_API_KEY') or os.getenv('OPENAI_API_KEY', ''),
+            SORA_API_URL=os.getenv('SORA_API_URL', 'https://api.openai.com/v1/sora'),
+            SORA_WEBHOOK_SECRET=os.getenv('SORA_WEBHOOK_SECRET', ''),
+            
+            RECONSTRUCTION_SERVICE_URL=os.getenv('RECONSTRUCTION_SERVICE_URL', 'http://localhost:8001'),
+            RECONSTRUCTION_TIMEOUT=int(os.getenv('RECONSTRUCTION_TIMEOUT', 300)),
+            
+            AGENT_MODEL_PATH=os.getenv('AGENT_MODEL_PATH', 'models/agent_vla.pth'),
+            AGENT_SIMULATION_DURATION=int(os.getenv('AGENT_SIMULATION_DURATION', 30)),
+            AGENT_SCENARIO_TIMEOUT=int(os.getenv('AGENT_SCENARIO_TIMEOUT', 60)),
+            
+            BASE_DIR=base_dir,
+            DATA_ROOT=data_root,
+            GENERATIONS_DIR=Path(os.getenv('GENERATIONS_DIR', str(data_root / 'generations'))),
+            RECONSTRUCTIONS_DIR=Path(os.getenv('RECONSTRUCTIONS_DIR', str(data_root / 'reconstructions'))),
+            
+            NUM_TAKES_PER_GENERATION=int(os.getenv('NUM_TAKES_PER_GENERATION', 3)),
+            # Sora API only supports 4, 8, or 12 seconds
+            VIDEO_DURATION_SECONDS=int(os.getenv('VIDEO_DURATION_SECONDS', 8)),
+            # Sora API only supports: '720x1280', '1280x720', '1024x1792', '1792x1024'
+            VIDEO_RESOLUTION=os.getenv('VIDEO_RESOLUTION', '1280x720'),
+            VIDEO_FPS=int(os.getenv('VIDEO_FPS', 24)),
+            
+            MIN_IDENTITY_PERSISTENCE=float(os.getenv('MIN_IDENTITY_PERSISTENCE', 0.85)),
+            MIN_PATH_REALISM=float(os.getenv('MIN_PATH_REALISM', 0.80)),
+            MIN_PHYSICS_SCORE=float(os.getenv('MIN_PHYSICS_SCORE', 0.75)),
+            
+            LOG_LEVEL=os.getenv('LOG_LEVEL', 'INFO'),
+            LOG_FILE=os.getenv('LOG_FILE', 'logs/sora_director.log'),
+            
+            MAX_UPLOAD_SIZE_MB=int(os.getenv('MAX_UPLOAD_SIZE_MB', 500)),
+            
+            USE_XSENDFILE=_env_bool('USE_XSENDFILE', 'false'),
+            DATA_MAX_AGE_SECONDS=int(os.getenv('DATA_MAX_AGE_SECONDS', 0)),
+            
+            WORKER_THREADS=int(os.getenv('WORKER_THREADS', 4)),
+            SCORER_WORKERS=int(os.getenv('SCORER_WORKERS', 4)),
+            PRELOAD_MODELS=_env_bool('PRELOAD_MODELS', 'false'),
+            
+            REDIS_URL=os.getenv('REDIS_URL', ''),
+            ENABLE_CACHING=_env_bool('ENABLE_CACHING', 'true'),
+            CACHE_TTL_SECONDS=int(os.getenv('CACHE_TTL_SECONDS', 3600)),
+            CACHE_MAX_MB=int(os.getenv('CACHE_MAX_MB', 2048)),
+            MAX_CACHED_PROMPTS=int(os.getenv('MAX_CACHED_PROMPTS', 50)),
+        )
+    
+    def ensure_directories(self):
         """Create necessary directories if they don't exist."""
-        cls.DATA_ROOT.mkdir(parents=True, exist_ok=True)
-        cls.GENERATIONS_DIR.mkdir(parents=True, exist_ok=True)
-        cls.RECONSTRUCTIONS_DIR.mkdir(parents=True, exist_ok=True)
-        Path(cls.LOG_FILE).parent.mkdir(parents=True, exist_ok=True)
+        self.DATA_ROOT.mkdir(parents=True, exist_ok=True)
+        self.GENERATIONS_DIR.mkdir(parents=True, exist_ok=True)
+        self.RECONSTRUCTIONS_DIR.mkdir(parents=True, exist_ok=True)
+        Path(self.LOG_FILE).parent.mkdir(parents=True, exist_ok=True)
     
-    @classmethod
-    def validate(cls):
+    def validate(self):
         """Validate critical configuration."""
-        if not cls.USE_MOCK:
-            if not cls.SORA_API_KEY:
+        if not self.USE_MOCK:
+            if not self.SORA_API_KEY:
                 raise ValueError("SORA_API_KEY must be set when USE_MOCK=false")
         
-        if cls.NUM_TAKES_PER_GENERATION < 1:
+        if self.NUM_TAKES_PER_GENERATION < 1:
             raise ValueError("NUM_TAKES_PER_GENERATION must be at least 1")
         
-        if cls.VIDEO_DURATION_SECONDS not in [4, 8, 12]:
+        if self.VIDEO_DURATION_SECONDS not in [4, 8, 12]:
             raise ValueError("VIDEO_DURATION_SECONDS must be 4, 8, or 12 (Sora API requirement)")
     
-    @classmethod
-    def get_info(cls):
-        """Return a dictionary of current configuration (safe for logging)."""
+    @functools.cache
+    def initialize(self):
+        """
+        Create directories and validate configuration, once per process.
+        
+        Called by the application entry point rather than at import time so that
+        importing any module from src stays side-effect free. Tests that change
+        the environment can call Config.initialize.cache_clear() to re-run it.
+        """
+        self.ensure_directories()
+        self.validate()
+    
+    @functools.cache
+    def get_info(self):
+        """
+        Return a dictionary of current configuration (safe for logging).
+        
+        The configuration is immutable, so the dictionary is built once and
+        shared; treat it as read-only.
+        """
         return {
-            'mode': 'MOCK' if cls.USE_MOCK else 'PRODUCTION',
-            'port': cls.PORT,
-            'host': cls.HOST,
-            'num_takes': cls.NUM_TAKES_PER_GENERATION,
-            'video_duration': cls.VIDEO_DURATION_SECONDS,
-            'data_root': str(cls.DATA_ROOT),
+            'mode': 'MOCK' if self.USE_MOCK else 'PRODUCTION',
+            'port': self.PORT,
+            'host': self.HOST,
+            'num_takes': self.NUM_TAKES_PER_GENERATION,
+            'video_duration': self.VIDEO_DURATION_SECONDS,
+            'data_root': str(self.DATA_ROOT),
         }
 
 
-# Initialize configuration on import
-Config.ensure_directories()
-Config.validate()
-
+# Application-wide configuration, read from the environment once on import
+Config = _ConfigData.from_env()
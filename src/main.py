@@ -8,30 +8,83 @@ from pathlib import Path
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from flask import Flask, render_template, request, jsonify, send_from_directory
+from flask import Flask, Request, render_template, request, jsonify, send_from_directory
 from flask_cors import CORS
-import traceback
-import json
+from openai import InvalidWebhookSignatureError
+from werkzeug.exceptions import HTTPException
+from werkzeug.security import safe_join
+from werkzeug.utils import secure_filename
+import base64
+import contextlib
+import functools
+import hashlib
+import importlib.util
+import mimetypes
+import os
+import shutil
+import tempfile
+import threading
+from urllib.parse import quote
+import cv2
+import numpy as np
+import orjson
 
 from src.config import Config
 from src.utils.logger import setup_logger, app_logger
 from src.utils.file_manager import (
     generate_prompt_hash,
-    create_generation_directory,
     create_reconstruction_directory,
     get_relative_url,
-    save_prompt_metadata
+    save_upload_stream,
+    prefetch_file
 )
-from src.sora_handler import get_sora_handler
-from src.scoring_module import get_video_scorer
+from src.utils.generation_cache import get_generation_cache
+from src.utils.openai_client import get_openai_client
+from src.utils.pools import get_cpu_pool
+from src.utils.progress_tracker import (
+    get_generation_progress,
+    get_generation_progress_json,
+    watch_generation_progress
+)
+from src.utils.video import iter_video_frames
 from src.reconstruction_module import get_reconstruction_module
 from src.agent_module import get_agent_module
 from src.prompt_reviser import get_prompt_reviser
+from src.sora_handler import notify_video_job
+from src.tasks import submit_generation
+
+# Create data directories and validate settings before serving
+Config.initialize()
+
+# Uploaded videos, also where large multipart uploads are spooled while parsed
+UPLOAD_DIR = Config.DATA_ROOT / 'uploads'
+
+# Multipart uploads larger than this are spooled to UPLOAD_DIR instead of memory
+UPLOAD_SPOOL_THRESHOLD = 500 * 1024
+
+
+class UploadRequest(Request):
+    """Request that spools large multipart files into UPLOAD_DIR."""
+    
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        """
+        Spool big file parts next to their destination.
+        
+        Werkzeug would write them to the system temp directory, after which
+        save_upload_stream copies them again; a file already in UPLOAD_DIR is
+        hard-linked into place instead.
+        """
+        if total_content_length is None or total_content_length > UPLOAD_SPOOL_THRESHOLD:
+            UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
+            return tempfile.NamedTemporaryFile('wb+', dir=UPLOAD_DIR, suffix='.part')
+        return super()._get_file_stream(total_content_length, content_type, filename, content_length)
+
 
 # Initialize Flask app
 app = Flask(__name__, 
             template_folder='../templates',
             static_folder='../static')
+app.request_class = UploadRequest
 app.config['SECRET_KEY'] = Config.SECRET_KEY
 app.config['MAX_CONTENT_LENGTH'] = Config.MAX_UPLOAD_SIZE_MB * 1024 * 1024
 
@@ -41,32 +94,104 @@ CORS(app)
 # Initialize logger
 logger = setup_logger(__name__)
 
-# Global progress tracking for video generations
-# Format: {prompt_hash: {'status': 'queued|in_progress|completed|failed', 'progress': 0-100, 'message': '...'}}
-generation_progress = {}
-
 # Initialize modules
-sora_handler = get_sora_handler()
-video_scorer = get_video_scorer()
 reconstruction_module = get_reconstruction_module()
 agent_module = get_agent_module()
 prompt_reviser = get_prompt_reviser()
+generation_cache = get_generation_cache()
+
+
+# nginx location that aliases DATA_ROOT for X-Accel-Redirect (internal only)
+XACCEL_DATA_PREFIX = '/internal-data/'
+
+# Parsed GPT-4 Vision scenes, keyed by video content, prompt and frame count
+SCENE_CACHE_DIR = Config.DATA_ROOT / '.scene_cache'
+SCENE_CACHE_MAX_BYTES = 50 * 1024 * 1024
+
+# Keyframes are shrunk to this longest side before encoding. GPT-4 Vision bills
+# high detail images per 512px tile: a 16:9 frame at 768px is 2 tiles (425 tokens),
+# at 1024px 4 tiles (765 tokens)
+KEYFRAME_MAX_DIM = 768
+KEYFRAME_JPEG_QUALITY = 80
+
+# A progress stream is closed after this long and the browser reconnects, so an
+# abandoned stream cannot hold a server thread for the whole progress TTL
+PROGRESS_STREAM_SECONDS = 60
+
+# Upper bound on a single GPT-4 Vision request, so a stalled call cannot hold a worker thread
+SCENE_REQUEST_TIMEOUT = 120
+
+# PyTorch is optional and heavy: check for it once, import it only when MiDaS runs
+TORCH_AVAILABLE = importlib.util.find_spec('torch') is not None
+
+# PyAV (optional) seeks to keyframes and decodes forward far faster than OpenCV's seek
+AV_AVAILABLE = importlib.util.find_spec('av') is not None
+
+# Traced MiDaS Small networks (one per device), so later processes skip the hub load
+# and eager-mode overhead
+MIDAS_CACHE_DIR = Config.DATA_ROOT / 'models_cache'
+# File names there; the CUDA one names its weight layout so older NCHW traces are not reused
+MIDAS_SCRIPT_NAMES = {'cuda': 'midas_small_cuda_channels_last.ts', 'cpu': 'midas_small_cpu.ts'}
+
+# MiDaS Small input: longest side fitted within 256px in multiples of 32, ImageNet-normalized
+MIDAS_INPUT_SIZE = 256
+MIDAS_INPUT_MULTIPLE = 32
+MIDAS_MEAN = np.array([0.485, 0.456, 0.406], dtype=np.float32)
+MIDAS_STD = np.array([0.229, 0.224, 0.225], dtype=np.float32)
+# The same normalization as one multiply-subtract on 0-255 pixel values
+MIDAS_PIXEL_SCALE = 1.0 / (255.0 * MIDAS_STD)
+MIDAS_PIXEL_OFFSET = MIDAS_MEAN / MIDAS_STD
+
+# (model, transform, device) for MiDaS depth estimation, loaded on first use
+_midas_model = None
+_midas_lock = threading.Lock()
+
+
+def json_response(payload, status: int = 200):
+    """
+    Build a JSON response with orjson.
+    
+    Faster than jsonify for large result payloads and serializes NumPy scalars
+    and arrays natively.
+    """
+    return app.response_class(
+        orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY),
+        status=status,
+        mimetype='application/json'
+    )
+
+
+# The health payload never changes, so liveness probes get pre-encoded bytes
+HEALTH_BODY = orjson.dumps({
+    'status': 'healthy',
+    'mode': 'MOCK' if Config.USE_MOCK else 'PRODUCTION',
+    'version': '1.0.0'
+})
+
+
+@functools.cache
+def render_index() -> str:
+    """
+    Render the main page once per process.
+    
+    The page only depends on the immutable configuration. In debug mode it is
+    rendered per request instead, so template edits show up on reload.
+    """
+    return render_template('index.html', config=Config.get_info())
 
 
 @app.route('/')
 def index():
     """Serve the main web UI."""
-    return render_template('index.html', config=Config.get_info())
+    if app.debug:
+        return render_template('index.html', config=Config.get_info())
+    return render_index()
 
 
 @app.route('/health')
 def health():
     """Health check endpoint."""
-    return jsonify({
-        'status': 'healthy',
-        'mode': 'MOCK' if Config.USE_MOCK else 'PRODUCTION',
-        'version': '1.0.0'
-    })
+    return app.response_class(HEALTH_BODY, mimetype='application/json')
 
 
 @app.route('/api/progress/<prompt_hash>')
@@ -78,11 +203,13 @@ def get_progress(prompt_hash):
         {
             "status": "queued|in_progress|completed|failed",
             "progress": 0-100,
-            "message": "Status message"
+            "message": "Status message",
+            "result": { ... }  // /api/generate response, once completed
         }
     """
-    if prompt_hash in generation_progress:
-        return jsonify(generation_progress[prompt_hash])
+    progress = get_generation_progress_json(prompt_hash)
+    if progress is not None:
+        return app.response_class(progress, mimetype='application/json')
     else:
         return jsonify({
             'status': 'not_found',
@@ -91,41 +218,49 @@ def get_progress(prompt_hash):
         }), 404
 
 
+@app.route('/api/progress/stream/<prompt_hash>')
+def stream_progress(prompt_hash):
+    """
+    Stream generation progress as Server-Sent Events.
+    
+    Each change is sent as a "data:" event carrying the same JSON as
+    /api/progress/<prompt_hash>; the stream ends once the generation has
+    completed or failed, or after PROGRESS_STREAM_SECONDS, when EventSource
+    reconnects on its own. Unknown or expired generations get a 404.
+    """
+    if get_generation_progress_json(prompt_hash) is None:
+        return jsonify({
+            'status': 'not_found',
+            'progress': 0,
+            'message': 'Generation not found'
+        }), 404
+    
+    def events():
+        for progress in watch_generation_progress(prompt_hash, timeout=PROGRESS_STREAM_SECONDS):
+            if progress is None:
+                yield ': keep-alive\n\n'
+            else:
+                yield f"data: {orjson.dumps(progress, option=orjson.OPT_SERIALIZE_NUMPY).decode()}\n\n"
+    
+    return app.response_class(
+        events(),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+
 @app.route('/api/cached_prompts')
 def get_cached_prompts():
     """
-    Get list of all cached prompts for quick reuse.
-    Returns prompts sorted by most recent first.
+    Get list of cached prompts for quick reuse.
+    Returns the Config.MAX_CACHED_PROMPTS most recent prompts, newest first.
     """
     try:
-        cache_dir = Config.DATA_ROOT / 'cache'
-        
-        if not cache_dir.exists():
-            return jsonify({'prompts': []})
-        
-        prompts = []
-        for cache_file in cache_dir.glob('*.json'):
-            try:
-                with open(cache_file, 'r') as f:
-                    data = json.load(f)
-                    
-                if data.get('success') and data.get('prompt'):
-                    prompts.append({
-                        'prompt': data['prompt'],
-                        'hash': data['prompt_hash'],
-                        'timestamp': cache_file.stat().st_mtime,
-                        'mode': data.get('mode', 'UNKNOWN')
-                    })
-            except Exception as e:
-                logger.warning(f"Failed to read cache file {cache_file}: {e}")
-                continue
-        
-        # Sort by timestamp (most recent first)
-        prompts.sort(key=lambda x: x['timestamp'], reverse=True)
+        prompts = generation_cache.list_prompts(Config.MAX_CACHED_PROMPTS)
         
         logger.info(f"Found {len(prompts)} cached prompts")
-        return jsonify({'prompts': prompts, 'count': len(prompts)})
-        
+        return json_response({'prompts': prompts, 'count': len(prompts)})
+    
     except Exception as e:
         logger.error(f"Failed to get cached prompts: {e}")
         return jsonify({'error': str(e), 'prompts': []}), 500
@@ -136,13 +271,26 @@ def generate_videos():
     """
     Generate multiple video takes from a text prompt.
     
+    Generation runs in the background: the request is answered with 202 and
+    the prompt hash, and the result below is delivered as the "result" field of
+    /api/progress/<prompt_hash> once the status is "completed". Cached
+    generations are returned directly with 200; pass ?no_cache=1 to force a
+    new generation.
+    
     Request JSON:
         {
             "prompt": "A robot walks down a hallway",
             "num_takes": 3  // optional
         }
     
-    Response JSON:
+    Response JSON (202):
+        {
+            "prompt_hash": "abc123...",
+            "prompt": "A robot walks down a hallway",
+            "status": "queued"
+        }
+    
+    Result JSON:
         {
             "prompt_hash": "abc123...",
             "prompt": "A robot walks down a hallway",
@@ -157,173 +305,78 @@ def generate_videos():
             ]
         }
     """
+    data = request.get_json()
+    prompt = data.get('prompt', '').strip()
+    num_takes = data.get('num_takes', Config.NUM_TAKES_PER_GENERATION)
+    use_real_api = data.get('use_real_api', False)
+    
+    if not prompt:
+        return jsonify({'error': 'Prompt is required'}), 400
+    
+    logger.info(f"Received generation request: '{prompt}' (use_real_api={use_real_api})")
+    
+    # Generate unique hash for this prompt
+    prompt_hash = generate_prompt_hash(prompt)
+    
+    # Check if we have a cached generation for this prompt
+    use_cache = use_real_api and request.args.get('no_cache') != '1'
+    cached_data = generation_cache.get(prompt_hash) if use_cache else None
+    if cached_data:
+        logger.info(f"✨ Found cached generation for prompt: '{prompt}'")
+        try:
+            # Verify cached videos still exist (by URL: stored paths may come from another machine)
+            if cached_takes_exist(cached_data['takes']):
+                logger.info(f"✅ Returning cached generation with {len(cached_data['takes'])} videos")
+                return json_response({
+                    **cached_data,
+                    'cached': True,
+                    'success': True
+                })
+            else:
+                logger.warning("⚠️  Some cached videos missing, regenerating...")
+        except Exception as e:
+            logger.warning(f"⚠️  Failed to load cache: {e}")
+    
+    # A generation for this prompt is already running; let the client keep polling
+    current = get_generation_progress(prompt_hash)
+    if current and current['status'] in ('queued', 'in_progress'):
+        return jsonify({'prompt_hash': prompt_hash, 'prompt': prompt, 'status': current['status']}), 202
+    
+    # Run the pipeline in the background; the client polls /api/progress for the result
+    submit_generation(prompt_hash, prompt, num_takes, use_real_api)
+    
+    return jsonify({'prompt_hash': prompt_hash, 'prompt': prompt, 'status': 'queued'}), 202
+
+
+@app.route('/api/webhooks/sora', methods=['POST'])
+def sora_webhook():
+    """
+    Receive OpenAI webhooks for Sora video jobs.
+    
+    A video.completed or video.failed event wakes the thread polling that job,
+    so the result is fetched right away instead of after the current backoff.
+    Only enabled when SORA_WEBHOOK_SECRET is set; events are signature-checked.
+    """
+    if not Config.SORA_WEBHOOK_SECRET or not Config.SORA_API_KEY:
+        return jsonify({'error': 'Webhooks are not configured'}), 404
+    
+    payload = request.get_data()
     try:
-        data = request.get_json()
-        prompt = data.get('prompt', '').strip()
-        num_takes = data.get('num_takes', Config.NUM_TAKES_PER_GENERATION)
-        use_real_api = data.get('use_real_api', False)
-        
-        if not prompt:
-            return jsonify({'error': 'Prompt is required'}), 400
-        
-        logger.info(f"Received generation request: '{prompt}' (use_real_api={use_real_api})")
-        
-        # Generate unique hash for this prompt
-        prompt_hash = generate_prompt_hash(prompt)
-        
-        # Check if we have a cached generation for this prompt
-        cache_file = Config.DATA_ROOT / 'cache' / f'{prompt_hash}.json'
-        if cache_file.exists() and use_real_api:
-            logger.info(f"✨ Found cached generation for prompt: '{prompt}'")
-            try:
-                with open(cache_file, 'r') as f:
-                    cached_data = json.load(f)
-                    
-                # Verify cached videos still exist
-                all_exist = all(
-                    Path(take['video_path']).exists() 
-                    for take in cached_data['takes']
-                )
-                
-                if all_exist:
-                    logger.info(f"✅ Returning cached generation with {len(cached_data['takes'])} videos")
-                    return jsonify({
-                        **cached_data,
-                        'cached': True,
-                        'success': True
-                    })
-                else:
-                    logger.warning("⚠️  Some cached videos missing, regenerating...")
-            except Exception as e:
-                logger.warning(f"⚠️  Failed to load cache: {e}")
-        
-        # Initialize progress tracking
-        generation_progress[prompt_hash] = {
-            'status': 'queued',
-            'progress': 0,
-            'message': 'Initializing generation...'
-        }
-        
-        # Create output directory
-        output_dir = create_generation_directory(prompt_hash)
-        
-        # Ensure cache directory exists
-        cache_dir = Config.DATA_ROOT / 'cache'
-        cache_dir.mkdir(parents=True, exist_ok=True)
-        
-        # Save metadata
-        save_prompt_metadata(prompt_hash, prompt, {
-            'num_takes': num_takes,
-            'mode': 'MOCK' if Config.USE_MOCK else 'PRODUCTION'
-        })
-        
-        # Update progress
-        generation_progress[prompt_hash] = {
-            'status': 'in_progress',
-            'progress': 10,
-            'message': 'Starting video generation...'
-        }
-        
-        # Generate videos (use specific handler for real/mock mode)
-        if use_real_api:
-            from src.sora_handler import SoraHandler
-            
-            # Create progress callback
-            def update_progress(status, progress, message):
-                generation_progress[prompt_hash] = {
-                    'status': status,
-                    'progress': progress,
-                    'message': message
-                }
-            
-            temp_handler = SoraHandler(use_mock=False, progress_callback=update_progress)
-            video_paths = temp_handler.generate_n_takes(
-                prompt=prompt,
-                num_takes=num_takes,
-                output_dir=output_dir
-            )
-        else:
-            video_paths = sora_handler.generate_n_takes(
-                prompt=prompt,
-                num_takes=num_takes,
-                output_dir=output_dir
-            )
-            # Mock mode completes instantly
-            generation_progress[prompt_hash] = {
-                'status': 'in_progress',
-                'progress': 90,
-                'message': 'Scoring videos...'
-            }
-        
-        # Score each video
-        takes = []
-        for i, video_path in enumerate(video_paths, start=1):
-            scores = video_scorer.score_video(video_path)
-            
-            takes.append({
-                'take_id': i,
-                'video_url': get_relative_url(video_path),
-                'video_path': str(video_path),
-                'scores': scores
-            })
-        
-        # Rank by overall score
-        takes_sorted = sorted(takes, key=lambda x: x['scores']['overall'], reverse=True)
-        
-        # Add rank
-        for rank, take in enumerate(takes_sorted, start=1):
-            take['rank'] = rank
-        
-        # Determine if mock was used
-        actual_mode = 'REAL' if use_real_api else 'MOCK'
-        # Check if any video fallback to mock by checking file size or metadata
-        if use_real_api and video_paths:
-            # If the first video is very small, it's likely a mock fallback
-            first_video = Path(video_paths[0])
-            if first_video.exists() and first_video.stat().st_size < 100000:  # Less than 100KB is likely mock
-                actual_mode = 'MOCK'
-        
-        # Mark generation as completed
-        generation_progress[prompt_hash] = {
-            'status': 'completed',
-            'progress': 100,
-            'message': 'Generation complete!'
-        }
-        
-        response = {
-            'prompt_hash': prompt_hash,
-            'prompt': prompt,
-            'takes': takes_sorted,
-            'mode': actual_mode,
-            'success': True
-        }
-        
-        # Save to cache if real API was used successfully
-        if use_real_api and actual_mode == 'REAL':
-            try:
-                cache_file = Config.DATA_ROOT / 'cache' / f'{prompt_hash}.json'
-                with open(cache_file, 'w') as f:
-                    json.dump(response, f, indent=2)
-                logger.info(f"💾 Saved generation to cache: {cache_file}")
-            except Exception as e:
-                logger.warning(f"⚠️  Failed to save cache: {e}")
-        
-        logger.info(f"Generation complete: {len(takes)} takes created (mode: {actual_mode})")
-        return jsonify(response)
+        get_openai_client(Config.SORA_API_KEY).webhooks.verify_signature(
+            payload, request.headers, secret=Config.SORA_WEBHOOK_SECRET
+        )
+    except InvalidWebhookSignatureError as e:
+        logger.warning(f"Rejected Sora webhook: {e}")
+        return jsonify({'error': 'Invalid signature'}), 400
     
-    except Exception as e:
-        # Mark generation as failed
-        prompt_hash = locals().get('prompt_hash')
-        if prompt_hash:
-            generation_progress[prompt_hash] = {
-                'status': 'failed',
-                'progress': 0,
-                'message': f'Generation failed: {str(e)}'
-            }
-        
-        logger.error(f"Error in generate_videos: {e}")
-        logger.error(traceback.format_exc())
-        return jsonify({'error': str(e), 'success': False}), 500
+    event = orjson.loads(payload)
+    if event.get('type', '').startswith('video.'):
+        video_id = event.get('data', {}).get('id', '')
+        # The job may be polled by another server worker, which keeps polling
+        if not notify_video_job(video_id):
+            logger.info(f"Sora webhook for a job not polled here: {video_id}")
+    
+    return '', 204
 
 
 @app.route('/api/reconstruct', methods=['POST'])
@@ -344,56 +397,50 @@ def reconstruct_3d():
             "success": true
         }
     """
-    try:
-        data = request.get_json()
-        prompt_hash = data.get('prompt_hash', '')
-        video_path_str = data.get('video_path', '')
-        
-        if not prompt_hash or not video_path_str:
-            return jsonify({'error': 'prompt_hash and video_path are required'}), 400
-        
-        # Handle different path formats
-        # Check for web URL paths FIRST (before absolute path check)
-        if video_path_str.startswith('/data/'):
-            # Web URL path - strip leading slash and resolve relative to project root
-            video_path = Config.DATA_ROOT.parent / video_path_str.lstrip('/')
-        else:
-            video_path = Path(video_path_str)
-            # If it's already an absolute path, use it as-is
-            if not video_path.is_absolute():
-                # Relative path, resolve relative to project root
-                video_path = Config.DATA_ROOT.parent / video_path_str
-        
-        if not video_path.exists():
-            logger.error(f"Video file not found: {video_path} (original: {data.get('video_path')})")
-            return jsonify({'error': f'Video file not found: {video_path}'}), 404
-        
-        logger.info(f"Received reconstruction request for: {video_path}")
-        
-        # Create reconstruction output directory
-        output_dir = create_reconstruction_directory(prompt_hash)
-        
-        # Run reconstruction
-        asset_path = reconstruction_module.run_reconstruction(
-            video_path=video_path,
-            output_dir=output_dir,
-            format='splat'
-        )
-        
-        response = {
-            'asset_url': get_relative_url(asset_path),
-            'asset_path': str(asset_path),
-            'format': 'splat',
-            'success': True
-        }
-        
-        logger.info(f"Reconstruction complete: {asset_path}")
-        return jsonify(response)
+    data = request.get_json()
+    prompt_hash = data.get('prompt_hash', '')
+    video_path_str = data.get('video_path', '')
     
-    except Exception as e:
-        logger.error(f"Error in reconstruct_3d: {e}")
-        logger.error(traceback.format_exc())
-        return jsonify({'error': str(e), 'success': False}), 500
+    if not prompt_hash or not video_path_str:
+        return jsonify({'error': 'prompt_hash and video_path are required'}), 400
+    
+    # Handle different path formats
+    # Check for web URL paths FIRST (before absolute path check)
+    if video_path_str.startswith('/data/'):
+        # Web URL path - strip leading slash and resolve relative to project root
+        video_path = Config.DATA_ROOT.parent / video_path_str.lstrip('/')
+    else:
+        video_path = Path(video_path_str)
+        # If it's already an absolute path, use it as-is
+        if not video_path.is_absolute():
+            # Relative path, resolve relative to project root
+            video_path = Config.DATA_ROOT.parent / video_path_str
+    
+    if not video_path.exists():
+        logger.error(f"Video file not found: {video_path} (original: {data.get('video_path')})")
+        return jsonify({'error': f'Video file not found: {video_path}'}), 404
+    
+    logger.info(f"Received reconstruction request for: {video_path}")
+    
+    # Create reconstruction output directory
+    output_dir = create_reconstruction_directory(prompt_hash)
+    
+    # Run reconstruction
+    asset_path = reconstruction_module.run_reconstruction(
+        video_path=video_path,
+        output_dir=output_dir,
+        format='splat'
+    )
+    
+    response = {
+        'asset_url': get_relative_url(asset_path),
+        'asset_path': str(asset_path),
+        'format': 'splat',
+        'success': True
+    }
+    
+    logger.info(f"Reconstruction complete: {asset_path}")
+    return jsonify(response)
 
 
 @app.route('/api/run_agent', methods=['POST'])
@@ -416,59 +463,53 @@ def run_agent_test():
             "success": true
         }
     """
-    try:
-        data = request.get_json()
-        asset_path_str = data.get('asset_path', '')
-        original_prompt = data.get('prompt', '')
-        
-        if not asset_path_str:
-            return jsonify({'error': 'asset_path is required'}), 400
-        
-        asset_path = Path(asset_path_str)
-        
-        if not asset_path.exists():
-            return jsonify({'error': f'Asset file not found: {asset_path}'}), 404
-        
-        logger.info(f"Received agent test request for: {asset_path}")
-        
-        # Run agent testing
-        test_results = agent_module.test_world(asset_path)
-        
-        violations = test_results.get('violations', [])
-        metrics = test_results.get('metrics', {})
-        
-        # Revise prompt based on violations
-        revised_prompt = original_prompt
-        explanation = "No issues detected."
-        
-        if violations:
-            revised_prompt = prompt_reviser.revise_prompt(
-                original_prompt=original_prompt,
-                violations=violations
-            )
-            
-            explanation = prompt_reviser.create_revision_explanation(
-                original_prompt=original_prompt,
-                revised_prompt=revised_prompt,
-                violations=violations
-            )
-        
-        response = {
-            'violations': violations,
-            'metrics': metrics,
-            'test_duration': test_results.get('test_duration', 0),
-            'revised_prompt': revised_prompt,
-            'explanation': explanation,
-            'success': True
-        }
+    data = request.get_json()
+    asset_path_str = data.get('asset_path', '')
+    original_prompt = data.get('prompt', '')
+    
+    if not asset_path_str:
+        return jsonify({'error': 'asset_path is required'}), 400
+    
+    asset_path = Path(asset_path_str)
+    
+    if not asset_path.exists():
+        return jsonify({'error': f'Asset file not found: {asset_path}'}), 404
+    
+    logger.info(f"Received agent test request for: {asset_path}")
+    
+    # Run agent testing
+    test_results = agent_module.test_world(asset_path)
+    
+    violations = test_results.get('violations', [])
+    metrics = test_results.get('metrics', {})
+    
+    # Revise prompt based on violations
+    revised_prompt = original_prompt
+    explanation = "No issues detected."
+    
+    if violations:
+        revised_prompt = prompt_reviser.revise_prompt(
+            original_prompt=original_prompt,
+            violations=violations
+        )
         
-        logger.info(f"Agent testing complete: {len(violations)} violations found")
-        return jsonify(response)
+        explanation = prompt_reviser.create_revision_explanation(
+            original_prompt=original_prompt,
+            revised_prompt=revised_prompt,
+            violations=violations
+        )
     
-    except Exception as e:
-        logger.error(f"Error in run_agent_test: {e}")
-        logger.error(traceback.format_exc())
-        return jsonify({'error': str(e), 'success': False}), 500
+    response = {
+        'violations': violations,
+        'metrics': metrics,
+        'test_duration': test_results.get('test_duration', 0),
+        'revised_prompt': revised_prompt,
+        'explanation': explanation,
+        'success': True
+    }
+    
+    logger.info(f"Agent testing complete: {len(violations)} violations found")
+    return json_response(response)
 
 
 @app.route('/api/analyze_prompt', methods=['POST'])
@@ -488,30 +529,53 @@ def analyze_prompt():
             "success": true
         }
     """
-    try:
-        data = request.get_json()
-        prompt = data.get('prompt', '').strip()
-        
-        if not prompt:
-            return jsonify({'error': 'Prompt is required'}), 400
-        
-        analysis = prompt_reviser.analyze_prompt_quality(prompt)
-        
-        return jsonify({
-            'analysis': analysis,
-            'success': True
-        })
+    data = request.get_json()
+    prompt = data.get('prompt', '').strip()
     
-    except Exception as e:
-        logger.error(f"Error in analyze_prompt: {e}")
-        return jsonify({'error': str(e), 'success': False}), 500
+    if not prompt:
+        return jsonify({'error': 'Prompt is required'}), 400
+    
+    analysis = prompt_reviser.analyze_prompt_quality(prompt)
+    
+    return jsonify({
+        'analysis': analysis,
+        'success': True
+    })
 
 
 @app.route('/data/<path:filepath>')
 def serve_data(filepath):
-    """Serve generated data files (videos, 3D assets)."""
+    """
+    Serve generated data files (videos, 3D assets).
+    
+    Responses support Range and conditional requests (ETag/Last-Modified),
+    and browsers may reuse them for DATA_MAX_AGE_SECONDS before revalidating.
+    With USE_XSENDFILE enabled the response carries only headers, and nginx
+    streams the file itself via sendfile. It needs a matching location:
+        
+        location /internal-data/ { internal; alias /path/to/data/; }
+    """
     try:
-        return send_from_directory(Config.DATA_ROOT, filepath)
+        if Config.USE_XSENDFILE:
+            full_path = safe_join(str(Config.DATA_ROOT), filepath)
+            if full_path is None or not os.path.isfile(full_path):
+                raise FileNotFoundError(filepath)
+            
+            response = app.response_class(
+                mimetype=mimetypes.guess_type(filepath)[0] or 'application/octet-stream'
+            )
+            response.headers['X-Accel-Redirect'] = XACCEL_DATA_PREFIX + quote(filepath)
+            # nginx passes Cache-Control through and adds validators itself
+            response.cache_control.max_age = Config.DATA_MAX_AGE_SECONDS
+            return response
+        
+        return send_from_directory(
+            Config.DATA_ROOT,
+            filepath,
+            conditional=True,
+            etag=True,
+            max_age=Config.DATA_MAX_AGE_SECONDS
+        )
     except Exception as e:
         logger.error(f"Error serving file {filepath}: {e}")
         return jsonify({'error': 'File not found'}), 404
@@ -522,42 +586,44 @@ def upload_video():
     """
     Handle video file uploads for mock mode testing.
     Allows users to upload their own videos to test 3D reconstruction.
+    
+    Accepts either a multipart form with a "video" file field, or the raw
+    video as the request body with the name in the "filename" query parameter.
+    The raw form is copied from the socket to disk without multipart parsing.
     """
     logger.info("Received video upload request")
     
-    try:
+    if request.mimetype.startswith('multipart/'):
         if 'video' not in request.files:
             return jsonify({'error': 'No video file provided'}), 400
         
         file = request.files['video']
-        if file.filename == '':
-            return jsonify({'error': 'No file selected'}), 400
-        
-        # Import secure_filename
-        from werkzeug.utils import secure_filename
-        
-        # Save uploaded file
-        filename = secure_filename(file.filename)
-        upload_dir = Config.DATA_ROOT / 'uploads'
-        upload_dir.mkdir(parents=True, exist_ok=True)
-        
-        filepath = upload_dir / filename
-        file.save(str(filepath))
-        
-        logger.info(f"Video uploaded successfully: {filename}")
-        
-        # Return file info
-        return jsonify({
-            'success': True,
-            'filename': filename,
-            'filepath': str(filepath),
-            'url': f'/files/uploads/{filename}'
-        })
-        
-    except Exception as e:
-        logger.error(f"Video upload failed: {e}")
-        logger.error(traceback.format_exc())
-        return jsonify({'error': str(e)}), 500
+        original_name = file.filename
+        stream = file.stream
+    else:
+        original_name = request.args.get('filename', '')
+        stream = request.stream
+    
+    if not original_name:
+        return jsonify({'error': 'No file selected'}), 400
+    
+    # Save uploaded file, reusing an identical earlier upload if there is one
+    filename = secure_filename(original_name)
+    if not filename:
+        return jsonify({'error': 'Invalid file name'}), 400
+    
+    filepath = save_upload_stream(stream, UPLOAD_DIR, filename)
+    filename = filepath.name
+    
+    logger.info(f"Video uploaded successfully: {filename}")
+    
+    # Return file info
+    return jsonify({
+        'success': True,
+        'filename': filename,
+        'filepath': str(filepath),
+        'url': f'/files/uploads/{filename}'
+    })
 
 
 @app.route('/api/generate_scene_depth', methods=['POST'])
@@ -565,6 +631,18 @@ def generate_scene_with_depth():
     """
     Generate 3D point cloud from video using depth estimation (MiDaS).
     Lightweight alternative to GPT-4 Vision code generation.
+    
+    Response JSON:
+        {
+            "positions": "<base64>",  // little-endian float32 x, y, z per point
+            "colors": "<base64>",     // uint8 r, g, b per point
+            "count": 12345,
+            "success": true
+        }
+    
+    With "Accept: application/octet-stream" the same buffers are sent raw
+    instead: count * 12 bytes of positions followed by count * 3 bytes of
+    colors, with the count in the X-Point-Count header. Errors stay JSON.
     """
     try:
         data = request.get_json()
@@ -578,26 +656,37 @@ def generate_scene_with_depth():
         logger.info(f"Max points: {max_points}")
         
         # Generate point cloud from depth
-        point_cloud = generate_point_cloud_from_video(video_path, max_points)
+        positions, colors = generate_point_cloud_from_video(video_path, max_points)
         
-        logger.info(f"Generated {len(point_cloud)} points")
+        logger.info(f"Generated {len(positions)} points")
         logger.info("Depth reconstruction complete")
         logger.info("=" * 60)
         
-        return jsonify({
+        positions = positions.astype('<f4', copy=False)
+        if request.accept_mimetypes.best == 'application/octet-stream':
+            response = app.response_class(
+                b''.join((memoryview(positions), memoryview(colors))),
+                mimetype='application/octet-stream'
+            )
+            response.headers['X-Point-Count'] = str(len(positions))
+            return response
+        
+        # Raw buffers the client can wrap in typed arrays instead of 6 JSON keys per point;
+        # the arrays are already contiguous little-endian, so no copies are made before encoding
+        return json_response({
             'success': True,
-            'points': point_cloud,
+            'positions': base64.b64encode(memoryview(positions)).decode('ascii'),
+            'colors': base64.b64encode(memoryview(colors)).decode('ascii'),
             'source': 'depth_estimation',
-            'count': len(point_cloud)
+            'count': len(positions)
         })
-        
+    
     except Exception as e:
-        logger.error(f"Depth reconstruction failed: {e}")
-        traceback.print_exc()
+        logger.exception(f"Depth reconstruction failed: {e}")
         return jsonify({
             'success': False,
             'error': str(e),
-            'points': []
+            'count': 0
         }), 500
 
 
@@ -616,6 +705,10 @@ def generate_scene():
         video_path = data.get('video_path', '')
         prompt = data.get('prompt', '')
         frame_count = data.get('frame_count', 3)
+        # 'low' sends 512px thumbnails to GPT-4 Vision: far fewer bytes and tokens
+        detail = data.get('detail', 'high')
+        if detail not in ('low', 'high', 'auto'):
+            detail = 'high'
         
         logger.info(f"📹 Video path: {video_path}")
         logger.info(f"🎯 Prompt: {prompt}")
@@ -637,6 +730,23 @@ def generate_scene():
                 'source': 'default'
             })
         
+        # Reuse the scene if this video and prompt were analyzed before
+        try:
+            cache_key = scene_cache_key(video_path, prompt, frame_count, detail)
+        except OSError as e:
+            logger.warning(f"⚠️  Could not hash video for scene cache: {e}")
+            cache_key = None
+        
+        if cache_key:
+            cached_scene = load_cached_scene(cache_key)
+            if cached_scene is not None:
+                logger.info(f"✨ Returning cached scene {cache_key}")
+                return jsonify({
+                    'success': True,
+                    'scene': cached_scene,
+                    'source': 'cache'
+                })
+        
         # Extract keyframes from video
         logger.info(f"🔍 Extracting {frame_count} keyframes from video...")
         frames = extract_video_keyframes(video_path, frame_count)
@@ -654,8 +764,7 @@ def generate_scene():
         
         # Use GPT-4 Vision to analyze frames and generate scene
         logger.info("🤖 Calling GPT-4 Vision API...")
-        import openai
-        openai.api_key = Config.SORA_API_KEY
+        client = get_openai_client(Config.SORA_API_KEY)
         
         # Prepare frame data for GPT-4 Vision
         frame_messages = []
@@ -665,14 +774,15 @@ def generate_scene():
                 "type": "image_url",
                 "image_url": {
                     "url": f"data:image/jpeg;base64,{frame_b64}",
-                    "detail": "high"
+                    "detail": detail
                 }
             })
         
         logger.info(f"🚀 Sending {len(frames)} frames to GPT-4 Vision for analysis...")
         
-        response = openai.chat.completions.create(
+        response = client.chat.completions.create(
             model="gpt-4o",
+            timeout=SCENE_REQUEST_TIMEOUT,
             messages=[
                 {
                     "role": "system",
@@ -807,21 +917,19 @@ Generate code that recreates this specific scene:"""
         logger.info("✅ Received response from GPT-4 Vision")
         logger.info(f"📝 Response preview: {result[:200]}...")
         
-        # Parse the response
-        import json
-        import re
-        
-        # Try to extract JSON from response
+        # Parse the response: usually bare JSON, sometimes fenced or wrapped in prose
         logger.info("🔧 Parsing JSON response...")
-        json_match = re.search(r'\{.*\}', result, re.DOTALL)
-        if json_match:
-            scene_data = json.loads(json_match.group())
-        else:
-            scene_data = json.loads(result)
+        scene_data = parse_json_object(result)
         
         logger.info("✅ Successfully parsed scene data")
         logger.info(f"📊 Analysis: {scene_data.get('analysis', 'N/A')[:100]}...")
         logger.info(f"💻 Code length: {len(scene_data.get('code', ''))} characters")
+        if cache_key:
+            try:
+                store_cached_scene(cache_key, scene_data)
+            except OSError as e:
+                logger.warning(f"⚠️  Failed to cache scene: {e}")
+        
         logger.info("🎉 Scene generation complete - returning to client")
         logger.info("=" * 60)
         
@@ -830,11 +938,10 @@ Generate code that recreates this specific scene:"""
             'scene': scene_data,
             'source': 'gpt4_vision'
         })
-        
+    
     except Exception as e:
         logger.error("=" * 60)
-        logger.error(f"❌ Scene generation failed: {e}")
-        logger.error(traceback.format_exc())
+        logger.exception(f"❌ Scene generation failed: {e}")
         # Fall back to default scene
         return jsonify({
             'success': True,
@@ -853,117 +960,253 @@ def generate_point_cloud_from_video(video_path, max_points=10000):
         max_points: Maximum number of points to return (for performance)
     
     Returns:
-        List of points: [{'x': float, 'y': float, 'z': float, 'r': int, 'g': int, 'b': int}, ...]
+        Tuple of (float32 positions of shape (N, 3), uint8 RGB colors of shape (N, 3))
     """
     try:
-        import cv2
-        import numpy as np
-        from pathlib import Path
-        
         # Try to use MiDaS for depth estimation
-        use_midas = False
-        try:
-            import torch
-            use_midas = True
+        use_midas = TORCH_AVAILABLE
+        if use_midas:
             logger.info("MiDaS available - using depth estimation")
-        except ImportError:
-            logger.warning("PyTorch not available - using simple depth approximation")
-        
-        # Handle path resolution
-        video_path_obj = Path(video_path)
-        if video_path_obj.is_absolute() and video_path_obj.exists():
-            video_path = video_path_obj
-        elif isinstance(video_path, str) and video_path.startswith('/data/'):
-            video_path = Config.DATA_ROOT.parent / video_path.lstrip('/')
         else:
-            video_path = Config.DATA_ROOT.parent / str(video_path)
+            logger.warning("PyTorch not available - using simple depth approximation")
         
+        video_path = resolve_video_path(video_path)
         logger.info(f"Loading video: {video_path}")
-        cap = cv2.VideoCapture(str(video_path))
-        
-        if not cap.isOpened():
-            raise ValueError(f"Could not open video: {video_path}")
+        prefetch_file(video_path)
+        cap = open_video_capture(video_path)
         
         # Extract middle frame for depth estimation
         total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-        middle_frame = total_frames // 2
-        
-        cap.set(cv2.CAP_PROP_POS_FRAMES, middle_frame)
-        ret, frame = cap.read()
+        frames = read_video_frames(cap, [total_frames // 2])
         cap.release()
         
-        if not ret:
+        if not frames:
             raise ValueError("Could not read frame from video")
+        frame = frames[0]
         
-        # Resize for performance
+        # Downscale for performance (INTER_AREA averages rather than skips pixels);
+        # smaller frames are used as they are
         target_width = 640
         h, w = frame.shape[:2]
-        scale = target_width / w
-        frame = cv2.resize(frame, (target_width, int(h * scale)))
+        if w > target_width:
+            frame = cv2.resize(frame, (target_width, int(h * target_width / w)), interpolation=cv2.INTER_AREA)
         
-        # Estimate depth
+        # Estimate depth; MiDaS output is only upsampled to the points actually sampled
         if use_midas:
-            depth = estimate_depth_midas(frame)
+            h, w = frame.shape[:2]
+            step = pointcloud_step(h, w, max_points)
+            depth = estimate_depth_midas(frame, size=(-(-h // step), -(-w // step)))
         else:
             depth = estimate_depth_simple(frame)
         
         # Convert depth to point cloud
-        points = depth_to_pointcloud(frame, depth, max_points)
-        
-        logger.info(f"Created point cloud with {len(points)} points")
-        return points
+        positions, colors = depth_to_pointcloud(frame, depth, max_points)
         
+        logger.info(f"Created point cloud with {len(positions)} points")
+        return positions, colors
+    
     except Exception as e:
-        logger.error(f"Point cloud generation failed: {e}")
-        traceback.print_exc()
+        logger.exception(f"Point cloud generation failed: {e}")
         # Return empty point cloud
-        return []
+        return np.empty((0, 3), dtype=np.float32), np.empty((0, 3), dtype=np.uint8)
+
+
+def get_midas_model():
+    """
+    Get the MiDaS model, its input transform and device, loading them on first use.
+    
+    Loading takes seconds and hundreds of MB, so it happens once per process
+    under a lock; concurrent first requests wait for the same load. The model
+    runs in FP16 on a GPU when one is available; the normalized depth it
+    produces only places points, so half precision loses nothing visible.
+    """
+    global _midas_model
+    with _midas_lock:
+        if _midas_model is None:
+            import torch
+            
+            logger.info("Loading MiDaS Small model...")
+            transform = midas_small_transform
+            device = 'cuda' if torch.cuda.is_available() else 'cpu'
+            if device == 'cuda':
+                # Let cuDNN pick the fastest convolution algorithms per input shape
+                torch.backends.cudnn.benchmark = True
+            
+            _midas_model = (load_midas_network(transform, device), transform, device)
+            logger.info(f"MiDaS model loaded ({device})")
+    return _midas_model
+
+
+def load_midas_network(transform, device):
+    """
+    Load the MiDaS Small network as TorchScript.
+    
+    The first process traces and freezes the eager model and saves it under
+    MIDAS_CACHE_DIR; later processes load that file directly. Falls back to
+    the eager model if tracing fails.
+    
+    Args:
+        transform: MiDaS input transform, used to build the tracing example
+        device: 'cuda' (FP16 channels-last weights) or 'cpu' (FP32 weights)
+    """
+    import torch
+    
+    script_path = MIDAS_CACHE_DIR / MIDAS_SCRIPT_NAMES[device]
+    if script_path.exists():
+        try:
+            return torch.jit.load(str(script_path), map_location=device).eval()
+        except Exception as e:
+            logger.warning(f"Could not load traced MiDaS from {script_path}: {e}")
+    
+    model = torch.hub.load("intel-isl/MiDaS", "MiDaS_small", trust_repo=True)
+    model.eval()
+    if device == 'cuda':
+        # NHWC is the layout tensor cores convolve FP16 in; NCHW would be transposed per layer
+        model = model.half().to(device, memory_format=torch.channels_last)
+    
+    try:
+        # Frames are resized to 640px wide before depth estimation
+        example = midas_input(transform, [np.zeros((360, 640, 3), dtype=np.uint8)], device)
+        with torch.no_grad():
+            traced = torch.jit.freeze(torch.jit.trace(model, example))
+        
+        MIDAS_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile(dir=MIDAS_CACHE_DIR, suffix='.tmp', delete=False) as tmp:
+            torch.jit.save(traced, tmp)
+        os.replace(tmp.name, script_path)
+        logger.info(f"Saved traced MiDaS to {script_path}")
+        return traced
+    except Exception as e:
+        logger.warning(f"Could not trace MiDaS, using the eager model: {e}")
+        return model
+
+
+@functools.lru_cache(maxsize=16)
+def midas_input_size(height, width):
+    """
+    Get the (height, width) MiDaS Small resizes an image to.
+    
+    Same rule as the hub's small_transform (keep aspect ratio, upper bound of
+    MIDAS_INPUT_SIZE, multiples of MIDAS_INPUT_MULTIPLE), computed once per
+    source resolution.
+    """
+    scale = min(MIDAS_INPUT_SIZE / height, MIDAS_INPUT_SIZE / width)
+    
+    def constrain(x):
+        y = int(np.round(x / MIDAS_INPUT_MULTIPLE) * MIDAS_INPUT_MULTIPLE)
+        if y > MIDAS_INPUT_SIZE:
+            y = int(np.floor(x / MIDAS_INPUT_MULTIPLE) * MIDAS_INPUT_MULTIPLE)
+        return y
+    
+    return constrain(scale * height), constrain(scale * width)
 
 
-def estimate_depth_midas(frame):
+def midas_small_transform(img_rgb):
+    """
+    Prepare an RGB image as a (3, H, W) float32 MiDaS Small input.
+    
+    Equivalent to the hub's small_transform, without its per-call Compose and
+    sample-dict machinery (and without loading it from torch.hub). The frame
+    is resized while still uint8, so only the small resized image is converted
+    to float; clamping the cubic overshoot to 0-255 changes pixels by well under
+    one grey level on average. The result is a channels-first view of the
+    normalized image; midas_input copies it into the batch, so no contiguous
+    per-image copy or tensor is made here.
+    """
+    new_h, new_w = midas_input_size(*img_rgb.shape[:2])
+    img = cv2.resize(img_rgb, (new_w, new_h), interpolation=cv2.INTER_CUBIC)
+    img = np.multiply(img, MIDAS_PIXEL_SCALE, dtype=np.float32)
+    img -= MIDAS_PIXEL_OFFSET
+    return img.transpose(2, 0, 1)
+
+
+def midas_input(transform, images_rgb, device):
+    """Transform RGB images into one MiDaS input batch on device, in FP16 channels-last on a GPU."""
+    import torch
+    
+    # Each channels-first view is copied once, straight into a contiguous NCHW batch
+    images = [transform(img_rgb) for img_rgb in images_rgb]
+    batch = np.empty((len(images), *images[0].shape), dtype=np.float32)
+    for i, image in enumerate(images):
+        batch[i] = image
+    
+    input_batch = torch.from_numpy(batch).to(device)
+    if device == 'cuda':
+        return input_batch.half().contiguous(memory_format=torch.channels_last)
+    return input_batch
+
+
+def warmup_midas_model():
+    """
+    Load MiDaS and run one forward pass, so the first depth request does not pay for it.
+    
+    The dummy frame has the aspect of a downscaled 16:9 video, the common case,
+    so CUDA kernel selection for that input shape also happens here. Failures
+    are only logged; requests then load the model on first use as before.
+    """
+    try:
+        estimate_depth_midas(np.zeros((360, 640, 3), dtype=np.uint8))
+        logger.info("🔥 MiDaS model warmed up")
+    except Exception as e:
+        logger.warning(f"⚠️  MiDaS warmup failed: {e}")
+
+
+def start_model_warmup():
+    """Warm the MiDaS model in a background thread when PRELOAD_MODELS is set."""
+    if Config.PRELOAD_MODELS and TORCH_AVAILABLE:
+        threading.Thread(target=warmup_midas_model, name='midas-warmup', daemon=True).start()
+
+
+def estimate_depth_midas(frame, size=None):
     """
     Estimate depth using MiDaS (lightweight POC version).
     Uses MiDaS Small model for speed.
+    
+    Args:
+        frame: BGR frame
+        size: (height, width) of the returned depth map (default: the frame's)
+    """
+    return estimate_depth_midas_batch([frame], size)[0]
+
+
+def estimate_depth_midas_batch(frames, size=None):
+    """
+    Estimate depth for several same-sized frames in one MiDaS forward pass.
+    
+    Args:
+        frames: BGR frames, all of the same shape
+        size: (height, width) of the returned depth maps (default: the frames')
+    
+    Returns:
+        float32 array of shape (N, height, width), each map normalized to 0-1
     """
     import torch
-    import cv2
-    import numpy as np
-    
-    # Load MiDaS model (cached after first load)
-    if not hasattr(estimate_depth_midas, 'model'):
-        logger.info("Loading MiDaS Small model...")
-        model_type = "MiDaS_small"  # Lightweight for POC
-        estimate_depth_midas.model = torch.hub.load("intel-isl/MiDaS", model_type, trust_repo=True)
-        estimate_depth_midas.model.eval()
-        
-        midas_transforms = torch.hub.load("intel-isl/MiDaS", "transforms", trust_repo=True)
-        if model_type == "MiDaS_small":
-            estimate_depth_midas.transform = midas_transforms.small_transform
-        else:
-            estimate_depth_midas.transform = midas_transforms.dpt_transform
-        
-        logger.info("MiDaS model loaded")
+    
+    model, transform, device = get_midas_model()
     
     # Prepare input
-    img_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-    input_batch = estimate_depth_midas.transform(img_rgb)
+    images_rgb = [cv2.cvtColor(frame, cv2.COLOR_BGR2RGB) for frame in frames]
+    input_batch = midas_input(transform, images_rgb, device)
     
     # Predict depth
     with torch.no_grad():
-        prediction = estimate_depth_midas.model(input_batch)
+        prediction = model(input_batch).float()
         prediction = torch.nn.functional.interpolate(
             prediction.unsqueeze(1),
-            size=img_rgb.shape[:2],
-            mode="bicubic",
+            size=size or images_rgb[0].shape[:2],
+            mode="bilinear",
             align_corners=False,
-        ).squeeze()
-    
-    depth = prediction.cpu().numpy()
-    
-    # Normalize to 0-1
-    depth = (depth - depth.min()) / (depth.max() - depth.min())
+        ).squeeze(1)
+        
+        # Normalize each map to 0-1 in place, on the model's device before the copy back
+        low, high = torch.aminmax(prediction.flatten(1), dim=1)
+        prediction.sub_(low[:, None, None]).div_((high - low)[:, None, None])
     
-    return depth
+    return prediction.cpu().numpy()
+
+
+# 1-D Gaussian for the fallback depth blur (sigma derived from the size, as GaussianBlur does)
+SIMPLE_DEPTH_KERNEL = cv2.getGaussianKernel(21, 0).astype(np.float32)
 
 
 def estimate_depth_simple(frame):
@@ -971,137 +1214,434 @@ def estimate_depth_simple(frame):
     Simple depth approximation without ML (fallback).
     Uses edge detection and blur as a rough depth proxy.
     """
-    import cv2
-    import numpy as np
-    
     gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
     edges = cv2.Canny(gray, 50, 150)
-    depth = cv2.GaussianBlur(edges.astype(np.float32), (21, 21), 0)
-    depth = depth / depth.max() if depth.max() > 0 else depth
+    # Same 21x21 Gaussian as GaussianBlur, applied separably straight from uint8 to float32
+    depth = cv2.sepFilter2D(edges, cv2.CV_32F, SIMPLE_DEPTH_KERNEL, SIMPLE_DEPTH_KERNEL)
+    peak = depth.max()
+    if peak > 0:
+        depth *= 1.0 / peak
     
     return depth
 
 
+def pointcloud_step(h, w, max_points):
+    """Get the pixel stride that samples at most max_points from an h x w frame."""
+    # Rounding the stride up keeps the count within max_points
+    return max(1, int(np.ceil(np.sqrt((h * w) / max_points))))
+
+
 def depth_to_pointcloud(frame, depth, max_points=10000):
     """
     Convert depth map and RGB frame to 3D point cloud.
     
     Args:
         frame: RGB frame (numpy array)
-        depth: Depth map (numpy array, 0-1 normalized)
+        depth: Depth map (numpy array, 0-1 normalized), either at the frame's
+            resolution or already sampled at the pointcloud_step() grid
         max_points: Maximum number of points to return
     
     Returns:
-        List of point dictionaries with x, y, z, r, g, b
+        Tuple of (float32 positions of shape (N, 3), uint8 RGB colors of shape (N, 3))
     """
-    import numpy as np
-    
-    h, w = depth.shape
+    h, w = frame.shape[:2]
     
     # Create camera intrinsics (approximate)
     fx = fy = w  # Focal length approximation
     cx, cy = w / 2, h / 2
     
     # Sample points uniformly
-    step = max(1, int(np.sqrt((h * w) / max_points)))
+    step = pointcloud_step(h, w, max_points)
+    frame = frame[::step, ::step]
+    z = depth[::step, ::step] if depth.shape == (h, w) else depth
     
-    points = []
-    for y in range(0, h, step):
-        for x in range(0, w, step):
-            z = float(depth[y, x])
-            
-            # Skip points with no depth
-            if z < 0.01:
-                continue
-            
-            # Backproject to 3D
-            # Invert depth so closer objects have larger z
-            z_3d = (1.0 - z) * 10.0  # Scale to reasonable range
-            x_3d = (x - cx) * z_3d / fx
-            y_3d = (cy - y) * z_3d / fy  # Flip Y for 3D coordinates
-            
-            # Get color
-            b, g, r = frame[y, x]
-            
-            points.append({
-                'x': float(x_3d),
-                'y': float(y_3d),
-                'z': float(z_3d),
-                'r': int(r),
-                'g': int(g),
-                'b': int(b)
-            })
+    # Deferred so the Numba import/compile cost is only paid once depth is used
+    from src import pointcloud_kernels
+    if pointcloud_kernels.NUMBA_AVAILABLE:
+        # One pass straight into packed arrays, without mask and gather copies
+        return pointcloud_kernels.backproject_depth(
+            np.ascontiguousarray(z), np.ascontiguousarray(frame),
+            step, float(fx), float(fy), float(cx), float(cy), 0.01
+        )
+    
+    # Skip points with no depth; only the kept points' pixel coordinates are materialized
+    mask = z >= 0.01
+    rows, cols = np.nonzero(mask)
+    
+    # Backproject to 3D in float32
+    # Invert depth so closer objects have larger z
+    z_3d = (1.0 - z[mask].astype(np.float32)) * 10.0  # Scale to reasonable range
+    positions = np.empty((len(z_3d), 3), dtype=np.float32)
+    positions[:, 0] = (cols * step - cx) * z_3d / fx
+    positions[:, 1] = (cy - rows * step) * z_3d / fy  # Flip Y for 3D coordinates
+    positions[:, 2] = z_3d
+    
+    # Get colors (BGR to RGB)
+    colors = np.ascontiguousarray(frame[mask][:, ::-1])
+    
+    return positions, colors
+
+
+def resolve_video_path(video_path):
+    """Resolve an absolute path, /data/ web URL or project-relative path to a video file."""
+    # Handle different path formats
+    video_path_obj = Path(video_path)
+    
+    # Check if it's already an absolute filesystem path
+    if video_path_obj.is_absolute() and video_path_obj.exists():
+        # Already a valid absolute path, use as-is
+        return video_path_obj
+    elif isinstance(video_path, str) and video_path.startswith('/data/'):
+        # This is a web URL path, strip leading slash and resolve relative to project root
+        return Config.DATA_ROOT.parent / video_path.lstrip('/')
+    else:
+        # Relative path, resolve relative to project root
+        return Config.DATA_ROOT.parent / str(video_path)
+
+
+def open_video_capture(video_path):
+    """
+    Open a video file for reading individual frames.
+    
+    The capture's frame queue is cut to one frame so nothing is decoded ahead
+    of the frames actually requested. Only live and streaming backends honor
+    CAP_PROP_BUFFERSIZE; for files it is a no-op and costs nothing.
+    
+    Raises:
+        ValueError: If the video cannot be opened
+    """
+    cap = cv2.VideoCapture(str(video_path))
+    if not cap.isOpened():
+        raise ValueError(f"Could not open video: {video_path}")
+    cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+    return cap
+
+
+def read_video_frames(cap, frame_indices):
+    """
+    Decode the frames at the given indices from an open capture.
+    
+    Args:
+        cap: cv2.VideoCapture positioned at the first frame
+        frame_indices: Frame numbers to read, ideally in ascending order
+    
+    Returns:
+        List of BGR frames; indices that could not be read are left out
+    """
+    return [frame for _, frame in iter_video_frames(cap, frame_indices)]
+
+
+def read_video_frames_av(video_path, frame_count):
+    """
+    Decode frame_count evenly spaced frames of a video with PyAV.
+    
+    Each target is reached by seeking to the keyframe before it and decoding
+    forward, instead of OpenCV's per-seek decode from the start of the GOP.
+    
+    Args:
+        video_path: Path to video file
+        frame_count: Number of frames to extract (min 2)
+    
+    Returns:
+        List of BGR frames
+    """
+    import av
+    
+    frames = []
+    with av.open(str(video_path)) as container:
+        stream = container.streams.video[0]
+        stream.thread_type = 'AUTO'
+        rate = stream.average_rate or stream.guessed_rate
+        total_frames = stream.frames
+        if not total_frames and stream.duration:
+            total_frames = int(stream.duration * stream.time_base * rate)
+        if not total_frames:
+            return frames
+        
+        frame_indices = keyframe_indices(total_frames, frame_count)
+        logger.info(f"Extracting {len(frame_indices)} frames at indices: {frame_indices}")
+        
+        frame_ticks = 1 / (rate * stream.time_base)
+        start = stream.start_time or 0
+        for idx in frame_indices:
+            target_pts = start + round(idx * frame_ticks)
+            container.seek(target_pts, stream=stream, backward=True, any_frame=False)
+            frame = None
+            for frame in container.decode(stream):
+                # Accept frames up to half a frame early to absorb pts rounding
+                if frame.pts is None or frame.pts >= target_pts - frame_ticks / 2:
+                    break
+            # Past the end (frame counts can be estimates): use the last frame decoded
+            if frame is not None:
+                frames.append(frame.to_ndarray(format='bgr24'))
+    return frames
+
+
+def keyframe_indices(total_frames, frame_count):
+    """Get frame_count (min 2) evenly spaced frame indices including the first and last."""
+    frame_count = max(2, min(frame_count, total_frames))
+    return [int(i * (total_frames - 1) / (frame_count - 1)) for i in range(frame_count)]
+
+
+# Take files found on disk per generation directory, with the directory's mtime then
+_verified_take_dirs = {}
+
+
+def cached_takes_exist(takes):
+    """
+    Check that every take of a cached generation is still on disk.
     
-    return points
+    Removing or renaming a file changes its directory's mtime, so once a
+    directory's takes have been found, later checks only stat the directory.
+    
+    Args:
+        takes: The "takes" list of a cached /api/generate response
+    
+    Returns:
+        True if all take videos exist
+    """
+    paths = [resolve_video_path(take['video_url']) for take in takes]
+    needed = {}
+    for path in paths:
+        needed.setdefault(path.parent, set()).add(path.name)
+    
+    try:
+        mtimes = {directory: directory.stat().st_mtime_ns for directory in needed}
+    except FileNotFoundError:
+        return False
+    
+    if all(
+        _verified_take_dirs.get(directory, (None, ()))[0] == mtime
+        and needed[directory] <= _verified_take_dirs[directory][1]
+        for directory, mtime in mtimes.items()
+    ):
+        return True
+    
+    if not all(os.path.isfile(path) for path in paths):
+        return False
+    
+    for directory, mtime in mtimes.items():
+        _verified_take_dirs[directory] = (mtime, frozenset(needed[directory]))
+    return True
+
+
+@functools.cache
+def get_turbojpeg():
+    """
+    Get the shared TurboJPEG encoder.
+    
+    PyTurboJPEG (optional) encodes 2-4x faster than cv2.imencode and is
+    thread-safe, as each call uses its own compressor handle.
+    
+    Returns:
+        TurboJPEG instance, or None when PyTurboJPEG or libturbojpeg is missing
+    """
+    try:
+        from turbojpeg import TurboJPEG
+        return TurboJPEG()
+    except (ImportError, RuntimeError, OSError):
+        return None
 
 
 def extract_video_keyframes(video_path, frame_count=3):
     """Extract evenly distributed frames from video as base64 encoded JPEGs.
     
+    Frames larger than KEYFRAME_MAX_DIM on their longest side are downscaled.
+    
     Args:
         video_path: Path to video file
         frame_count: Number of frames to extract (min 2)
     """
     try:
-        import cv2
-        import base64
-        from pathlib import Path
-        
-        # Handle different path formats
-        video_path_obj = Path(video_path)
-        
-        # Check if it's already an absolute filesystem path
-        if video_path_obj.is_absolute() and video_path_obj.exists():
-            # Already a valid absolute path, use as-is
-            video_path = video_path_obj
-        elif isinstance(video_path, str) and video_path.startswith('/data/'):
-            # This is a web URL path, strip leading slash and resolve relative to project root
-            video_path = Config.DATA_ROOT.parent / video_path.lstrip('/')
-        else:
-            # Relative path, resolve relative to project root
-            video_path = Config.DATA_ROOT.parent / str(video_path)
-        
+        video_path = resolve_video_path(video_path)
         logger.info(f"🎥 Reading video from: {video_path}")
-        cap = cv2.VideoCapture(str(video_path))
-        frames = []
+        prefetch_file(video_path)
         
-        # Get total frame count
-        total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-        
-        if total_frames == 0:
+        if AV_AVAILABLE:
+            raw_frames = read_video_frames_av(video_path, frame_count)
+        else:
+            cap = open_video_capture(video_path)
+            total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+            frame_indices = keyframe_indices(total_frames, frame_count) if total_frames else []
+            logger.info(f"Extracting {len(frame_indices)} frames at indices: {frame_indices}")
+            raw_frames = read_video_frames(cap, frame_indices)
+            cap.release()
+        
+        if not raw_frames:
             logger.warning("Video has no frames")
             return []
         
-        # Ensure frame_count is at least 2
-        frame_count = max(2, min(frame_count, total_frames))
-        
-        # Calculate frame indices to extract
-        if frame_count == 2:
-            # First and last
-            frame_indices = [0, total_frames - 1]
+        # Downscale and encode in parallel; OpenCV and TurboJPEG release the GIL
+        turbojpeg = get_turbojpeg()
+        
+        def encode_jpeg(frame):
+            scale = KEYFRAME_MAX_DIM / max(frame.shape[:2])
+            if scale < 1:
+                frame = cv2.resize(frame, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+            if turbojpeg is not None:
+                buffer = turbojpeg.encode(frame, quality=KEYFRAME_JPEG_QUALITY)  # BGR input by default
+            else:
+                _, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, KEYFRAME_JPEG_QUALITY])
+            return base64.b64encode(buffer).decode('utf-8')
+        
+        if len(raw_frames) > 1:
+            frames = list(get_cpu_pool().map(encode_jpeg, raw_frames))
         else:
-            # Evenly distributed including first and last
-            frame_indices = [int(i * (total_frames - 1) / (frame_count - 1)) for i in range(frame_count)]
+            frames = [encode_jpeg(frame) for frame in raw_frames]
         
-        logger.info(f"Extracting {frame_count} frames at indices: {frame_indices}")
-        
-        # Extract frames
-        for idx in frame_indices:
-            cap.set(cv2.CAP_PROP_POS_FRAMES, idx)
-            ret, frame = cap.read()
-            if ret:
-                _, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, 85])
-                frames.append(base64.b64encode(buffer).decode('utf-8'))
-        
-        cap.release()
         logger.info(f"Successfully extracted {len(frames)} keyframes")
         return frames
-        
+    
     except Exception as e:
         logger.error(f"Failed to extract frames: {e}")
         return []
 
 
+def scene_cache_key(video_path, prompt, frame_count, detail='high'):
+    """
+    Build the scene cache key for a video, prompt, frame count and image detail.
+    
+    Only the first MiB of the video is hashed (plus its size), which is enough
+    to tell generated takes apart without reading whole files per request.
+    """
+    video_path = resolve_video_path(video_path)
+    st = video_path.stat()
+    hasher = hashlib.sha256(video_digest(os.fspath(video_path), st.st_size, st.st_mtime_ns))
+    hasher.update(prompt.encode('utf-8'))
+    hasher.update(str(frame_count).encode())
+    hasher.update(detail.encode())
+    return hasher.hexdigest()[:16]
+
+
+@functools.lru_cache(maxsize=256)
+def video_digest(video_path, size, mtime_ns):
+    """
+    Hash the first MiB and the size of a video.
+    
+    Memoized on size and mtime, so repeated scene requests for an unchanged
+    video skip the read; a rewritten file gets a new mtime and is hashed again.
+    """
+    hasher = hashlib.sha256()
+    with open(video_path, 'rb') as f:
+        hasher.update(f.read(1 << 20))
+    hasher.update(str(size).encode())
+    return hasher.digest()
+
+
+def load_cached_scene(key):
+    """Return the cached scene for key, or None if there is none."""
+    cache_file = SCENE_CACHE_DIR / f'{key}.json'
+    try:
+        with open(cache_file, 'rb') as f:
+            scene_data = orjson.loads(f.read())
+    except (OSError, orjson.JSONDecodeError):
+        return None
+    
+    # Refresh mtime so eviction drops the least recently used scenes first;
+    # a concurrent eviction may already have removed the file, which is harmless
+    with contextlib.suppress(OSError):
+        os.utime(cache_file)
+    return scene_data
+
+
+def store_cached_scene(key, scene_data):
+    """
+    Write a scene to the cache atomically and evict old entries.
+    
+    The file is written under a temporary name and renamed into place, so
+    concurrent requests never read a partially written scene. Once the cache
+    grows past SCENE_CACHE_MAX_BYTES, the least recently used scenes are removed.
+    """
+    SCENE_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=SCENE_CACHE_DIR, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(orjson.dumps(scene_data))
+        os.replace(tmp_path, SCENE_CACHE_DIR / f'{key}.json')
+    except OSError:
+        os.unlink(tmp_path)
+        raise
+    
+    entries = []
+    for cache_file in SCENE_CACHE_DIR.glob('*.json'):
+        try:
+            entries.append((cache_file.stat(), cache_file))
+        except FileNotFoundError:
+            continue
+    
+    total = sum(st.st_size for st, _ in entries)
+    for st, cache_file in sorted(entries, key=lambda entry: entry[0].st_mtime):
+        if total <= SCENE_CACHE_MAX_BYTES:
+            break
+        cache_file.unlink(missing_ok=True)
+        total -= st.st_size
+
+
+def parse_json_object(text):
+    """
+    Parse the JSON object in a model reply.
+    
+    Replies are usually bare JSON but may come in a ```json fence or with
+    prose around them. Otherwise each '{' is tried in turn, with its closing
+    brace found by a linear scan that ignores braces inside strings.
+    
+    Args:
+        text: Model reply
+    
+    Returns:
+        The parsed object
+    
+    Raises:
+        orjson.JSONDecodeError: If the reply contains no valid JSON object
+    """
+    text = text.strip()
+    if text.startswith('```'):
+        text = text.removeprefix('```json').removeprefix('```').removesuffix('```').strip()
+    
+    try:
+        return orjson.loads(text)
+    except orjson.JSONDecodeError as e:
+        error = e
+    
+    start = text.find('{')
+    while start != -1:
+        end = find_closing_brace(text, start)
+        if end == -1:
+            break
+        try:
+            return orjson.loads(text[start:end + 1])
+        except orjson.JSONDecodeError as e:
+            error = e
+        start = text.find('{', start + 1)
+    
+    raise error
+
+
+def find_closing_brace(text, start):
+    """Find the index of the brace closing the one at start, or -1 if unbalanced."""
+    depth = 0
+    in_string = False
+    escaped = False
+    for i in range(start, len(text)):
+        char = text[i]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == '\\':
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char == '{':
+            depth += 1
+        elif char == '}':
+            depth -= 1
+            if depth == 0:
+                return i
+    return -1
+
+
 def get_default_scene():
     """Return a default scene configuration."""
     return {
@@ -1127,8 +1667,30 @@ def internal_error(e):
     return jsonify({'error': 'Internal server error'}), 500
 
 
+@app.errorhandler(Exception)
+def unhandled_exception(e):
+    """
+    Log an exception that escaped a route and return it as a JSON 500.
+    
+    HTTP errors raised by Flask itself (bad JSON, wrong method, ...) keep
+    their own status code.
+    """
+    if isinstance(e, HTTPException):
+        return e
+    
+    logger.exception(f"Error in {request.endpoint}: {e}")
+    return jsonify({'error': str(e), 'success': False}), 500
+
+
 def main():
-    """Run the Flask application."""
+    """
+    Run the Flask application.
+    
+    With FLASK_DEBUG the Werkzeug development server (with reloader) is used.
+    Otherwise the process execs gunicorn with threaded workers, as the Procfile
+    does. Generation progress lives in process memory unless REDIS_URL is set,
+    so more than one worker is only started with Redis.
+    """
     app_logger.info("=" * 60)
     app_logger.info("Starting Sora Director Application")
     app_logger.info("=" * 60)
@@ -1138,13 +1700,36 @@ def main():
     app_logger.info(f"Data Root: {Config.DATA_ROOT}")
     app_logger.info("=" * 60)
     
+    if not Config.FLASK_DEBUG:
+        gunicorn = shutil.which('gunicorn')
+        if gunicorn:
+            workers = (os.cpu_count() or 1) if Config.REDIS_URL else 1
+            os.execv(gunicorn, [
+                gunicorn,
+                '--chdir', str(Config.BASE_DIR),
+                '--bind', f'{Config.HOST}:{Config.PORT}',
+                '--workers', str(workers),
+                '--threads', '8',
+                '--timeout', '120',
+                'src.main:app'
+            ])
+        app_logger.warning("gunicorn not found, falling back to the development server")
+    
+    # The reloader's watcher process never serves requests, so only its child warms up
+    if not Config.FLASK_DEBUG or os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        start_model_warmup()
+    
     app.run(
         host=Config.HOST,
         port=Config.PORT,
-        debug=Config.FLASK_DEBUG
+        debug=Config.FLASK_DEBUG,
+        threaded=True
     )
 
 
 if __name__ == '__main__':
     main()
+else:
+    # Imported by gunicorn (or another WSGI server): warm up in each worker
+    start_model_warmup()
 
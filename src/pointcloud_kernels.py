@@ -0,0 +1,59 @@
+"""
+Numeric kernels for depth-based point cloud reconstruction.
+Compiled with Numba when available; callers check NUMBA_AVAILABLE and keep a
+NumPy path for when it is not, since these loops are slow as plain Python.
+"""
+import numpy as np
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    
+    def njit(*args, **kwargs):
+        """Fallback decorator used when Numba is not installed."""
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+
+@njit(cache=True, fastmath=True, boundscheck=False)
+def backproject_depth(depth, frame, step, fx, fy, cx, cy, min_depth):
+    """
+    Backproject a sampled depth map into a packed point cloud.
+    
+    Points closer than min_depth are skipped as they are found, so a sparse
+    depth map costs no boolean mask or gather copies.
+    
+    Args:
+        depth: Depth sampled every step pixels, normalized to 0-1, shape (H, W)
+        frame: BGR uint8 frame sampled at the same pixels, shape (H, W, 3)
+        step: Sampling stride in source pixels, to recover pixel coordinates
+        fx, fy: Focal lengths in pixels
+        cx, cy: Principal point in pixels
+        min_depth: Smallest depth value kept
+    
+    Returns:
+        Tuple of (float32 positions of shape (N, 3), uint8 RGB colors of shape (N, 3))
+    """
+    h, w = depth.shape
+    positions = np.empty((h * w, 3), dtype=np.float32)
+    colors = np.empty((h * w, 3), dtype=np.uint8)
+    n = 0
+    for i in range(h):
+        for j in range(w):
+            z = depth[i, j]
+            if z < min_depth:
+                continue
+            # Invert depth so closer objects have larger z
+            z_3d = (1.0 - z) * 10.0
+            positions[n, 0] = (j * step - cx) * z_3d / fx
+            positions[n, 1] = (cy - i * step) * z_3d / fy  # Flip Y for 3D coordinates
+            positions[n, 2] = z_3d
+            # BGR to RGB
+            colors[n, 0] = frame[i, j, 2]
+            colors[n, 1] = frame[i, j, 1]
+            colors[n, 2] = frame[i, j, 0]
+            n += 1
+    return positions[:n], colors[:n]
@@ -11,6 +11,29 @@ from .utils.logger import setup_logger
 logger = setup_logger(__name__)
 
 
+def _terms_pattern(terms: List[str]) -> re.Pattern:
+    """Compile a case-insensitive pattern matching any of the terms as a substring."""
+    return re.compile('|'.join(re.escape(term) for term in terms), re.IGNORECASE)
+
+
+# Prompt analysis vocabularies, each scanned in one regex pass
+ACTION_PATTERN = _terms_pattern([
+    'walk', 'run', 'jump', 'fly', 'swim', 'drive', 'move', 'spin',
+    'rotate', 'explor', 'travel', 'float', 'dance', 'fight'
+])
+ENVIRONMENT_PATTERN = _terms_pattern([
+    'hallway', 'room', 'street', 'forest', 'beach', 'city', 'space',
+    'indoor', 'outdoor', 'building', 'landscape', 'scene', 'environment'
+])
+STYLE_PATTERN = _terms_pattern([
+    'cinematic', 'artistic', 'realistic', 'cartoon', 'anime', 'photorealistic',
+    'stylized', 'abstract', 'dramatic', 'beautiful', 'stunning'
+])
+QUALITY_PATTERN = _terms_pattern(['high quality', 'detailed', 'cinematic', '4k', '8k'])
+# Terms that make the general "cinematic shot" enhancement unnecessary
+ENHANCEMENT_QUALITY_PATTERN = _terms_pattern(['high quality', 'cinematic', '4k', 'detailed'])
+
+
 class PromptReviser:
     """Revises prompts based on agent feedback and quality metrics."""
     
@@ -73,19 +96,16 @@ class PromptReviser:
         logger.info(f"Found {len(violations)} violations to address")
         
         revised_prompt = original_prompt.strip()
+        prompt_lower = revised_prompt.lower()
         
         # Collect all relevant improvements
         improvements = []
         
-        # Add improvements based on violations
-        for violation in violations:
-            violation_type = violation.get('type', '')
-            severity = violation.get('severity', 'medium')
-            
+        # Add improvements based on violations (each type only needs checking once)
+        for violation_type in dict.fromkeys(v.get('type', '') for v in violations):
             if violation_type in self.revision_rules:
-                # Select appropriate revision based on severity
                 rule = self.revision_rules[violation_type][0]
-                if rule not in revised_prompt.lower():
+                if rule not in prompt_lower:
                     improvements.append(rule)
         
         # Add improvements based on low scores
@@ -120,17 +140,16 @@ class PromptReviser:
         Returns:
             Prompt with improvements applied
         """
-        # Check if prompt already ends with a comma or period
-        prompt = prompt.rstrip()
-        
-        # Remove trailing punctuation if present
-        if prompt.endswith(('.', ',', ';')):
-            prompt = prompt[:-1]
+        # Remove trailing whitespace and punctuation before appending clauses
+        prompt = prompt.rstrip(' \t\n.,;')
         
-        # Add improvements
+        # Add improvements, keeping a lowered copy in step instead of re-lowering per check
+        prompt_lower = prompt.lower()
         for improvement in improvements:
-            if improvement.lower() not in prompt.lower():
+            improvement_lower = improvement.lower()
+            if improvement_lower not in prompt_lower:
                 prompt = f"{prompt}, {improvement}"
+                prompt_lower = f"{prompt_lower}, {improvement_lower}"
         
         return prompt
     
@@ -145,8 +164,7 @@ class PromptReviser:
             Enhanced prompt
         """
         # Add quality modifiers if not present
-        quality_terms = ['high quality', 'cinematic', '4k', 'detailed']
-        has_quality = any(term in prompt.lower() for term in quality_terms)
+        has_quality = ENHANCEMENT_QUALITY_PATTERN.search(prompt) is not None
         
         if not has_quality and len(prompt.split()) < 30:  # Don't add if prompt is already long
             prompt = f"{prompt}, cinematic shot"
@@ -208,10 +226,7 @@ class PromptReviser:
             'has_action': bool(self._extract_action(prompt)),
             'has_environment': bool(self._extract_environment(prompt)),
             'has_style': bool(self._extract_style(prompt)),
-            'has_quality_terms': any(
-                term in prompt.lower()
-                for term in ['high quality', 'detailed', 'cinematic', '4k', '8k']
-            ),
+            'has_quality_terms': QUALITY_PATTERN.search(prompt) is not None,
             'suggestions': []
         }
         
@@ -242,40 +257,19 @@ class PromptReviser:
         return ""
     
     def _extract_action(self, prompt: str) -> str:
-        """Extract action verbs from a prompt."""
-        action_verbs = [
-            'walk', 'run', 'jump', 'fly', 'swim', 'drive', 'move', 'spin',
-            'rotate', 'explor', 'travel', 'float', 'dance', 'fight'
-        ]
-        prompt_lower = prompt.lower()
-        for verb in action_verbs:
-            if verb in prompt_lower:
-                return verb
-        return ""
+        """Extract the first action verb in a prompt."""
+        match = ACTION_PATTERN.search(prompt)
+        return match.group().lower() if match else ""
     
     def _extract_environment(self, prompt: str) -> str:
-        """Extract environment descriptors from a prompt."""
-        env_terms = [
-            'hallway', 'room', 'street', 'forest', 'beach', 'city', 'space',
-            'indoor', 'outdoor', 'building', 'landscape', 'scene', 'environment'
-        ]
-        prompt_lower = prompt.lower()
-        for term in env_terms:
-            if term in prompt_lower:
-                return term
-        return ""
+        """Extract the first environment descriptor in a prompt."""
+        match = ENVIRONMENT_PATTERN.search(prompt)
+        return match.group().lower() if match else ""
     
     def _extract_style(self, prompt: str) -> str:
-        """Extract style descriptors from a prompt."""
-        style_terms = [
-            'cinematic', 'artistic', 'realistic', 'cartoon', 'anime', 'photorealistic',
-            'stylized', 'abstract', 'dramatic', 'beautiful', 'stunning'
-        ]
-        prompt_lower = prompt.lower()
-        for term in style_terms:
-            if term in prompt_lower:
-                return term
-        return ""
+        """Extract the first style descriptor in a prompt."""
+        match = STYLE_PATTERN.search(prompt)
+        return match.group().lower() if match else ""
     
     def create_revision_explanation(
         self,
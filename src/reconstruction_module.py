@@ -2,16 +2,112 @@
 3D reconstruction module for converting videos to playable worlds.
 Wraps video-to-3D reconstruction tools (e.g., video Gaussian splatting).
 """
+import os
+import secrets
+import shutil
 import subprocess
+import tempfile
 import time
 from pathlib import Path
 from typing import Optional
 
+import cv2
+import httpx
+import numpy as np
+
 from .config import Config
+from .utils.file_manager import content_digest
 from .utils.logger import setup_logger
+from .utils.pools import get_cpu_pool
+from .utils.video import iter_video_frames
 
 logger = setup_logger(__name__)
 
+# Bytes per read/write when streaming a video to, and its result from, the
+# reconstruction service (httpx's own multipart encoder reads 64 KB at a time)
+TRANSFER_CHUNK_SIZE = 1 << 20
+
+# Bytes of a failed reconstruction tool's stderr log included in the error
+CLI_ERROR_TAIL_BYTES = 4096
+
+# Decoded frames allowed to wait for depth estimation at once; decoding pauses
+# beyond this so a slow pool doesn't hold every sampled frame in memory
+DEPTH_FRAMES_IN_FLIGHT = 2 * (os.cpu_count() or 1)
+
+# Point cloud vertices as written to binary PLY files
+PLY_VERTEX_DTYPE = np.dtype([
+    ('x', '<f4'), ('y', '<f4'), ('z', '<f4'),
+    ('red', 'u1'), ('green', 'u1'), ('blue', 'u1'),
+])
+
+# PLY type names for the field types used in vertex records
+PLY_PROPERTY_TYPES = {np.dtype('<f4'): 'float', np.dtype('u1'): 'uchar'}
+
+# Extracted depth maps, one directory per video content digest
+DEPTH_CACHE_DIR = Config.DATA_ROOT / '.depth_cache'
+
+
+
+def _ply_header(dtype: np.dtype, num_vertices: int) -> bytes:
+    """Build a binary little-endian PLY header for vertex records of a structured dtype."""
+    properties = ''.join(
+        f"property {PLY_PROPERTY_TYPES[dtype[name]]} {name}\n"
+        for name in dtype.names
+    )
+    header = (
+        "ply\n"
+        "format binary_little_endian 1.0\n"
+        f"element vertex {num_vertices}\n"
+        f"{properties}"
+        "end_header\n"
+    )
+    return header.encode('ascii')
+
+
+def write_ply(output_path: Path, vertices: np.ndarray):
+    """
+    Write vertex records to a binary little-endian PLY file.
+    
+    The header is generated from the array's fields and the records are
+    written in one call, with no per-point text formatting.
+    
+    Args:
+        output_path: Output PLY file path
+        vertices: Structured array with a PLY_PROPERTY_TYPES type per field
+    """
+    with output_path.open('wb') as f:
+        f.write(_ply_header(vertices.dtype, len(vertices)))
+        vertices.tofile(f)
+
+
+def create_ply(output_path: Path, num_vertices: int, dtype: np.dtype = PLY_VERTEX_DTYPE) -> np.ndarray:
+    """
+    Create a binary PLY file and map its vertex records into memory.
+    
+    For large clouds, fill the returned array in batches and flush() it
+    instead of building the points in RAM and writing them out: writes go
+    straight to the page cache, so the cloud is never held twice.
+    
+    Args:
+        output_path: Output PLY file path
+        num_vertices: Number of vertex records the file holds
+        dtype: Structured vertex dtype with a PLY_PROPERTY_TYPES type per field
+    
+    Returns:
+        Writable memory map over the file's vertex records (a plain empty
+        array, with nothing to flush, when num_vertices is 0)
+    """
+    dtype = np.dtype(dtype)
+    header = _ply_header(dtype, num_vertices)
+    with output_path.open('wb') as f:
+        f.write(header)
+        f.truncate(len(header) + num_vertices * dtype.itemsize)
+    
+    if num_vertices == 0:
+        # An empty file region cannot be mapped
+        return np.empty(0, dtype=dtype)
+    return np.memmap(output_path, dtype=dtype, mode='r+', offset=len(header), shape=(num_vertices,))
+
 
 class ReconstructionModule:
     """Handles video-to-3D reconstruction."""
@@ -124,6 +220,11 @@ MOCK_3D_ASSET_DATA
         """
         Call a remote reconstruction service via HTTP.
         
+        The video is streamed to the service in chunks and the result is
+        streamed to disk, so neither is ever held in memory whole. The
+        multipart body is built here so the upload goes out in
+        TRANSFER_CHUNK_SIZE reads with a known Content-Length.
+        
         Args:
             video_path: Input video path
             output_path: Output file path
@@ -131,26 +232,45 @@ MOCK_3D_ASSET_DATA
         Returns:
             Path to reconstructed file
         """
-        import requests
-        
         logger.info(f"Calling reconstruction service: {self.service_url}")
         
-        with video_path.open('rb') as f:
-            files = {'video': f}
-            data = {'format': output_path.suffix[1:]}  # Remove leading dot
-            
-            response = requests.post(
-                f"{self.service_url}/reconstruct",
-                files=files,
-                data=data,
-                timeout=self.timeout
-            )
-            
+        boundary = secrets.token_hex(16)
+        filename = video_path.name.replace('"', '%22')
+        head = (
+            f'--{boundary}\r\n'
+            f'Content-Disposition: form-data; name="format"\r\n\r\n'
+            f'{output_path.suffix[1:]}\r\n'  # Remove leading dot
+            f'--{boundary}\r\n'
+            f'Content-Disposition: form-data; name="video"; filename="{filename}"\r\n'
+            f'Content-Type: video/mp4\r\n\r\n'
+        ).encode()
+        tail = f'\r\n--{boundary}--\r\n'.encode()
+        
+        def body():
+            yield head
+            with video_path.open('rb') as f:
+                while chunk := f.read(TRANSFER_CHUNK_SIZE):
+                    yield chunk
+            yield tail
+        
+        headers = {
+            'Content-Type': f'multipart/form-data; boundary={boundary}',
+            'Content-Length': str(len(head) + video_path.stat().st_size + len(tail)),
+        }
+        
+        with httpx.stream(
+            'POST',
+            f"{self.service_url}/reconstruct",
+            content=body(),
+            headers=headers,
+            timeout=self.timeout
+        ) as response:
             response.raise_for_status()
             
             # Save response to output file
             with output_path.open('wb') as out:
-                out.write(response.content)
+                for chunk in response.iter_bytes(TRANSFER_CHUNK_SIZE):
+                    out.write(chunk)
         
         logger.info("Reconstruction service call successful")
         return output_path
@@ -159,6 +279,9 @@ MOCK_3D_ASSET_DATA
         """
         Call a local command-line reconstruction tool.
         
+        Its stdout and stderr are written to .stdout.log and .stderr.log files
+        beside output_path.
+        
         Args:
             video_path: Input video path
             output_path: Output file path
@@ -181,20 +304,23 @@ MOCK_3D_ASSET_DATA
         
         logger.info(f"Running reconstruction command: {' '.join(cmd)}")
         
-        result = subprocess.run(
-            cmd,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            timeout=self.timeout
-        )
+        # The tool's output goes to log files next to the result rather than
+        # into this process's memory
+        stdout_path = output_path.with_suffix('.stdout.log')
+        stderr_path = output_path.with_suffix('.stderr.log')
+        with stdout_path.open('wb') as stdout, stderr_path.open('wb') as stderr:
+            result = subprocess.run(cmd, stdout=stdout, stderr=stderr, timeout=self.timeout)
         
         if result.returncode != 0:
-            error_msg = result.stderr.decode('utf-8')
+            # Only the end of the log, where the failure is reported, is read back
+            with stderr_path.open('rb') as stderr:
+                stderr.seek(max(0, stderr_path.stat().st_size - CLI_ERROR_TAIL_BYTES))
+                error_tail = stderr.read()
+            logger.error(f"Reconstruction tool failed, end of {stderr_path}:\n{error_tail.decode('utf-8', 'replace')}")
             raise subprocess.CalledProcessError(
                 result.returncode,
                 cmd,
-                output=result.stdout,
-                stderr=result.stderr
+                stderr=error_tail
             )
         
         logger.info("CLI reconstruction completed successfully")
@@ -227,40 +353,43 @@ MOCK_3D_ASSET_DATA
         
         else:
             try:
-                import cv2
-                import numpy as np
-                
                 logger.info(f"Extracting depth maps from {video_path}")
                 
+                cache_dir = None
+                if Config.ENABLE_CACHING:
+                    cache_dir = DEPTH_CACHE_DIR / content_digest(video_path)
+                    if cache_dir.is_dir():
+                        depth_maps = self._link_depth_maps(sorted(cache_dir.glob('depth_*.png')), output_dir)
+                        logger.info(f"Reused {len(depth_maps)} cached depth maps")
+                        return depth_maps
+                
                 # Open video
                 cap = cv2.VideoCapture(str(video_path))
                 if not cap.isOpened():
                     raise ValueError(f"Could not open video: {video_path}")
                 
                 total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-                fps = cap.get(cv2.CAP_PROP_FPS)
                 
                 # Sample frames (every 10th frame or max 30 frames)
                 frame_indices = list(range(0, total_frames, max(1, total_frames // 30)))[:30]
                 
-                depth_maps = []
-                for idx in frame_indices:
-                    cap.set(cv2.CAP_PROP_POS_FRAMES, idx)
-                    ret, frame = cap.read()
-                    
-                    if not ret:
-                        continue
-                    
-                    # Estimate depth (placeholder - would use MiDaS/DPT in production)
-                    depth_map = self._estimate_depth(frame)
-                    
-                    # Save depth map
+                # Samples are read forward rather than seeked to. Depth
+                # estimation and PNG encoding release the GIL, so they run on
+                # the CPU pool while the next frames decode, with at most
+                # DEPTH_FRAMES_IN_FLIGHT frames queued ahead of the pool.
+                pending = []
+                for idx, frame in iter_video_frames(cap, frame_indices):
+                    if len(pending) >= DEPTH_FRAMES_IN_FLIGHT:
+                        pending[-DEPTH_FRAMES_IN_FLIGHT].result()
                     depth_path = output_dir / f"depth_{idx:04d}.png"
-                    cv2.imwrite(str(depth_path), depth_map)
-                    depth_maps.append(depth_path)
+                    pending.append(get_cpu_pool().submit(self._save_depth_map, frame, depth_path))
                 
                 cap.release()
+                depth_maps = [future.result() for future in pending]
                 logger.info(f"Extracted {len(depth_maps)} depth maps")
+                
+                if cache_dir is not None:
+                    self._store_cached_depth_maps(depth_maps, cache_dir)
                 return depth_maps
                 
             except Exception as e:
@@ -268,6 +397,46 @@ MOCK_3D_ASSET_DATA
                 logger.warning("Falling back to mock depth maps")
                 return self.extract_depth_maps(video_path, output_dir)  # Recursive call with mock
     
+    def _link_depth_maps(self, depth_maps: list, dest_dir: Path) -> list:
+        """Hard-link depth maps into dest_dir (copying across filesystems)."""
+        dest_dir.mkdir(parents=True, exist_ok=True)
+        linked = []
+        for depth_map in depth_maps:
+            dest = dest_dir / depth_map.name
+            dest.unlink(missing_ok=True)
+            try:
+                os.link(depth_map, dest)
+            except OSError:
+                shutil.copy2(depth_map, dest)
+            linked.append(dest)
+        return linked
+    
+    def _store_cached_depth_maps(self, depth_maps: list, cache_dir: Path):
+        """
+        Add extracted depth maps to the cache.
+        
+        They are linked into a temporary directory that is renamed into place,
+        so a cache directory only ever appears complete; if another worker
+        stored the same video first, its copy is kept.
+        """
+        DEPTH_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        tmp_dir = Path(tempfile.mkdtemp(dir=DEPTH_CACHE_DIR, suffix='.tmp'))
+        try:
+            self._link_depth_maps(depth_maps, tmp_dir)
+            tmp_dir.rename(cache_dir)
+        except OSError as e:
+            logger.debug(f"Depth maps not cached: {e}")
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+    
+    def _save_depth_map(self, frame, depth_path: Path) -> Path:
+        """Estimate a frame's depth and write it to depth_path as a PNG."""
+        # Estimate depth (placeholder - would use MiDaS/DPT in production)
+        depth_map = self._estimate_depth(frame)
+        # The old file may be a hard link into DEPTH_CACHE_DIR; write a new one
+        depth_path.unlink(missing_ok=True)
+        cv2.imwrite(str(depth_path), depth_map)
+        return depth_path
+    
     def _estimate_depth(self, frame):
         """
         Estimate depth from a single frame.
@@ -279,9 +448,6 @@ MOCK_3D_ASSET_DATA
         Returns:
             Depth map (numpy array)
         """
-        import numpy as np
-        import cv2
-        
         # Placeholder: Simple gradient-based depth estimation
         # In production, replace with:
         # - MiDaS (https://github.com/isl-org/MiDaS)
@@ -337,8 +503,6 @@ MOCK_3D_ASSET_DATA
             depth_maps: List of depth map file paths
             output_path: Output PLY file path
         """
-        import numpy as np
-        
         logger.info(f"Generating point cloud from {len(depth_maps)} depth maps")
         
         # Mock implementation
@@ -348,24 +512,13 @@ MOCK_3D_ASSET_DATA
         # 3. Merge point clouds from multiple views
         # 4. Optimize Gaussian Splatting parameters
         
-        mock_ply = """ply
-format ascii 1.0
-element vertex 100
-property float x
-property float y
-property float z
-property uchar red
-property uchar green
-property uchar blue
-end_header
-"""
-        # Add mock points
-        for i in range(100):
-            x, y, z = np.random.randn(3)
-            r, g, b = np.random.randint(0, 255, 3)
-            mock_ply += f"{x} {y} {z} {r} {g} {b}\n"
+        num_points = 100
+        vertices = create_ply(output_path, num_points)
+        vertices['x'], vertices['y'], vertices['z'] = np.random.randn(3, num_points)
+        for channel in ('red', 'green', 'blue'):
+            vertices[channel] = np.random.randint(0, 255, num_points)
         
-        output_path.write_text(mock_ply)
+        vertices.flush()
         logger.info(f"Point cloud saved: {output_path}")
     
     def optimize_scene(self, asset_path: Path) -> Path:
@@ -381,9 +534,9 @@ end_header
         optimized_path = asset_path.parent / f"{asset_path.stem}_optimized{asset_path.suffix}"
         
         if self.use_mock:
-            # Mock: just copy
-            import shutil
-            shutil.copy(asset_path, optimized_path)
+            # Mock: just copy (copyfile copies in the kernel on Linux, with
+            # copy_file_range/sendfile, and skips copying permission bits)
+            shutil.copyfile(asset_path, optimized_path)
             logger.info(f"Created mock optimized asset: {optimized_path}")
         else:
             # Real optimization would go here
@@ -2,18 +2,69 @@
 Sora API handler for video generation.
 Supports both mock mode (for development) and production mode (real API calls).
 """
+import contextlib
+import functools
+import os
 import time
 import random
+import shutil
+import threading
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Tuple
 import subprocess
 
 from .config import Config
 from .utils.logger import setup_logger
 from .utils.file_manager import get_video_path
+from .utils.openai_client import get_openai_client
+from .utils.pools import get_io_pool
 
 logger = setup_logger(__name__)
 
+# Written in place of a mock video when ffmpeg is unavailable
+MOCK_VIDEO_PLACEHOLDER = b'MOCK_VIDEO_DATA' * 1000
+
+# Finished videos are streamed to disk in pieces of this many bytes
+DOWNLOAD_CHUNK_SIZE = 1 << 20
+
+# Sora job status polls back off exponentially from 1 s up to this many seconds
+POLL_MAX_DELAY_SECONDS = 30
+
+# Sora jobs being polled in this process: {video_id: event set by a webhook}
+_video_job_events: Dict[str, threading.Event] = {}
+_video_job_events_lock = threading.Lock()
+
+
+def notify_video_job(video_id: str) -> bool:
+    """
+    Wake the poller of a Sora job, e.g. when a video webhook arrives.
+    
+    Args:
+        video_id: Sora video job ID
+    
+    Returns:
+        True if the job is being polled in this process
+    """
+    with _video_job_events_lock:
+        event = _video_job_events.get(video_id)
+    if event is None:
+        return False
+    event.set()
+    return True
+
+
+@contextlib.contextmanager
+def _watch_video_job(video_id: str):
+    """Register a Sora job for webhook notifications while it is polled."""
+    event = threading.Event()
+    with _video_job_events_lock:
+        _video_job_events[video_id] = event
+    try:
+        yield event
+    finally:
+        with _video_job_events_lock:
+            _video_job_events.pop(video_id, None)
+
 
 class SoraHandler:
     """Handles video generation via Sora API or mock implementation."""
@@ -45,7 +96,7 @@ class SoraHandler:
         duration: int = None,
         resolution: str = None,
         fps: int = None
-    ) -> List[Path]:
+    ) -> Tuple[List[Path], str]:
         """
         Generate multiple video takes from a prompt.
         
@@ -58,7 +109,9 @@ class SoraHandler:
             fps: Frames per second (default: from Config)
         
         Returns:
-            List of paths to generated video files
+            Tuple of (paths to generated video files, actual mode): the mode is
+            'REAL' only if every take came from the Sora API, and 'MOCK' if any
+            take was mocked or fell back to mock generation
         """
         duration = duration or Config.VIDEO_DURATION_SECONDS
         resolution = resolution or Config.VIDEO_RESOLUTION
@@ -68,73 +121,152 @@ class SoraHandler:
         logger.info(f"Settings: duration={duration}s, resolution={resolution}, fps={fps}")
         
         output_dir.mkdir(parents=True, exist_ok=True)
-        video_paths = []
+        takes = range(1, num_takes + 1)
         
-        for i in range(1, num_takes + 1):
-            video_path = output_dir / f"take_{i}.mp4"
+        if self.use_mock:
+            # One ffmpeg process renders every mock take
+            video_paths = [output_dir / f"take_{take}.mp4" for take in takes]
+            self._generate_mock_videos(video_paths, duration, resolution, fps)
+            logger.info(f"Generated {num_takes} mock takes in {output_dir}")
+            return video_paths, 'MOCK'
+        
+        if num_takes < 2:
+            results = [
+                self.generate_one_take(prompt, output_dir, take, duration, resolution, fps)
+                for take in takes
+            ]
+        else:
+            # Sora jobs are independent, so poll them concurrently and report
+            # the slowest take's progress to keep the overall figure monotonic.
+            # A single take's status says nothing about the batch, so the batch
+            # stays in progress; the caller decides when generation is done
+            take_progress = dict.fromkeys(takes, 0)
+            progress_lock = threading.Lock()
             
-            if self.use_mock:
-                self._generate_mock_video(video_path, duration, resolution, fps)
-            else:
-                self._generate_real_video(prompt, video_path, duration, resolution, fps, seed=i)
+            def report_progress(take, status, progress, message):
+                with progress_lock:
+                    take_progress[take] = progress or 0
+                    overall = min(take_progress.values())
+                    if self.progress_callback:
+                        self.progress_callback(
+                            status='in_progress',
+                            progress=overall,
+                            message=f"Generating {num_takes} videos: {overall}%"
+                        )
             
-            video_paths.append(video_path)
-            logger.info(f"Generated take {i}/{num_takes}: {video_path}")
+            results = list(get_io_pool().map(
+                lambda take: self.generate_one_take(
+                    prompt, output_dir, take, duration, resolution, fps,
+                    progress_callback=functools.partial(report_progress, take)
+                ),
+                takes
+            ))
         
-        return video_paths
+        video_paths = [video_path for video_path, _ in results]
+        all_real = all(is_real for _, is_real in results)
+        return video_paths, 'REAL' if all_real else 'MOCK'
     
-    def _generate_mock_video(
+    def generate_one_take(
         self,
-        output_path: Path,
+        prompt: str,
+        output_dir: Path,
+        take: int,
+        duration: int,
+        resolution: str,
+        fps: int,
+        progress_callback=None
+    ) -> Tuple[Path, bool]:
+        """
+        Generate a single take into output_dir/take_<take>.mp4.
+        
+        Args:
+            prompt: Text description of the video to generate
+            output_dir: Directory to save the video
+            take: 1-based take number, also used as the seed
+            duration: Video duration in seconds
+            resolution: Video resolution
+            fps: Frames per second
+            progress_callback: Overrides the handler's progress callback for this take
+        
+        Returns:
+            Tuple of (video path, True if the video came from the Sora API)
+        """
+        video_path = output_dir / f"take_{take}.mp4"
+        
+        if self.use_mock:
+            self._generate_mock_videos([video_path], duration, resolution, fps)
+            is_real = False
+        else:
+            is_real = self._generate_real_video(
+                prompt, video_path, duration, resolution, fps,
+                seed=take, progress_callback=progress_callback
+            )
+        
+        logger.info(f"Generated take {take}: {video_path}")
+        return video_path, is_real
+    
+    def _generate_mock_videos(
+        self,
+        output_paths: List[Path],
         duration: int,
         resolution: str,
         fps: int
     ):
         """
-        Generate a mock video file (placeholder for development).
+        Generate mock video files (placeholders for development).
+        
+        A single ffmpeg process writes every output, so a batch of takes pays
+        for one process start rather than one per take.
         
         Args:
-            output_path: Where to save the video
+            output_paths: Where to save the videos
             duration: Video duration in seconds
             resolution: Video resolution (e.g., "1024x576")
             fps: Frames per second
         """
         # Simulate API delay
-        time.sleep(random.uniform(0.5, 1.5))
+        if Config.MOCK_SIMULATE_LATENCY:
+            time.sleep(random.uniform(0.5, 1.5))
         
         # Parse resolution
         width, height = map(int, resolution.split('x'))
         
-        # Create a simple test video using ffmpeg (if available)
-        # Fall back to creating an empty file if ffmpeg is not available
+        # Create simple test videos using ffmpeg (if available)
+        # Fall back to creating placeholder files if ffmpeg is not available
         try:
+            # A flat color source at the fastest x264 preset: mock takes only
+            # need to be valid, playable files, and testsrc plus the default
+            # preset cost seconds of CPU per take
             cmd = [
                 'ffmpeg',
+                '-loglevel', 'error',
                 '-f', 'lavfi',
-                '-i', f'testsrc=duration={duration}:size={width}x{height}:rate={fps}',
-                '-pix_fmt', 'yuv420p',
-                '-y',  # Overwrite output file
-                str(output_path)
+                '-i', f'color=c=black:duration={duration}:size={width}x{height}:rate={fps}',
+                '-y',  # Overwrite output files
             ]
+            for output_path in output_paths:
+                # Output options apply to the file that follows them
+                cmd += ['-preset', 'ultrafast', '-pix_fmt', 'yuv420p', str(output_path)]
             
-            result = subprocess.run(
+            # At error level stderr stays empty on success, so only failures
+            # produce output to capture
+            subprocess.run(
                 cmd,
-                stdout=subprocess.PIPE,
+                stdout=subprocess.DEVNULL,
                 stderr=subprocess.PIPE,
-                timeout=duration + 10
+                timeout=duration * len(output_paths) + 10,
+                check=True
             )
             
-            if result.returncode != 0:
-                raise subprocess.CalledProcessError(result.returncode, cmd)
-            
-            logger.info(f"Mock video created with ffmpeg: {output_path}")
+            logger.info(f"Mock videos created with ffmpeg: {', '.join(map(str, output_paths))}")
         
         except (subprocess.CalledProcessError, FileNotFoundError, subprocess.TimeoutExpired) as e:
-            # Fallback: create an empty file
-            logger.warning(f"ffmpeg not available ({e}), creating placeholder file")
-            output_path.touch()
-            # Add some dummy content to make it non-empty
-            output_path.write_bytes(b'MOCK_VIDEO_DATA' * 1000)
+            # Fallback: create non-empty placeholder files
+            logger.warning(f"ffmpeg not available ({e}), creating placeholder files")
+            if getattr(e, 'stderr', None):
+                logger.warning(f"ffmpeg error output: {e.stderr.decode(errors='replace').strip()}")
+            for output_path in output_paths:
+                output_path.write_bytes(MOCK_VIDEO_PLACEHOLDER)
     
     def _generate_real_video(
         self,
@@ -143,8 +275,9 @@ class SoraHandler:
         duration: int,
         resolution: str,
         fps: int,
-        seed: int = None
-    ):
+        seed: int = None,
+        progress_callback=None
+    ) -> bool:
         """
         Generate a real video using OpenAI Sora API.
         
@@ -155,12 +288,15 @@ class SoraHandler:
             resolution: Video resolution (e.g., "1280x720")
             fps: Frames per second
             seed: Random seed for reproducibility
+            progress_callback: Callback to use instead of self.progress_callback
+        
+        Returns:
+            True if the video came from the API, False if it fell back to mock
         """
+        progress_callback = progress_callback or self.progress_callback
+        
         try:
-            from openai import OpenAI
-            import time
-            
-            client = OpenAI(api_key=self.api_key)
+            client = get_openai_client(self.api_key)
             
             logger.info(f"Starting Sora video generation: '{prompt[:50]}...'")
             
@@ -174,26 +310,33 @@ class SoraHandler:
             
             logger.info(f"Video job created: {video.id}, status: {video.status}")
             
-            # Poll for completion
+            # Poll for completion, backing off so a long job costs a handful of
+            # requests rather than one every few seconds. A webhook for the job
+            # (see notify_video_job) ends the current wait early
             max_wait = duration * 30  # Wait up to 30x the video duration
-            start_time = time.time()
+            deadline = time.monotonic() + max_wait
+            attempt = 0
             
-            while video.status in ("queued", "in_progress"):
-                if time.time() - start_time > max_wait:
-                    raise TimeoutError(f"Video generation timed out after {max_wait}s")
-                
-                time.sleep(5)  # Poll every 5 seconds
-                video = client.videos.retrieve(video.id)
-                progress = getattr(video, "progress", 0)
-                logger.info(f"Video generation progress: {progress}% (status: {video.status})")
-                
-                # Call progress callback if provided
-                if self.progress_callback:
-                    self.progress_callback(
-                        status=video.status,
-                        progress=progress,
-                        message=f"Generating video: {progress}%"
-                    )
+            with _watch_video_job(video.id) as job_event:
+                while video.status in ("queued", "in_progress"):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise TimeoutError(f"Video generation timed out after {max_wait}s")
+                    
+                    job_event.wait(min(2 ** attempt, POLL_MAX_DELAY_SECONDS, remaining))
+                    job_event.clear()
+                    attempt += 1
+                    video = client.videos.retrieve(video.id)
+                    progress = getattr(video, "progress", 0)
+                    logger.info(f"Video generation progress: {progress}% (status: {video.status})")
+                    
+                    # Call progress callback if provided
+                    if progress_callback:
+                        progress_callback(
+                            status=video.status,
+                            progress=progress,
+                            message=f"Generating video: {progress}%"
+                        )
             
             if video.status == "failed":
                 error_msg = getattr(getattr(video, "error", None), "message", "Unknown error")
@@ -201,15 +344,39 @@ class SoraHandler:
             
             # Download the completed video
             logger.info(f"Downloading video content...")
-            content = client.videos.download_content(video.id, variant="video")
-            content.write_to_file(str(output_path))
+            self._download_video(client, video.id, output_path)
             
             logger.info(f"Successfully generated video via Sora API: {output_path}")
+            return True
         
         except Exception as e:
             logger.error(f"Failed to generate video via Sora API: {e}")
             logger.warning("Falling back to mock generation")
-            self._generate_mock_video(output_path, duration, resolution, fps)
+            self._generate_mock_videos([output_path], duration, resolution, fps)
+            return False
+    
+    def _download_video(self, client, video_id: str, output_path: Path):
+        """
+        Stream a finished Sora video to disk.
+        
+        The response is written in DOWNLOAD_CHUNK_SIZE pieces as it arrives, so
+        memory use does not grow with the video size. The file is preallocated
+        when the server sends a Content-Length.
+        
+        Args:
+            client: OpenAI client
+            video_id: Sora video job ID
+            output_path: Where to save the video
+        """
+        with client.videos.with_streaming_response.download_content(video_id, variant="video") as response:
+            with output_path.open('wb') as f:
+                expected_size = int(response.headers.get('content-length') or 0)
+                if expected_size and hasattr(os, 'posix_fallocate'):
+                    os.posix_fallocate(f.fileno(), 0, expected_size)
+                for chunk in response.iter_bytes(DOWNLOAD_CHUNK_SIZE):
+                    f.write(chunk)
+                # Drop any preallocated tail if the body came up short
+                f.truncate()
     
     def extend_video(
         self,
@@ -233,9 +400,9 @@ class SoraHandler:
         logger.info(f"Extending video: {video_path}")
         
         if self.use_mock:
-            # Mock: just copy the original
-            import shutil
-            shutil.copy(video_path, output_path)
+            # Mock: just copy the original (copyfile copies in the kernel on Linux
+            # and skips the permission bits)
+            shutil.copyfile(video_path, output_path)
         else:
             # Real API call would go here
             pass
@@ -262,9 +429,9 @@ class SoraHandler:
         logger.info(f"Remixing video: {video_path}")
         
         if self.use_mock:
-            # Mock: just copy the original
-            import shutil
-            shutil.copy(video_path, output_path)
+            # Mock: just copy the original (copyfile copies in the kernel on Linux
+            # and skips the permission bits)
+            shutil.copyfile(video_path, output_path)
         else:
             # Real API call would go here
             pass
@@ -272,13 +439,14 @@ class SoraHandler:
         return output_path
 
 
-# Singleton instance
-_sora_handler = None
-
+@functools.cache
 def get_sora_handler() -> SoraHandler:
-    """Get the singleton SoraHandler instance."""
-    global _sora_handler
-    if _sora_handler is None:
-        _sora_handler = SoraHandler()
-    return _sora_handler
+    """
+    Get the singleton SoraHandler instance.
+    
+    Generation threads may race on the first call and build a spare handler;
+    that is harmless, since handlers hold no connections of their own (the
+    OpenAI client is shared through get_openai_client).
+    """
+    return SoraHandler()
 
@@ -0,0 +1,176 @@
+"""
+Background tasks for the Sora Director application.
+Runs the video generation pipeline off the request thread and reports
+progress and results through the progress tracker.
+"""
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict
+
+from .config import Config
+from .sora_handler import SoraHandler, get_sora_handler
+from .scoring_module import get_video_scorer
+from .utils.file_manager import (
+    create_generation_directory,
+    get_relative_url,
+    save_prompt_metadata
+)
+from .utils.generation_cache import get_generation_cache
+from .utils.logger import setup_logger
+from .utils.progress_tracker import set_generation_progress
+
+logger = setup_logger(__name__)
+
+# Background workers for the generation pipeline, so /api/generate returns immediately
+generation_executor = ThreadPoolExecutor(max_workers=Config.WORKER_THREADS, thread_name_prefix='generation')
+
+# Generations queued or running in this process, so a prompt is only generated once at a time
+_inflight: Dict[str, Future] = {}
+_inflight_lock = threading.Lock()
+
+
+def submit_generation(prompt_hash: str, prompt: str, num_takes: int, use_real_api: bool) -> Future:
+    """
+    Queue a generation and mark it as queued in the progress tracker.
+    
+    If the same prompt is already queued or running in this process, its
+    future is returned instead of starting a duplicate Sora generation; both
+    callers then follow the same progress entry.
+    
+    Args:
+        prompt_hash: Hash identifying this generation
+        prompt: Text prompt for video generation
+        num_takes: Number of takes to generate
+        use_real_api: Whether to call the real Sora API
+    
+    Returns:
+        Future for the background run
+    """
+    with _inflight_lock:
+        future = _inflight.get(prompt_hash)
+        if future is not None:
+            logger.info(f"Generation already in flight, attaching: {prompt_hash}")
+            return future
+        
+        set_generation_progress(prompt_hash, 'queued', 0, 'Initializing generation...')
+        future = generation_executor.submit(_run_inflight, prompt_hash, prompt, num_takes, use_real_api)
+        _inflight[prompt_hash] = future
+    
+    return future
+
+
+def _run_inflight(prompt_hash: str, prompt: str, num_takes: int, use_real_api: bool):
+    """Run a generation, then let the next submission of its prompt start a new one."""
+    try:
+        run_generation(prompt_hash, prompt, num_takes, use_real_api)
+    finally:
+        with _inflight_lock:
+            _inflight.pop(prompt_hash, None)
+
+
+def run_generation(prompt_hash: str, prompt: str, num_takes: int, use_real_api: bool):
+    """
+    Generate and score video takes for a prompt.
+    
+    Runs on the generation executor so the request thread is not held for the
+    minutes a real Sora generation takes. Progress, and the final response once
+    completed, are published through the progress tracker.
+    
+    Args:
+        prompt_hash: Hash identifying this generation
+        prompt: Text prompt for video generation
+        num_takes: Number of takes to generate
+        use_real_api: Whether to call the real Sora API
+    """
+    try:
+        # Create output directory
+        output_dir = create_generation_directory(prompt_hash)
+        
+        # Save metadata
+        save_prompt_metadata(prompt_hash, prompt, {
+            'num_takes': num_takes,
+            'mode': 'MOCK' if Config.USE_MOCK else 'PRODUCTION'
+        })
+        
+        # Update progress
+        set_generation_progress(prompt_hash, 'in_progress', 10, 'Starting video generation...')
+        
+        # Generate videos (use specific handler for real/mock mode)
+        if use_real_api:
+            # Create progress callback. Take statuses are not the generation's:
+            # only this function marks it completed (with the result) or failed
+            def update_progress(status, progress, message):
+                set_generation_progress(prompt_hash, 'in_progress', progress, message)
+            
+            temp_handler = SoraHandler(use_mock=False, progress_callback=update_progress)
+            video_paths, actual_mode = temp_handler.generate_n_takes(
+                prompt=prompt,
+                num_takes=num_takes,
+                output_dir=output_dir
+            )
+        else:
+            video_paths, actual_mode = get_sora_handler().generate_n_takes(
+                prompt=prompt,
+                num_takes=num_takes,
+                output_dir=output_dir
+            )
+            # Mock mode completes instantly
+            set_generation_progress(prompt_hash, 'in_progress', 90, 'Scoring videos...')
+        
+        # Score all takes (in parallel worker processes in production mode)
+        scores_list = get_video_scorer().score_videos(video_paths)
+        
+        takes = []
+        for i, (video_path, scores) in enumerate(zip(video_paths, scores_list), start=1):
+            takes.append({
+                'take_id': i,
+                'video_url': get_relative_url(video_path),
+                'video_path': str(video_path),
+                'scores': scores
+            })
+        
+        # Rank by overall score
+        takes_sorted = sorted(takes, key=lambda x: x['scores']['overall'], reverse=True)
+        
+        # Add rank
+        for rank, take in enumerate(takes_sorted, start=1):
+            take['rank'] = rank
+        
+        # Record which provider actually produced the takes, and whether the
+        # Sora API was asked for but mock videos were substituted
+        fell_back = use_real_api and actual_mode == 'MOCK'
+        if fell_back:
+            logger.warning(f"⚠️  Sora API requested but mock videos were used: {prompt_hash}")
+        save_prompt_metadata(prompt_hash, prompt, {
+            'num_takes': num_takes,
+            'mode': 'MOCK' if Config.USE_MOCK else 'PRODUCTION',
+            'actual_mode': actual_mode,
+            'fell_back': fell_back
+        })
+        
+        response = {
+            'prompt_hash': prompt_hash,
+            'prompt': prompt,
+            'takes': takes_sorted,
+            'mode': actual_mode,
+            'success': True
+        }
+        
+        # Save to cache if real API was used successfully
+        if use_real_api and actual_mode == 'REAL':
+            try:
+                get_generation_cache().put(response)
+                logger.info(f"💾 Saved generation to cache: {prompt_hash}")
+            except Exception as e:
+                logger.warning(f"⚠️  Failed to save cache: {e}")
+        
+        logger.info(f"Generation complete: {len(takes)} takes created (mode: {actual_mode})")
+        
+        # Mark generation as completed
+        set_generation_progress(prompt_hash, 'completed', 100, 'Generation complete!', result=response)
+    
+    except Exception as e:
+        # Mark generation as failed
+        set_generation_progress(prompt_hash, 'failed', 0, f'Generation failed: {str(e)}')
+        
+        logger.exception(f"Error in run_generation: {e}")
@@ -2,17 +2,33 @@
 File management utilities for the Sora Director application.
 Handles file operations, path generation, and cleanup.
 """
+import functools
 import hashlib
+import heapq
+import json
+import os
 import shutil
+import tempfile
+import threading
 from pathlib import Path
-from typing import Optional, List
+from typing import Optional, List, BinaryIO
 from datetime import datetime
 
 from ..config import Config
 from .logger import setup_logger
+from .pools import get_io_pool
 
 logger = setup_logger(__name__)
 
+# Uploads are copied to disk this many bytes at a time
+UPLOAD_CHUNK_SIZE = 1 << 20
+
+# Guards the upload content index against concurrent uploads
+_upload_index_lock = threading.Lock()
+
+# Videos up to this size are read ahead into the page cache before decoding
+PREFETCH_MAX_BYTES = 512 << 20
+
 
 def generate_prompt_hash(prompt: str) -> str:
     """
@@ -96,21 +112,36 @@ def get_reconstruction_path(prompt_hash: str, filename: str = "output.splat") ->
     return recon_dir / filename
 
 
-def list_generations(prompt_hash: str) -> List[Path]:
+def list_generations(prompt_hash: str, limit: Optional[int] = None) -> List[Path]:
     """
     List all generated video files for a given prompt.
     
     Args:
         prompt_hash: Unique hash for this prompt
+        limit: Only return the first this many files, without sorting them all
     
     Returns:
-        List of video file paths
+        List of video file paths, in take order (take_2 before take_10),
+        each take followed by its derived videos (e.g. take_1_extended.mp4)
     """
     gen_dir = Config.GENERATIONS_DIR / prompt_hash
-    if not gen_dir.exists():
+    try:
+        with os.scandir(gen_dir) as entries:
+            names = [entry.name for entry in entries if entry.name.startswith('take_') and entry.name.endswith('.mp4')]
+    except FileNotFoundError:
         return []
     
-    return sorted(gen_dir.glob("take_*.mp4"))
+    if limit is None:
+        names.sort(key=_take_sort_key)
+    else:
+        names = heapq.nsmallest(limit, names, key=_take_sort_key)
+    return [gen_dir / name for name in names]
+
+
+def _take_sort_key(name: str):
+    """Order take_<n>*.mp4 file names by take number, then by name."""
+    number = name[len('take_'):-len('.mp4')].partition('_')[0]
+    return (int(number) if number.isdigit() else float('inf'), name)
 
 
 def cleanup_old_generations(days: int = 7) -> int:
@@ -124,22 +155,28 @@ def cleanup_old_generations(days: int = 7) -> int:
         Number of directories removed
     """
     cutoff_time = datetime.now().timestamp() - (days * 86400)
-    removed_count = 0
     
-    for gen_dir in Config.GENERATIONS_DIR.iterdir():
-        if gen_dir.is_dir() and gen_dir.stat().st_mtime < cutoff_time:
-            shutil.rmtree(gen_dir)
-            removed_count += 1
-            logger.info(f"Removed old generation directory: {gen_dir}")
+    # scandir reports entry types from the directory listing itself, so only
+    # directories pay for a stat call
+    old_dirs = [
+        Path(entry.path)
+        for parent in (Config.GENERATIONS_DIR, Config.RECONSTRUCTIONS_DIR)
+        for entry in os.scandir(parent)
+        if entry.is_dir(follow_symlinks=False) and entry.stat(follow_symlinks=False).st_mtime < cutoff_time
+    ]
     
-    for recon_dir in Config.RECONSTRUCTIONS_DIR.iterdir():
-        if recon_dir.is_dir() and recon_dir.stat().st_mtime < cutoff_time:
-            shutil.rmtree(recon_dir)
-            removed_count += 1
-            logger.info(f"Removed old reconstruction directory: {recon_dir}")
+    # Deleting a tree is almost all filesystem waits, so remove them side by side
+    for old_dir in get_io_pool().map(_remove_directory, old_dirs):
+        logger.info(f"Removed old directory: {old_dir}")
     
-    logger.info(f"Cleanup complete: removed {removed_count} directories")
-    return removed_count
+    logger.info(f"Cleanup complete: removed {len(old_dirs)} directories")
+    return len(old_dirs)
+
+
+def _remove_directory(path: Path) -> Path:
+    """Delete a directory tree and return its path."""
+    shutil.rmtree(path)
+    return path
 
 
 def get_relative_url(file_path: Path) -> str:
@@ -161,6 +198,29 @@ def get_relative_url(file_path: Path) -> str:
         return str(file_path)
 
 
+def get_directory_size(path: Path) -> int:
+    """
+    Get the total size of the files under a directory.
+    
+    Args:
+        path: Directory to measure
+    
+    Returns:
+        Size in bytes, or 0 if the directory does not exist
+    """
+    total = 0
+    try:
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    total += get_directory_size(Path(entry.path))
+                else:
+                    total += entry.stat(follow_symlinks=False).st_size
+    except FileNotFoundError:
+        pass
+    return total
+
+
 def save_prompt_metadata(prompt_hash: str, prompt: str, metadata: dict):
     """
     Save metadata about a generation session.
@@ -173,14 +233,151 @@ def save_prompt_metadata(prompt_hash: str, prompt: str, metadata: dict):
     gen_dir = Config.GENERATIONS_DIR / prompt_hash
     gen_dir.mkdir(parents=True, exist_ok=True)
     
-    metadata_file = gen_dir / 'metadata.txt'
-    with metadata_file.open('w') as f:
-        f.write(f"Prompt Hash: {prompt_hash}\n")
-        f.write(f"Timestamp: {datetime.now().isoformat()}\n")
-        f.write(f"Prompt: {prompt}\n")
-        f.write("\nMetadata:\n")
-        for key, value in metadata.items():
-            f.write(f"  {key}: {value}\n")
+    body = ''.join([
+        f"Prompt Hash: {prompt_hash}\n",
+        f"Timestamp: {datetime.now().isoformat()}\n",
+        f"Prompt: {prompt}\n",
+        "\nMetadata:\n",
+        *(f"  {key}: {value}\n" for key, value in metadata.items()),
+    ])
+    (gen_dir / 'metadata.txt').write_text(body)
     
     logger.info(f"Saved metadata for prompt {prompt_hash}")
 
+
+
+def save_upload_stream(stream: BinaryIO, upload_dir: Path, filename: str) -> Path:
+    """
+    Copy an uploaded file to disk in fixed-size chunks, deduplicating by content.
+    
+    Memory use is bounded by UPLOAD_CHUNK_SIZE whatever the upload size. The
+    SHA-256 computed along the way is looked up in upload_dir/.index.json, and
+    if an identical file was uploaded before, that file is returned instead of
+    storing a second copy. A stream that is already a named file in upload_dir
+    (a multipart upload spooled there) is hard-linked into place, not copied.
+    
+    Args:
+        stream: Readable binary stream with the upload body
+        upload_dir: Directory to store the upload in
+        filename: Sanitized file name to store it under
+    
+    Returns:
+        Path to the stored (or previously stored identical) file
+    """
+    upload_dir.mkdir(parents=True, exist_ok=True)
+    hasher = hashlib.sha256()
+    
+    tmp_path = _link_spooled_upload(stream, upload_dir)
+    try:
+        if tmp_path is not None:
+            while chunk := stream.read(UPLOAD_CHUNK_SIZE):
+                hasher.update(chunk)
+        else:
+            fd, tmp_path = tempfile.mkstemp(dir=upload_dir, suffix='.part')
+            with os.fdopen(fd, 'wb') as f:
+                while chunk := stream.read(UPLOAD_CHUNK_SIZE):
+                    hasher.update(chunk)
+                    f.write(chunk)
+        digest = hasher.hexdigest()
+        
+        index_file = upload_dir / '.index.json'
+        with _upload_index_lock:
+            index = json.loads(index_file.read_text()) if index_file.exists() else {}
+            
+            existing = index.get(digest)
+            if existing and (upload_dir / existing).exists():
+                os.unlink(tmp_path)
+                logger.info(f"Upload matches existing file {existing}")
+                return upload_dir / existing
+            
+            os.replace(tmp_path, upload_dir / filename)
+            # The name may have held different content before
+            index = {h: name for h, name in index.items() if name != filename}
+            index[digest] = filename
+            index_file.write_text(json.dumps(index))
+        
+        return upload_dir / filename
+    
+    except BaseException:
+        if tmp_path is not None and os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+def _link_spooled_upload(stream: BinaryIO, upload_dir: Path) -> Optional[str]:
+    """
+    Hard-link a stream backed by a named file in upload_dir to a new temporary name.
+    
+    Returns:
+        The linked path, with the stream rewound for hashing, or None if the
+        stream is not such a file or cannot be linked
+    """
+    name = getattr(stream, 'name', None)
+    if not isinstance(name, str):
+        return None
+    
+    try:
+        if not os.path.samefile(os.path.dirname(name), upload_dir):
+            return None
+        link_path = f'{name}.link'
+        os.link(name, link_path)
+    except OSError:
+        return None
+    
+    stream.seek(0)
+    return link_path
+
+
+def prefetch_file(file_path: Path, max_bytes: int = PREFETCH_MAX_BYTES) -> bool:
+    """
+    Ask the kernel to read a file into the page cache ahead of use.
+    
+    The readahead runs in the background and the cached pages are shared by
+    every process, so decoders opening the file afterwards (OpenCV uses its own
+    file handle) read from memory. Files larger than max_bytes are left alone
+    so they don't evict the rest of the cache.
+    
+    Args:
+        file_path: File that is about to be read
+        max_bytes: Size limit for prefetching
+    
+    Returns:
+        True if readahead was requested, False if skipped or unsupported
+    """
+    if not hasattr(os, 'posix_fadvise'):
+        return False
+    
+    try:
+        with open(file_path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size > max_bytes:
+                return False
+            os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_WILLNEED)
+        return True
+    except OSError as e:
+        logger.debug(f"Could not prefetch {file_path}: {e}")
+        return False
+
+
+def content_digest(file_path: Path) -> str:
+    """
+    Return a BLAKE2b digest of a file's contents, for content-addressed caches.
+    
+    The file is streamed through hashlib.file_digest, so it is never held in
+    memory whole. Digests are memoized on path, size and mtime, so an unchanged
+    file is only read once per process.
+    
+    Args:
+        file_path: File to hash
+    
+    Returns:
+        Hex digest of the file contents
+    """
+    st = os.stat(file_path)
+    return _content_digest(os.fspath(file_path), st.st_size, st.st_mtime_ns)
+
+
+@functools.lru_cache(maxsize=256)
+def _content_digest(file_path: str, size: int, mtime_ns: int) -> str:
+    """Hash a file; size and mtime_ns only key the memo."""
+    with open(file_path, 'rb') as f:
+        return hashlib.file_digest(f, 'blake2b').hexdigest()
@@ -0,0 +1,244 @@
+"""
+Generation result cache for the Sora Director application.
+Indexes finished generations by prompt hash in SQLite, so a repeated prompt is
+answered with one lookup instead of another Sora + scoring run.
+"""
+import shutil
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional, Dict, Any, List
+
+import orjson
+
+from ..config import Config
+from .file_manager import get_directory_size
+from .logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class GenerationCache:
+    """SQLite-backed cache of /api/generate responses keyed by prompt hash."""
+    
+    def __init__(
+        self,
+        db_path: Path = None,
+        seed_dir: Path = None,
+        generations_dir: Path = None,
+        max_bytes: int = None
+    ):
+        """
+        Initialize the generation cache.
+        
+        Args:
+            db_path: SQLite database file (default: DATA_ROOT/cache.db)
+            seed_dir: Directory of <prompt_hash>.json responses, such as the demos
+                committed to git (default: DATA_ROOT/cache)
+            generations_dir: Where each generation's videos live, counted towards
+                the budget and deleted on eviction (default: Config.GENERATIONS_DIR)
+            max_bytes: Disk budget for cached generations, 0 for unlimited
+                (default: Config.CACHE_MAX_MB)
+        """
+        self.db_path = db_path or Config.DATA_ROOT / 'cache.db'
+        self.seed_dir = seed_dir or Config.DATA_ROOT / 'cache'
+        self.generations_dir = generations_dir or Config.GENERATIONS_DIR
+        self.max_bytes = Config.CACHE_MAX_MB * 1024 * 1024 if max_bytes is None else max_bytes
+        self._local = threading.local()
+        self._init_lock = threading.Lock()
+        self._initialized = False
+        # Bumped by put(); with PRAGMA data_version it tells when list_prompts() is stale
+        self._writes = 0
+    
+    def _connection(self) -> sqlite3.Connection:
+        """Get this thread's connection, creating the table and importing seeds on first use."""
+        con = getattr(self._local, 'con', None)
+        if con is not None:
+            return con
+        
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        con = sqlite3.connect(self.db_path, timeout=10)
+        # WAL lets readers in other threads and workers proceed while one writes
+        con.execute('PRAGMA journal_mode=WAL')
+        con.execute('PRAGMA synchronous=NORMAL')
+        self._local.con = con
+        
+        with self._init_lock:
+            if not self._initialized:
+                with con:
+                    # size: bytes on disk, measured once by put(); seeded: imported from
+                    # seed_dir (e.g. committed demos), never counted or evicted
+                    con.execute(
+                        'CREATE TABLE IF NOT EXISTS generations ('
+                        'hash TEXT PRIMARY KEY, prompt TEXT NOT NULL, mode TEXT, '
+                        'response_json TEXT NOT NULL, ts REAL NOT NULL, '
+                        'size INTEGER NOT NULL DEFAULT 0, seeded INTEGER NOT NULL DEFAULT 0)'
+                    )
+                    self._migrate(con)
+                    # Most-recent-first listings and oldest-first eviction both walk ts
+                    con.execute('CREATE INDEX IF NOT EXISTS generations_ts ON generations (ts)')
+                    self._import_seed_files(con)
+                self._initialized = True
+        
+        return con
+    
+    def _migrate(self, con: sqlite3.Connection):
+        """
+        Add the size and seeded columns to databases created before them.
+        
+        Which existing rows came from seed files cannot be told apart any more,
+        so they are all kept out of eviction rather than risk deleting a demo.
+        """
+        columns = {row[1] for row in con.execute('PRAGMA table_info(generations)')}
+        if 'size' not in columns:
+            con.execute('ALTER TABLE generations ADD COLUMN size INTEGER NOT NULL DEFAULT 0')
+        if 'seeded' not in columns:
+            con.execute('ALTER TABLE generations ADD COLUMN seeded INTEGER NOT NULL DEFAULT 0')
+            con.execute('UPDATE generations SET seeded = 1')
+    
+    def _import_seed_files(self, con: sqlite3.Connection):
+        """Add JSON responses from seed_dir that the database does not know yet."""
+        if not self.seed_dir.exists():
+            return
+        
+        for cache_file in self.seed_dir.glob('*.json'):
+            try:
+                data = orjson.loads(cache_file.read_bytes())
+                if not (data.get('success') and data.get('prompt')):
+                    continue
+                con.execute(
+                    'INSERT OR IGNORE INTO generations (hash, prompt, mode, response_json, ts, seeded) '
+                    'VALUES (?, ?, ?, ?, ?, 1)',
+                    (data['prompt_hash'], data['prompt'], data.get('mode', 'UNKNOWN'),
+                     orjson.dumps(data).decode(), cache_file.stat().st_mtime)
+                )
+            except Exception as e:
+                logger.warning(f"Failed to import cache file {cache_file}: {e}")
+    
+    def get(self, prompt_hash: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a cached generation.
+        
+        Args:
+            prompt_hash: Hash of the prompt
+        
+        Returns:
+            The cached /api/generate response, or None
+        """
+        row = self._connection().execute(
+            'SELECT response_json FROM generations WHERE hash = ?', (prompt_hash,)
+        ).fetchone()
+        return orjson.loads(row[0]) if row else None
+    
+    def put(self, response: Dict[str, Any]):
+        """
+        Cache a finished generation.
+        
+        The response is also written to seed_dir/<prompt_hash>.json, which can be
+        committed to git to ship it with the app like the demos. The generation's
+        size on disk is recorded, and older generations are then evicted until the
+        cache fits in max_bytes. A generation imported from seed_dir stays exempt
+        from eviction when it is stored again.
+        
+        Args:
+            response: The /api/generate response to cache
+        """
+        prompt_hash = response['prompt_hash']
+        # Connect (and import seed files) before writing this generation's seed
+        # file, so it is not mistaken for a seeded one
+        con = self._connection()
+        self.seed_dir.mkdir(parents=True, exist_ok=True)
+        seed_json = orjson.dumps(response, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY)
+        (self.seed_dir / f"{prompt_hash}.json").write_bytes(seed_json)
+        size = len(seed_json) + get_directory_size(self.generations_dir / prompt_hash)
+        
+        response_json = orjson.dumps(response, option=orjson.OPT_SERIALIZE_NUMPY)
+        with con:
+            con.execute(
+                'INSERT INTO generations (hash, prompt, mode, response_json, ts, size) '
+                'VALUES (?, ?, ?, ?, ?, ?) '
+                'ON CONFLICT (hash) DO UPDATE SET prompt = excluded.prompt, mode = excluded.mode, '
+                'response_json = excluded.response_json, ts = excluded.ts, size = excluded.size',
+                (prompt_hash, response['prompt'], response.get('mode', 'UNKNOWN'),
+                 response_json.decode(), time.time(), size)
+            )
+        self._writes += 1
+        
+        if self.max_bytes > 0:
+            self._enforce_budget(keep=prompt_hash)
+    
+    def _enforce_budget(self, keep: str):
+        """
+        Evict the oldest generations until the cache fits in max_bytes.
+        
+        Each generation is charged the size recorded when it was stored (its seed
+        JSON and videos directory). Generations imported from seed_dir are not
+        charged and never evicted, so committed demos are not deleted.
+        
+        Args:
+            keep: Hash of the generation just stored, which is never evicted
+        """
+        con = self._connection()
+        total = con.execute('SELECT COALESCE(SUM(size), 0) FROM generations WHERE NOT seeded').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        
+        rows = con.execute('SELECT hash, size FROM generations WHERE NOT seeded ORDER BY ts').fetchall()
+        for prompt_hash, size in rows:
+            if total <= self.max_bytes:
+                break
+            if prompt_hash == keep:
+                continue
+            
+            with con:
+                con.execute('DELETE FROM generations WHERE hash = ?', (prompt_hash,))
+            self._writes += 1
+            (self.seed_dir / f"{prompt_hash}.json").unlink(missing_ok=True)
+            shutil.rmtree(self.generations_dir / prompt_hash, ignore_errors=True)
+            total -= size
+            logger.info(f"Evicted cached generation {prompt_hash} ({size} bytes)")
+    
+    def list_prompts(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        List cached prompts, most recent first.
+        
+        The listing is kept per thread and only re-queried after a write: put()
+        in this process bumps a counter, and SQLite's data_version changes when
+        another connection (thread or worker process) commits. Treat the result
+        as read-only.
+        
+        Args:
+            limit: Return at most this many prompts (default: all)
+        
+        Returns:
+            List of dicts with prompt, hash, timestamp and mode
+        """
+        con = self._connection()
+        version = (con.execute('PRAGMA data_version').fetchone()[0], self._writes, limit)
+        listing = getattr(self._local, 'listing', None)
+        if listing is not None and listing[0] == version:
+            return listing[1]
+        
+        # The ts index yields the newest rows first, so a limit stops the scan early
+        rows = con.execute(
+            'SELECT prompt, hash, ts, mode FROM generations ORDER BY ts DESC LIMIT ?',
+            (-1 if limit is None else limit,)
+        ).fetchall()
+        prompts = [
+            {'prompt': prompt, 'hash': prompt_hash, 'timestamp': ts, 'mode': mode}
+            for prompt, prompt_hash, ts, mode in rows
+        ]
+        self._local.listing = (version, prompts)
+        return prompts
+
+
+# Singleton instance
+_generation_cache = None
+
+def get_generation_cache() -> GenerationCache:
+    """Get the singleton GenerationCache instance."""
+    global _generation_cache
+    if _generation_cache is None:
+        _generation_cache = GenerationCache()
+    return _generation_cache
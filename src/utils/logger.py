@@ -2,11 +2,36 @@
 Logging utilities for the Sora Director application.
 Provides consistent logging across all modules.
 """
+import functools
 import logging
 import sys
 from pathlib import Path
 from typing import Optional
 
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+LOG_DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+
+@functools.cache
+def _get_handler(log_file: Optional[str], level: str) -> logging.Handler:
+    """
+    Get the shared handler for a destination and level.
+    
+    Every module logger writing to the console (log_file None) or to the same
+    file shares one handler, so the formatter is built and the file opened
+    once per process rather than once per module.
+    """
+    if log_file:
+        log_path = Path(log_file)
+        log_path.parent.mkdir(parents=True, exist_ok=True)
+        handler = logging.FileHandler(log_file)
+    else:
+        handler = logging.StreamHandler(sys.stdout)
+    
+    handler.setLevel(getattr(logging, level.upper()))
+    handler.setFormatter(logging.Formatter(LOG_FORMAT, datefmt=LOG_DATE_FORMAT))
+    return handler
+
 
 def setup_logger(
     name: str,
@@ -33,28 +58,10 @@ def setup_logger(
     if logger.handlers:
         return logger
     
-    # Create formatter
-    formatter = logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        datefmt='%Y-%m-%d %H:%M:%S'
-    )
-    
-    # Console handler
     if console:
-        console_handler = logging.StreamHandler(sys.stdout)
-        console_handler.setLevel(getattr(logging, level.upper()))
-        console_handler.setFormatter(formatter)
-        logger.addHandler(console_handler)
-    
-    # File handler
+        logger.addHandler(_get_handler(None, level))
     if log_file:
-        log_path = Path(log_file)
-        log_path.parent.mkdir(parents=True, exist_ok=True)
-        
-        file_handler = logging.FileHandler(log_file)
-        file_handler.setLevel(getattr(logging, level.upper()))
-        file_handler.setFormatter(formatter)
-        logger.addHandler(file_handler)
+        logger.addHandler(_get_handler(log_file, level))
     
     return logger
 
@@ -0,0 +1,36 @@
+"""
+Shared OpenAI client for the Sora Director application.
+Sora video jobs and GPT-4 Vision scene requests go through one client, so
+they share a single pool of kept-alive (and, with h2 installed, HTTP/2
+multiplexed) connections instead of each paying for their own TLS handshakes.
+"""
+import functools
+import importlib.util
+
+import httpx
+from openai import OpenAI
+
+# HTTP/2 needs the optional h2 package; fall back to HTTP/1.1 keep-alive without it
+HTTP2_AVAILABLE = importlib.util.find_spec('h2') is not None
+
+
+@functools.cache
+def get_openai_client(api_key: str) -> OpenAI:
+    """
+    Get the OpenAI client for an API key.
+    
+    The client is thread-safe, so request threads, concurrent takes and their
+    status polls all reuse its connections. Pass per-call timeouts to the
+    individual API calls.
+    
+    Args:
+        api_key: OpenAI API key
+    
+    Returns:
+        Shared OpenAI client
+    """
+    http_client = httpx.Client(
+        http2=HTTP2_AVAILABLE,
+        limits=httpx.Limits(max_connections=100, max_keepalive_connections=20, keepalive_expiry=60)
+    )
+    return OpenAI(api_key=api_key, http_client=http_client)
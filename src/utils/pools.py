@@ -0,0 +1,24 @@
+"""
+Shared thread pools for the Sora Director application.
+Work that mostly waits on the network (Sora jobs, API calls) and short
+CPU-bound work (image encoding) get separate pools, so a burst of one cannot
+queue behind the other. Heavy CPU work such as scoring runs in processes.
+"""
+import functools
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+# Threads for network-bound work; they spend nearly all their time waiting
+IO_POOL_WORKERS = 32
+
+
+@functools.cache
+def get_io_pool() -> ThreadPoolExecutor:
+    """Get the shared pool for network-bound work."""
+    return ThreadPoolExecutor(max_workers=IO_POOL_WORKERS, thread_name_prefix='io')
+
+
+@functools.cache
+def get_cpu_pool() -> ThreadPoolExecutor:
+    """Get the shared pool for CPU-bound work that releases the GIL (OpenCV, NumPy)."""
+    return ThreadPoolExecutor(max_workers=os.cpu_count() or 1, thread_name_prefix='cpu')
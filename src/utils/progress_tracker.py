@@ -0,0 +1,210 @@
+"""
+Generation progress tracking for the Sora Director application.
+Stores per-generation status in Redis when REDIS_URL is set, so every server
+worker sees the same state, and in process memory otherwise.
+"""
+import functools
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Dict, Any, Union
+
+import orjson
+
+from ..config import Config
+from .logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# How long a generation's progress is kept after its last update
+PROGRESS_TTL_SECONDS = 3600
+
+# Redis channel on which the prompt hash of every progress update is published
+PROGRESS_CHANNEL = 'progress'
+
+# Most generations kept in memory; the least recently updated are dropped first
+PROGRESS_MAX_ENTRIES = 10_000
+
+# Seconds without a change after which watchers get a keep-alive
+WATCH_HEARTBEAT_SECONDS = 15
+
+# In-memory fallback, least recently updated first: {prompt_hash: (expires_at, state)}
+_local_progress = OrderedDict()
+_local_lock = threading.Lock()
+# Notified, and the version bumped, on every in-memory update
+_local_changed = threading.Condition(_local_lock)
+_local_version = 0
+
+
+@functools.cache
+def get_redis_client():
+    """
+    Get the shared Redis client.
+    
+    Returns:
+        Redis client, or None when REDIS_URL is unset or redis is not installed
+    """
+    if not Config.REDIS_URL:
+        return None
+    
+    try:
+        import redis
+    except ImportError:
+        logger.warning("REDIS_URL is set but the redis package is not installed; tracking progress in memory")
+        return None
+    
+    return redis.Redis.from_url(Config.REDIS_URL, decode_responses=True)
+
+
+def set_generation_progress(
+    prompt_hash: str,
+    status: str,
+    progress: int,
+    message: str,
+    result: Optional[Dict[str, Any]] = None
+):
+    """
+    Record the progress of a generation.
+    
+    Args:
+        prompt_hash: Hash identifying the generation
+        status: One of queued, in_progress, completed, failed
+        progress: Percentage complete (0-100)
+        message: Human-readable status message
+        result: Final generation response, once completed
+    """
+    state = {'status': status, 'progress': progress, 'message': message}
+    if result is not None:
+        state['result'] = result
+    
+    client = get_redis_client()
+    if client is not None:
+        client.set(
+            f'prog:{prompt_hash}',
+            orjson.dumps(state, option=orjson.OPT_SERIALIZE_NUMPY),
+            ex=PROGRESS_TTL_SECONDS
+        )
+        client.publish(PROGRESS_CHANNEL, prompt_hash)
+        return
+    
+    global _local_version
+    now = time.monotonic()
+    with _local_changed:
+        _local_progress[prompt_hash] = (now + PROGRESS_TTL_SECONDS, state)
+        _local_progress.move_to_end(prompt_hash)
+        
+        # Entries are ordered by last update, so expired ones sit at the front
+        while _local_progress:
+            expires_at, _ = next(iter(_local_progress.values()))
+            if expires_at > now and len(_local_progress) <= PROGRESS_MAX_ENTRIES:
+                break
+            _local_progress.popitem(last=False)
+        _local_version += 1
+        _local_changed.notify_all()
+
+
+def get_generation_progress(prompt_hash: str) -> Optional[Dict[str, Any]]:
+    """
+    Get the progress of a generation.
+    
+    Args:
+        prompt_hash: Hash identifying the generation
+    
+    Returns:
+        Progress dictionary, or None if the generation is unknown or expired
+    """
+    client = get_redis_client()
+    if client is not None:
+        data = client.get(f'prog:{prompt_hash}')
+        return orjson.loads(data) if data is not None else None
+    
+    with _local_lock:
+        entry = _local_progress.get(prompt_hash)
+    if entry is None or entry[0] <= time.monotonic():
+        return None
+    return entry[1]
+
+
+def get_generation_progress_json(prompt_hash: str) -> Optional[Union[str, bytes]]:
+    """
+    Get the progress of a generation as JSON text.
+    
+    With Redis this is the stored value itself, so it can be sent to clients
+    without decoding and re-encoding the (possibly large) result.
+    
+    Args:
+        prompt_hash: Hash identifying the generation
+    
+    Returns:
+        JSON-encoded progress dictionary, or None if unknown or expired
+    """
+    client = get_redis_client()
+    if client is not None:
+        return client.get(f'prog:{prompt_hash}')
+    
+    state = get_generation_progress(prompt_hash)
+    return orjson.dumps(state, option=orjson.OPT_SERIALIZE_NUMPY) if state is not None else None
+
+
+def watch_generation_progress(prompt_hash: str, timeout: float = PROGRESS_TTL_SECONDS):
+    """
+    Yield the progress of a generation each time it changes.
+    
+    Stops once the generation has completed or failed, or after timeout seconds.
+    None is yielded after every WATCH_HEARTBEAT_SECONDS without a change, so
+    callers can keep idle connections open.
+    
+    Args:
+        prompt_hash: Hash identifying the generation
+        timeout: Maximum number of seconds to watch
+    
+    Yields:
+        Progress dictionaries, or None as a keep-alive
+    """
+    client = get_redis_client()
+    pubsub = None
+    if client is not None:
+        # Subscribe before the first read so no update can slip in between
+        pubsub = client.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(PROGRESS_CHANNEL)
+    
+    deadline = time.monotonic() + timeout
+    last = None
+    try:
+        while True:
+            with _local_lock:
+                version = _local_version
+            state = get_generation_progress(prompt_hash)
+            if state is not None and state != last:
+                last = state
+                yield state
+            
+            if state is not None and state['status'] in ('completed', 'failed'):
+                return
+            
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            
+            wait = min(remaining, WATCH_HEARTBEAT_SECONDS)
+            if pubsub is not None:
+                changed = _wait_for_message(pubsub, prompt_hash, wait)
+            else:
+                with _local_changed:
+                    changed = _local_changed.wait_for(lambda: _local_version != version, wait)
+            
+            if not changed:
+                yield None
+    finally:
+        if pubsub is not None:
+            pubsub.close()
+
+
+def _wait_for_message(pubsub, prompt_hash: str, timeout: float) -> bool:
+    """Wait up to timeout seconds for an update to prompt_hash on the progress channel."""
+    deadline = time.monotonic() + timeout
+    while (remaining := deadline - time.monotonic()) > 0:
+        message = pubsub.get_message(timeout=remaining)
+        if message is not None and message['data'] == prompt_hash:
+            return True
+    return False
@@ -0,0 +1,44 @@
+"""
+Video frame sampling for the Sora Director application.
+Decodes sparse frame indices from an OpenCV capture by reading forward
+rather than seeking, which would re-decode a whole GOP per frame.
+"""
+from typing import Iterable, Iterator, Tuple
+
+import cv2
+import numpy as np
+
+# Read forward through gaps up to this many frames instead of seeking; a seek
+# re-decodes from the previous keyframe (x264's default GOP is 250)
+KEYFRAME_SEEK_GAP = 250
+
+
+def iter_video_frames(cap: cv2.VideoCapture, frame_indices: Iterable[int]) -> Iterator[Tuple[int, np.ndarray]]:
+    """
+    Decode the frames at the given indices from an open capture.
+    
+    Short gaps are skipped with grab() (demux only, no pixel conversion) and
+    only gaps longer than KEYFRAME_SEEK_GAP, or backwards jumps, seek. Frames
+    are yielded as they are decoded, so callers can process one while the
+    next is read.
+    
+    Args:
+        cap: cv2.VideoCapture positioned at the first frame
+        frame_indices: Frame numbers to read, ideally in ascending order
+    
+    Yields:
+        (index, BGR frame) pairs; indices that could not be read are left out
+    """
+    position = 0
+    for idx in frame_indices:
+        if idx < position or idx - position > KEYFRAME_SEEK_GAP:
+            cap.set(cv2.CAP_PROP_POS_FRAMES, idx)
+            position = idx
+        while position < idx and cap.grab():
+            position += 1
+        if position < idx or not cap.grab():
+            break
+        position += 1
+        ret, frame = cap.retrieve()
+        if ret:
+            yield idx, frame
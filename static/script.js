@@ -208,21 +208,9 @@ async function checkHealth() {
 }
 
 /**
- * Generate SHA256 hash of prompt (matches backend implementation)
+ * Follow generation progress over Server-Sent Events
  */
-async function generatePromptHash(prompt) {
-    const encoder = new TextEncoder();
-    const data = encoder.encode(prompt);
-    const hashBuffer = await crypto.subtle.digest('SHA-256', data);
-    const hashArray = Array.from(new Uint8Array(hashBuffer));
-    const hashHex = hashArray.map(b => b.toString(16).padStart(2, '0')).join('');
-    return hashHex.substring(0, 16);  // First 16 characters, like backend
-}
-
-/**
- * Poll for generation progress
- */
-async function pollProgress(promptHash, interval = 2000) {
+function watchProgress(promptHash) {
     const progressContainer = document.getElementById('progressContainer');
     const progressBar = document.getElementById('progressBar');
     const progressPercent = document.getElementById('progressPercent');
@@ -232,66 +220,82 @@ async function pollProgress(promptHash, interval = 2000) {
     // Show progress container
     progressContainer.style.display = 'block';
     
-    let pollCount = 0;
-    const maxPolls = 300; // Max 10 minutes (300 * 2 seconds)
+    // Update the progress UI; returns true once the generation has finished
+    const showProgress = (progress) => {
+        progressBar.style.width = `${progress.progress}%`;
+        progressPercent.textContent = `${progress.progress}%`;
+        progressStatus.textContent = progress.status === 'queued' ? 'Queued' : 
+                                    progress.status === 'in_progress' ? 'Generating' :
+                                    progress.status === 'completed' ? 'Complete' : 
+                                    progress.status === 'failed' ? 'Failed' : progress.status;
+        progressMessage.textContent = progress.message || '';
+        
+        // Update color based on status
+        if (progress.status === 'completed') {
+            progressBar.style.background = 'linear-gradient(90deg, #4ade80, #22c55e)';
+        } else if (progress.status === 'failed') {
+            progressBar.style.background = 'linear-gradient(90deg, #f87171, #ef4444)';
+        }
+        
+        if (progress.status !== 'completed' && progress.status !== 'failed') {
+            return false;
+        }
+        
+        // Hide progress bar after a delay
+        setTimeout(() => {
+            progressContainer.style.display = 'none';
+            progressBar.style.width = '0%';
+            progressPercent.textContent = '0%';
+            progressStatus.textContent = 'Queued...';
+            progressMessage.textContent = '';
+            progressBar.style.background = 'linear-gradient(90deg, #fafafa, #d4d4d8)';
+        }, 2000);
+        return true;
+    };
     
     return new Promise((resolve, reject) => {
-        const pollInterval = setInterval(async () => {
+        const events = new EventSource(`/api/progress/stream/${promptHash}`);
+        
+        // Poll /api/progress when the stream cannot be used; the generation
+        // keeps running on the server either way
+        const pollProgress = async () => {
             try {
-                pollCount++;
-                
-                if (pollCount > maxPolls) {
-                    clearInterval(pollInterval);
-                    reject(new Error('Progress polling timed out'));
-                    return;
-                }
-                
                 const response = await fetch(`/api/progress/${promptHash}`);
-                
-                if (!response.ok) {
-                    clearInterval(pollInterval);
-                    reject(new Error('Failed to fetch progress'));
+                if (response.status === 404) {
+                    reject(new Error('Generation not found'));
                     return;
                 }
-                
-                const progress = await response.json();
-                
-                // Update UI
-                progressBar.style.width = `${progress.progress}%`;
-                progressPercent.textContent = `${progress.progress}%`;
-                progressStatus.textContent = progress.status === 'queued' ? 'Queued' : 
-                                            progress.status === 'in_progress' ? 'Generating' :
-                                            progress.status === 'completed' ? 'Complete' : 
-                                            progress.status === 'failed' ? 'Failed' : progress.status;
-                progressMessage.textContent = progress.message || '';
-                
-                // Update color based on status
-                if (progress.status === 'completed') {
-                    progressBar.style.background = 'linear-gradient(90deg, #4ade80, #22c55e)';
-                } else if (progress.status === 'failed') {
-                    progressBar.style.background = 'linear-gradient(90deg, #f87171, #ef4444)';
-                }
-                
-                // Stop polling if completed or failed
-                if (progress.status === 'completed' || progress.status === 'failed') {
-                    clearInterval(pollInterval);
-                    // Hide progress bar after a delay
-                    setTimeout(() => {
-                        progressContainer.style.display = 'none';
-                        progressBar.style.width = '0%';
-                        progressPercent.textContent = '0%';
-                        progressStatus.textContent = 'Queued...';
-                        progressMessage.textContent = '';
-                        progressBar.style.background = 'linear-gradient(90deg, #fafafa, #d4d4d8)';
-                    }, 2000);
-                    resolve(progress);
+                if (response.ok) {
+                    const progress = await response.json();
+                    if (showProgress(progress)) {
+                        resolve(progress);
+                        return;
+                    }
                 }
             } catch (error) {
-                console.error('Progress polling error:', error);
-                clearInterval(pollInterval);
-                reject(error);
+                console.error('Progress poll failed:', error);
+            }
+            setTimeout(pollProgress, 2000);
+        };
+        
+        events.onmessage = (event) => {
+            const progress = JSON.parse(event.data);
+            
+            // Stop listening if completed or failed
+            if (showProgress(progress)) {
+                events.close();
+                resolve(progress);
+            }
+        };
+        
+        events.onerror = () => {
+            // While CONNECTING the browser retries by itself (the server ends
+            // each stream after a while); once CLOSED it has given up
+            if (events.readyState === EventSource.CLOSED) {
+                console.warn('Progress stream unavailable, polling instead');
+                pollProgress();
             }
-        }, interval);
+        };
     });
 }
 
@@ -318,15 +322,7 @@ async function handleGenerate() {
     // Show results container to display progress
     showSection('resultsContainer');
     
-    // Generate prompt hash (same algorithm as backend)
-    const promptHash = await generatePromptHash(prompt);
-    
     try {
-        // Start progress polling in parallel with generation
-        pollProgress(promptHash).catch(err => {
-            console.warn('Progress polling ended:', err.message);
-        });
-        
         const response = await fetch('/api/generate', {
             method: 'POST',
             headers: {
@@ -343,7 +339,16 @@ async function handleGenerate() {
             throw new Error(`HTTP error! status: ${response.status}`);
         }
         
-        const data = await response.json();
+        let data = await response.json();
+        
+        // Generation runs in the background; follow its progress until it finishes
+        if (response.status === 202) {
+            const progress = await watchProgress(data.prompt_hash);
+            if (progress.status === 'failed') {
+                throw new Error(progress.message);
+            }
+            data = progress.result;
+        }
         
         if (data.success) {
             currentPromptHash = data.prompt_hash;
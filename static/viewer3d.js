@@ -157,7 +157,11 @@ class Viewer3D {
             
             const response = await fetch('/api/generate_scene_depth', {
                 method: 'POST',
-                headers: { 'Content-Type': 'application/json' },
+                headers: {
+                    'Content-Type': 'application/json',
+                    // Raw float32 positions + uint8 colors, no base64 or JSON parsing
+                    'Accept': 'application/octet-stream'
+                },
                 body: JSON.stringify({ video_path: videoPath, max_points: 15000 })
             });
             
@@ -165,11 +169,14 @@ class Viewer3D {
                 throw new Error(`HTTP ${response.status}`);
             }
             
-            const data = await response.json();
+            const count = parseInt(response.headers.get('X-Point-Count'), 10);
+            const buffer = await response.arrayBuffer();
             
-            if (data.success && data.points && data.points.length > 0) {
-                console.log(`Received ${data.points.length} points from depth estimation`);
-                this.loadPointCloud(data.points);
+            if (count > 0) {
+                console.log(`Received ${count} points from depth estimation`);
+                const positions = new Float32Array(buffer, 0, count * 3);
+                const colors = new Uint8Array(buffer, count * 12, count * 3);
+                this.loadPointCloud(positions, colors);
             } else {
                 throw new Error('No points received from depth estimation');
             }
@@ -181,7 +188,7 @@ class Viewer3D {
         }
     }
     
-    loadPointCloud(points) {
+    loadPointCloud(positions, colors) {
         // Clear existing worlds
         if (this.world) {
             this.scene.remove(this.world);
@@ -199,28 +206,12 @@ class Viewer3D {
         this.updateFunction = null;
         this.generatedSceneFunction = null;
         
-        console.log(`Loading point cloud with ${points.length} points...`);
+        console.log(`Loading point cloud with ${positions.length / 3} points...`);
         
-        // Create geometry for point cloud
+        // Create geometry for point cloud: float32 xyz and normalized uint8 rgb per point
         const geometry = new THREE.BufferGeometry();
-        
-        // Create arrays for positions and colors
-        const positions = new Float32Array(points.length * 3);
-        const colors = new Float32Array(points.length * 3);
-        
-        for (let i = 0; i < points.length; i++) {
-            const point = points[i];
-            positions[i * 3] = point.x;
-            positions[i * 3 + 1] = point.y;
-            positions[i * 3 + 2] = point.z;
-            
-            colors[i * 3] = point.r / 255;
-            colors[i * 3 + 1] = point.g / 255;
-            colors[i * 3 + 2] = point.b / 255;
-        }
-        
         geometry.setAttribute('position', new THREE.BufferAttribute(positions, 3));
-        geometry.setAttribute('color', new THREE.BufferAttribute(colors, 3));
+        geometry.setAttribute('color', new THREE.BufferAttribute(colors, 3, true));
         
         // Create point cloud material
         const material = new THREE.PointsMaterial({
@@ -0,0 +1,289 @@
+"""Tests for the Agent Module."""
+import pytest
+
+import numpy as np
+
+from src.agent_module import AgentModule, AgentTrajectory, SPLAT_DTYPE
+
+
+@pytest.fixture
+def agent_module():
+    """Create an AgentModule instance in mock mode."""
+    return AgentModule(use_mock=True)
+
+
+@pytest.fixture
+def splat_asset_file(tmp_path):
+    """Create a small binary .splat asset: a floor plus a block in one corner."""
+    floor = [(x, 0.0, z) for x in range(-4, 5) for z in range(-4, 5)]
+    block = [(3.0 + dx, y, 3.0 + dz) for dx in (0, 0.4) for dz in (0, 0.4) for y in (0.5, 1.0)]
+    
+    records = np.zeros(len(floor) + len(block), dtype=SPLAT_DTYPE)
+    records['position'] = floor + block
+    asset_path = tmp_path / "world.splat"
+    asset_path.write_bytes(records.tobytes())
+    return asset_path
+
+
+@pytest.fixture
+def real_agent_module():
+    """Create an AgentModule instance in production mode."""
+    return AgentModule(use_mock=False)
+
+
+def test_test_world_returns_expected_keys(agent_module, mock_asset_file):
+    """Test that test_world returns all expected result fields."""
+    results = agent_module.test_world(mock_asset_file)
+    
+    for key in ['asset_path', 'test_scenarios', 'violations', 'metrics', 'test_duration', 'success']:
+        assert key in results
+    assert results['success'] == (len(results['violations']) == 0)
+
+
+def test_test_world_with_missing_asset(agent_module, tmp_path):
+    """Test that a missing asset raises FileNotFoundError."""
+    with pytest.raises(FileNotFoundError):
+        agent_module.test_world(tmp_path / 'missing.splat')
+
+
+def test_mock_results_are_deterministic(agent_module, mock_asset_file):
+    """Test that mock results for the same asset are reproducible."""
+    results1 = agent_module.test_world(mock_asset_file)
+    results2 = agent_module.test_world(mock_asset_file)
+    
+    assert results1 == results2
+
+
+def test_real_scenarios_collect_violations(real_agent_module, splat_asset_file, monkeypatch):
+    """Test that scenarios run concurrently and a failing scenario does not drop the others."""
+    def failing_handler(self, world, agent):
+        raise RuntimeError("simulation diverged")
+    
+    def reporting_handler(scenario):
+        return lambda self, world, agent: [{'type': 'PhysicsViolation', 'scenario': scenario}]
+    
+    handlers = AgentModule._SCENARIO_HANDLERS
+    monkeypatch.setitem(handlers, 'collision_detection', reporting_handler('collision_detection'))
+    monkeypatch.setitem(handlers, 'physics_stability', failing_handler)
+    monkeypatch.setitem(handlers, 'boundary_integrity', reporting_handler('boundary_integrity'))
+    AgentModule._scenario_plan.cache_clear()
+    
+    try:
+        results = real_agent_module.test_world(
+            splat_asset_file,
+            ['collision_detection', 'physics_stability', 'unknown_scenario', 'boundary_integrity']
+        )
+    finally:
+        AgentModule._scenario_plan.cache_clear()
+    
+    scenarios = [v['scenario'] for v in results['violations']]
+    assert scenarios == ['collision_detection', 'boundary_integrity']
+
+
+def test_simulation_kernels_detect_violations(real_agent_module):
+    """Test that the kernel-backed scenarios flag collisions and boundary exits."""
+    from types import SimpleNamespace
+    
+    # A tiny scene with a wall across its middle: every agent leaves or hits something
+    world = SimpleNamespace(
+        bounds=[-1.0, 0.0, -1.0, 1.0, 2.0, 1.0],
+        aabbs=[[-1.0, 0.0, -0.05, 1.0, 2.0, 0.05]],
+    )
+    
+    collisions = real_agent_module._run_scenario(world, None, 'collision_detection')
+    exits = real_agent_module._run_scenario(world, None, 'boundary_integrity')
+    unstable = real_agent_module._run_scenario(world, None, 'physics_stability')
+    
+    assert collisions and all(v['type'] == 'PhysicsViolation' for v in collisions)
+    assert len(exits) == AgentModule.NUM_AGENTS
+    assert all(v['type'] == 'BoundaryViolation' for v in exits)
+    assert unstable == []
+
+
+def test_load_world_from_splat(real_agent_module, splat_asset_file):
+    """Test that a .splat asset is parsed into bounds and solid voxels above the floor."""
+    world = real_agent_module._load_world(splat_asset_file)
+    
+    assert world.bounds.tolist() == [-4.0, 0.0, -4.0, 4.0, 1.0, 4.0]
+    assert len(world.aabbs) > 0
+    assert (world.aabbs[:, 1] > 0.0).all()
+    world.close()
+
+
+def test_load_world_from_binary_ply(real_agent_module, tmp_path):
+    """Test that binary little-endian PLY vertices are parsed."""
+    vertices = np.array([(0.0, 0.0, 0.0, 255), (1.0, 2.0, 3.0, 0)],
+                        dtype=[('x', '<f4'), ('y', '<f4'), ('z', '<f4'), ('red', 'u1')])
+    header = (
+        "ply\nformat binary_little_endian 1.0\nelement vertex 2\n"
+        "property float x\nproperty float y\nproperty float z\nproperty uchar red\nend_header\n"
+    )
+    asset_path = tmp_path / "world.ply"
+    asset_path.write_bytes(header.encode('ascii') + vertices.tobytes())
+    
+    world = real_agent_module._load_world(asset_path)
+    
+    assert world.bounds.tolist() == [0.0, 0.0, 0.0, 1.0, 2.0, 3.0]
+    world.close()
+
+
+def test_agent_trajectory_grows_and_materializes():
+    """Test that AgentTrajectory grows past its capacity and converts to violations."""
+    trajectory = AgentTrajectory(capacity=2)
+    trajectory.extend(np.array([[1.0, 0.0, 2.0], [3.0, 0.0, 4.0]]), 0.5)
+    trajectory.extend(np.array([[5.0, 1.0, 6.0]]), 1.0)
+    
+    violations = trajectory.to_violations('BoundaryViolation', 'Left the scene.', 'medium')
+    
+    assert len(trajectory) == 3
+    assert [v['location']['x'] for v in violations] == [1.0, 3.0, 5.0]
+    assert [v['timestamp'] for v in violations] == [0.5, 0.5, 1.0]
+    assert violations[2]['location'] == {'x': 5.0, 'y': 1.0, 'z': 6.0}
+
+
+def test_test_world_caches_by_content(real_agent_module, splat_asset_file, tmp_path, monkeypatch):
+    """Test that real-mode assets with identical content reuse cached results without sharing them."""
+    calls = []
+    original = AgentModule._test_world_real
+    
+    def counting_real(self, asset_path, test_scenarios, agent=None, digest=None):
+        calls.append(asset_path)
+        return original(self, asset_path, test_scenarios, digest=digest)
+    
+    monkeypatch.setattr(AgentModule, '_test_world_real', counting_real)
+    
+    copy_path = tmp_path / 'copy.splat'
+    copy_path.write_bytes(splat_asset_file.read_bytes())
+    
+    results1 = real_agent_module.test_world(splat_asset_file, ['boundary_integrity'])
+    results1['violations'].clear()
+    results2 = real_agent_module.test_world(copy_path, ['boundary_integrity'])
+    
+    assert calls == [splat_asset_file]
+    assert results2['asset_path'] == str(copy_path)
+    assert len(results2['violations']) == AgentModule.NUM_AGENTS
+
+
+def test_mock_results_do_not_depend_on_call_order(agent_module, tmp_path):
+    """Test that mock assets with identical content each get their own path-seeded results."""
+    first = tmp_path / 'first.splat'
+    second = tmp_path / 'second.splat'
+    first.write_text('same content')
+    second.write_text('same content')
+    
+    agent_module.test_world(first)
+    results = agent_module.test_world(second)
+    
+    assert results == AgentModule(use_mock=True).test_world(second)
+
+
+def test_test_worlds_matches_single_calls(tmp_path):
+    """Test that the batch API returns the same results as individual calls."""
+    asset_paths = []
+    for i in range(3):
+        asset_path = tmp_path / f"asset_{i}.splat"
+        asset_path.write_text(f"mock asset {i}")
+        asset_paths.append(asset_path)
+    
+    batch_results = AgentModule(use_mock=True).test_worlds(asset_paths)
+    single_results = [AgentModule(use_mock=True).test_world(p) for p in asset_paths]
+    
+    assert batch_results == single_results
+
+
+def test_test_worlds_initializes_agent_once(real_agent_module, splat_asset_file, tmp_path, monkeypatch):
+    """Test that the real batch path shares one agent across assets."""
+    calls = []
+    monkeypatch.setattr(AgentModule, '_initialize_agent', lambda self: calls.append(1))
+    
+    other = tmp_path / "other.splat"
+    other.write_bytes(splat_asset_file.read_bytes() + splat_asset_file.read_bytes())
+    
+    results = real_agent_module.test_worlds([splat_asset_file, other], ['boundary_integrity'])
+    
+    assert len(results) == 2
+    assert calls == [1]
+
+
+def test_worlds_are_pooled_and_evicted(real_agent_module, splat_asset_file, tmp_path, monkeypatch):
+    """Test that loaded worlds are reused and the least recently used one is closed."""
+    monkeypatch.setattr(AgentModule, 'WORLD_POOL_SIZE', 1)
+    
+    world, _ = real_agent_module._acquire_world(splat_asset_file)
+    again, _ = real_agent_module._acquire_world(splat_asset_file)
+    assert again is world
+    
+    other = tmp_path / "other.splat"
+    other.write_bytes(splat_asset_file.read_bytes() * 2)
+    real_agent_module._acquire_world(other)
+    
+    assert world.points is None
+
+
+def test_hung_scenario_times_out(real_agent_module, splat_asset_file, monkeypatch):
+    """Test that a hung scenario is abandoned after the timeout instead of delaying the results."""
+    import dataclasses
+    import threading
+    import time
+    
+    from src import agent_module
+    
+    release = threading.Event()
+    
+    def hung_handler(self, world, agent):
+        release.wait(timeout=10)
+        return [{'type': 'PhysicsViolation', 'scenario': 'hung'}]
+    
+    handlers = AgentModule._SCENARIO_HANDLERS
+    monkeypatch.setitem(handlers, 'physics_stability', hung_handler)
+    monkeypatch.setitem(handlers, 'boundary_integrity', lambda self, world, agent: [{'scenario': 'boundary_integrity'}])
+    monkeypatch.setattr(agent_module, 'Config', dataclasses.replace(agent_module.Config, AGENT_SCENARIO_TIMEOUT=0.3))
+    AgentModule._scenario_plan.cache_clear()
+    
+    try:
+        start = time.monotonic()
+        results = real_agent_module.test_world(splat_asset_file, ['physics_stability', 'boundary_integrity'])
+        elapsed = time.monotonic() - start
+    finally:
+        release.set()
+        AgentModule._scenario_plan.cache_clear()
+    
+    assert elapsed < 2.0
+    assert [v['scenario'] for v in results['violations']] == ['boundary_integrity']
+
+
+def test_scenarios_share_a_bounded_number_of_slots(real_agent_module, splat_asset_file, monkeypatch):
+    """Test that scenario handlers never run more at once than the slot limit."""
+    import threading
+    import time
+    
+    from src import agent_module
+    
+    running = []
+    peak = []
+    lock = threading.Lock()
+    
+    def tracked_handler(self, world, agent):
+        with lock:
+            running.append(1)
+            peak.append(len(running))
+        time.sleep(0.05)
+        with lock:
+            running.pop()
+        return [{'scenario': 'tracked'}]
+    
+    handlers = AgentModule._SCENARIO_HANDLERS
+    for scenario in ('collision_detection', 'physics_stability', 'boundary_integrity'):
+        monkeypatch.setitem(handlers, scenario, tracked_handler)
+    monkeypatch.setattr(agent_module, '_scenario_slots', threading.BoundedSemaphore(1))
+    AgentModule._scenario_plan.cache_clear()
+    
+    try:
+        results = real_agent_module.test_world(
+            splat_asset_file, ['collision_detection', 'physics_stability', 'boundary_integrity']
+        )
+    finally:
+        AgentModule._scenario_plan.cache_clear()
+    
+    assert max(peak) == 1
+    assert len(results['violations']) == 3
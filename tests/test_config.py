@@ -0,0 +1,27 @@
+"""Tests for the configuration module."""
+import os
+
+from src.config import _load_env
+
+
+def test_load_env_parses_dotenv_syntax(tmp_path, monkeypatch):
+    """Test that .env parsing handles comments, quotes and existing variables."""
+    env_file = tmp_path / '.env'
+    env_file.write_text(
+        "# Comment line\n"
+        "SD_TEST_MOCK=true  # Set to false to use real APIs\n"
+        "export SD_TEST_QUOTED=\"keeps # inside quotes\"\n"
+        "SD_TEST_EXISTING=from_file\n"
+    )
+    for key in ('SD_TEST_MOCK', 'SD_TEST_QUOTED'):
+        monkeypatch.delenv(key, raising=False)
+    monkeypatch.setenv('SD_TEST_EXISTING', 'from_env')
+    
+    _load_env(env_file)
+    
+    assert os.environ['SD_TEST_MOCK'] == 'true'
+    assert os.environ['SD_TEST_QUOTED'] == 'keeps # inside quotes'
+    assert os.environ['SD_TEST_EXISTING'] == 'from_env'
+    
+    for key in ('SD_TEST_MOCK', 'SD_TEST_QUOTED'):
+        monkeypatch.delenv(key)
@@ -0,0 +1,102 @@
+"""Tests for the file management utilities."""
+import io
+import os
+import tempfile
+
+from src.utils import file_manager
+from src.utils.file_manager import content_digest, prefetch_file, save_upload_stream
+
+
+def test_save_upload_stream_deduplicates(tmp_path):
+    """Test that uploads are written in full and identical content is stored once."""
+    content = b'video bytes' * 1000
+    
+    first = save_upload_stream(io.BytesIO(content), tmp_path, 'first.mp4')
+    second = save_upload_stream(io.BytesIO(content), tmp_path, 'second.mp4')
+    other = save_upload_stream(io.BytesIO(b'other video'), tmp_path, 'second.mp4')
+    
+    assert first.read_bytes() == content
+    assert second == first
+    assert other == tmp_path / 'second.mp4'
+    assert other.read_bytes() == b'other video'
+    assert not list(tmp_path.glob('*.part'))
+
+
+def test_prefetch_file_skips_large_and_missing_files(tmp_path):
+    """Test that only files within the size limit are prefetched."""
+    video = tmp_path / 'take_1.mp4'
+    video.write_bytes(b'x' * 1024)
+    
+    if hasattr(os, 'posix_fadvise'):
+        assert prefetch_file(video) is True
+    assert prefetch_file(video, max_bytes=100) is False
+    assert prefetch_file(tmp_path / 'missing.mp4') is False
+
+
+def test_save_upload_stream_links_spooled_file(tmp_path):
+    """Test that an upload already spooled into the upload directory is linked, not copied."""
+    content = b'spooled video' * 1000
+    
+    with tempfile.NamedTemporaryFile('wb+', dir=tmp_path, suffix='.part') as spooled:
+        spooled.write(content)
+        stored = save_upload_stream(spooled, tmp_path, 'video.mp4')
+        
+        assert os.path.samefile(stored, spooled.name)
+    
+    assert stored.read_bytes() == content
+    assert [p.name for p in tmp_path.iterdir() if not p.name.startswith('.')] == ['video.mp4']
+
+
+def test_content_digest_follows_content(tmp_path):
+    """Test that digests match for identical content and change when a file is rewritten."""
+    first = tmp_path / 'first.mp4'
+    second = tmp_path / 'second.mp4'
+    first.write_bytes(b'video bytes')
+    second.write_bytes(b'video bytes')
+    
+    digest = content_digest(first)
+    assert content_digest(second) == digest
+    
+    first.write_bytes(b'other video bytes')
+    assert content_digest(first) != digest
+
+
+def test_cleanup_old_generations_removes_only_old_directories(tmp_path, monkeypatch):
+    """Test that stale generation and reconstruction directories are removed, recent ones kept."""
+    from types import SimpleNamespace
+    
+    generations = tmp_path / 'generations'
+    reconstructions = tmp_path / 'reconstructions'
+    old_take = generations / 'old' / 'take_1.mp4'
+    old_take.parent.mkdir(parents=True)
+    old_take.write_bytes(b'video')
+    (generations / 'new').mkdir()
+    (reconstructions / 'old').mkdir(parents=True)
+    (generations / 'stray.json').write_text('{}')
+    
+    for old_dir in (generations / 'old', reconstructions / 'old'):
+        os.utime(old_dir, (0, 0))
+    monkeypatch.setattr(file_manager, 'Config', SimpleNamespace(
+        GENERATIONS_DIR=generations, RECONSTRUCTIONS_DIR=reconstructions
+    ))
+    
+    assert file_manager.cleanup_old_generations(days=7) == 2
+    assert sorted(p.name for p in generations.iterdir()) == ['new', 'stray.json']
+    assert list(reconstructions.iterdir()) == []
+
+
+def test_list_generations_orders_takes_numerically(tmp_path, monkeypatch):
+    """Test that takes are listed by take number with derived videos after their take."""
+    from types import SimpleNamespace
+    
+    gen_dir = tmp_path / 'abc123'
+    gen_dir.mkdir()
+    for name in ['take_10.mp4', 'take_2.mp4', 'take_1_extended.mp4', 'take_1.mp4', 'metadata.txt']:
+        (gen_dir / name).write_bytes(b'')
+    monkeypatch.setattr(file_manager, 'Config', SimpleNamespace(GENERATIONS_DIR=tmp_path))
+    
+    names = [p.name for p in file_manager.list_generations('abc123')]
+    
+    assert names == ['take_1.mp4', 'take_1_extended.mp4', 'take_2.mp4', 'take_10.mp4']
+    assert file_manager.list_generations('abc123', limit=3) == [gen_dir / name for name in names[:3]]
+    assert file_manager.list_generations('missing') == []
@@ -0,0 +1,122 @@
+"""Tests for the generation result cache."""
+import json
+import threading
+
+from src.utils.generation_cache import GenerationCache
+
+
+def make_response(prompt_hash, prompt):
+    """Build a minimal /api/generate response."""
+    return {
+        'prompt_hash': prompt_hash,
+        'prompt': prompt,
+        'takes': [{'take_id': 1, 'video_url': f'/data/generations/{prompt_hash}/take_1.mp4'}],
+        'mode': 'REAL',
+        'success': True
+    }
+
+
+def test_cache_round_trip(tmp_path):
+    """Test that stored generations are found and also written as JSON files."""
+    cache = GenerationCache(tmp_path / 'cache.db', tmp_path / 'cache')
+    
+    assert cache.get('abc') is None
+    cache.put(make_response('abc', 'A robot walks'))
+    
+    assert cache.get('abc')['prompt'] == 'A robot walks'
+    assert (tmp_path / 'cache' / 'abc.json').exists()
+    assert [p['hash'] for p in cache.list_prompts()] == ['abc']
+
+
+def test_cache_imports_seed_files(tmp_path):
+    """Test that JSON responses already on disk (e.g. committed demos) are served."""
+    seed_dir = tmp_path / 'cache'
+    seed_dir.mkdir()
+    (seed_dir / 'demo.json').write_text(json.dumps(make_response('demo', 'A catapult')))
+    (seed_dir / 'broken.json').write_text('{not json')
+    
+    cache = GenerationCache(tmp_path / 'cache.db', seed_dir)
+    
+    assert cache.get('demo')['prompt'] == 'A catapult'
+    assert [p['prompt'] for p in cache.list_prompts()] == ['A catapult']
+
+
+def test_list_prompts_sees_writes_from_other_connections(tmp_path):
+    """Test that the memoized listing is refreshed after writes from any thread."""
+    cache = GenerationCache(tmp_path / 'cache.db', tmp_path / 'cache')
+    cache.put(make_response('abc', 'A robot walks'))
+    
+    first = cache.list_prompts()
+    assert cache.list_prompts() is first
+    
+    # A separate cache object stands in for another worker process
+    other = GenerationCache(tmp_path / 'cache.db', tmp_path / 'other')
+    writer = threading.Thread(target=other.put, args=(make_response('def', 'A ball bounces'),))
+    writer.start()
+    writer.join()
+    
+    assert [p['hash'] for p in cache.list_prompts()] == ['def', 'abc']
+
+
+def test_list_prompts_limit_returns_most_recent(tmp_path):
+    """Test that a limited listing keeps only the newest prompts."""
+    cache = GenerationCache(tmp_path / 'cache.db', tmp_path / 'cache')
+    for prompt_hash in ('old', 'mid', 'new'):
+        cache.put(make_response(prompt_hash, f'Prompt {prompt_hash}'))
+    
+    assert [p['hash'] for p in cache.list_prompts(2)] == ['new', 'mid']
+    assert len(cache.list_prompts()) == 3
+
+
+def test_put_evicts_oldest_generations_over_budget(tmp_path):
+    """Test that the oldest generations and their videos are deleted to stay within budget."""
+    generations_dir = tmp_path / 'generations'
+    cache = GenerationCache(tmp_path / 'cache.db', tmp_path / 'cache', generations_dir, max_bytes=25_000)
+    
+    for prompt_hash in ('old', 'mid', 'new'):
+        (generations_dir / prompt_hash).mkdir(parents=True)
+        (generations_dir / prompt_hash / 'take_1.mp4').write_bytes(b'x' * 10_000)
+        cache.put(make_response(prompt_hash, f'Prompt {prompt_hash}'))
+    
+    assert cache.get('old') is None
+    assert not (generations_dir / 'old').exists()
+    assert not (tmp_path / 'cache' / 'old.json').exists()
+    assert [p['hash'] for p in cache.list_prompts()] == ['new', 'mid']
+
+
+def test_eviction_spares_seeded_generations(tmp_path):
+    """Test that generations imported from seed files are neither charged nor evicted."""
+    seed_dir = tmp_path / 'cache'
+    generations_dir = tmp_path / 'generations'
+    seed_dir.mkdir()
+    (seed_dir / 'demo.json').write_text(json.dumps(make_response('demo', 'A catapult')))
+    (generations_dir / 'demo').mkdir(parents=True)
+    (generations_dir / 'demo' / 'take_1.mp4').write_bytes(b'x' * 50_000)
+    
+    cache = GenerationCache(tmp_path / 'cache.db', seed_dir, generations_dir, max_bytes=25_000)
+    for prompt_hash in ('old', 'new'):
+        (generations_dir / prompt_hash).mkdir()
+        (generations_dir / prompt_hash / 'take_1.mp4').write_bytes(b'x' * 10_000)
+        cache.put(make_response(prompt_hash, f'Prompt {prompt_hash}'))
+    # Storing a demo again keeps it exempt
+    cache.put(make_response('demo', 'A catapult'))
+    
+    assert cache.get('demo') is not None
+    assert (seed_dir / 'demo.json').exists()
+    assert (generations_dir / 'demo' / 'take_1.mp4').exists()
+    assert cache.get('old') is not None and cache.get('new') is not None
+
+
+def test_budget_uses_sizes_recorded_at_put(tmp_path, monkeypatch):
+    """Test that enforcing the budget does not rescan cached generation directories."""
+    from src.utils import generation_cache
+    
+    scanned = []
+    real_size = generation_cache.get_directory_size
+    monkeypatch.setattr(generation_cache, 'get_directory_size', lambda path: scanned.append(path.name) or real_size(path))
+    
+    cache = GenerationCache(tmp_path / 'cache.db', tmp_path / 'cache', tmp_path / 'generations', max_bytes=1 << 30)
+    for prompt_hash in ('a', 'b', 'c'):
+        cache.put(make_response(prompt_hash, f'Prompt {prompt_hash}'))
+    
+    assert scanned == ['a', 'b', 'c']
@@ -0,0 +1,96 @@
+"""Tests for generation progress tracking."""
+from collections import OrderedDict
+
+import orjson
+
+from src.utils import progress_tracker
+from src.utils.progress_tracker import (
+    set_generation_progress,
+    get_generation_progress,
+    get_generation_progress_json
+)
+
+
+def test_progress_round_trip():
+    """Test that recorded progress is returned, including the final result."""
+    set_generation_progress('round_trip', 'in_progress', 10, 'Starting...')
+    assert get_generation_progress('round_trip') == {
+        'status': 'in_progress', 'progress': 10, 'message': 'Starting...'
+    }
+    
+    set_generation_progress('round_trip', 'completed', 100, 'Done', result={'takes': []})
+    assert get_generation_progress('round_trip')['result'] == {'takes': []}
+    assert get_generation_progress('unknown') is None
+    assert orjson.loads(get_generation_progress_json('round_trip')) == get_generation_progress('round_trip')
+    assert get_generation_progress_json('unknown') is None
+
+
+def test_progress_expires(monkeypatch):
+    """Test that progress older than the TTL is dropped."""
+    monkeypatch.setattr(progress_tracker, '_local_progress', OrderedDict())
+    monkeypatch.setattr(progress_tracker, 'PROGRESS_TTL_SECONDS', 0)
+    set_generation_progress('expiring', 'queued', 0, 'Queued')
+    
+    assert get_generation_progress('expiring') is None
+    
+    set_generation_progress('other', 'queued', 0, 'Queued')
+    assert 'expiring' not in progress_tracker._local_progress
+
+
+def test_watch_progress_until_completed():
+    """Test that watching yields each update and stops once the generation completes."""
+    import threading
+    
+    set_generation_progress('watched', 'queued', 0, 'Queued')
+    
+    def finish():
+        set_generation_progress('watched', 'in_progress', 50, 'Halfway')
+        set_generation_progress('watched', 'completed', 100, 'Done')
+    
+    timer = threading.Timer(0.05, finish)
+    timer.start()
+    states = [state for state in progress_tracker.watch_generation_progress('watched', timeout=5) if state]
+    timer.join()
+    
+    assert states[0]['status'] == 'queued'
+    assert states[-1]['status'] == 'completed'
+
+
+def test_progress_is_bounded(monkeypatch):
+    """Test that the least recently updated generations are dropped past the size limit."""
+    monkeypatch.setattr(progress_tracker, '_local_progress', OrderedDict())
+    monkeypatch.setattr(progress_tracker, 'PROGRESS_MAX_ENTRIES', 2)
+    
+    set_generation_progress('first', 'queued', 0, 'Queued')
+    set_generation_progress('second', 'queued', 0, 'Queued')
+    set_generation_progress('first', 'in_progress', 10, 'Starting...')
+    set_generation_progress('third', 'queued', 0, 'Queued')
+    
+    assert list(progress_tracker._local_progress) == ['first', 'third']
+
+
+def test_redis_progress_serializes_numpy_results(monkeypatch):
+    """Test that results holding NumPy values are stored in Redis like they are in memory."""
+    import numpy as np
+    
+    class StubRedis:
+        def __init__(self):
+            self.values = {}
+            self.published = []
+        
+        def set(self, key, value, ex=None):
+            self.values[key] = value
+        
+        def get(self, key):
+            return self.values.get(key)
+        
+        def publish(self, channel, message):
+            self.published.append((channel, message))
+    
+    client = StubRedis()
+    monkeypatch.setattr(progress_tracker, 'get_redis_client', lambda: client)
+    
+    set_generation_progress('redis_numpy', 'completed', 100, 'Done', result={'overall': np.float64(0.75)})
+    
+    assert get_generation_progress('redis_numpy')['result'] == {'overall': 0.75}
+    assert client.published == [(progress_tracker.PROGRESS_CHANNEL, 'redis_numpy')]
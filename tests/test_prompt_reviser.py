@@ -27,6 +27,26 @@ def test_revise_prompt_with_physics_violation(prompt_reviser):
     assert "boundaries" in revised.lower() or "physical" in revised.lower()
 
 
+def test_revise_prompt_skips_present_and_repeated_rules(prompt_reviser):
+    """Test that each rule is added once and not when the prompt already has it."""
+    original = "A robot walks With Clear Solid Boundaries."
+    violations = [
+        {'type': 'PhysicsViolation', 'severity': 'high'},
+        {'type': 'BoundaryViolation', 'severity': 'low'},
+        {'type': 'BoundaryViolation', 'severity': 'high'},
+    ]
+    
+    revised = prompt_reviser.revise_prompt(original, violations)
+    
+    assert revised == "A robot walks With Clear Solid Boundaries, in a contained environment, cinematic shot"
+
+
+def test_apply_improvements_strips_trailing_punctuation(prompt_reviser):
+    """Test that trailing punctuation and whitespace are dropped before appending."""
+    assert prompt_reviser._apply_improvements("A robot walks. ;\n", ["with smooth motion"]) == \
+        "A robot walks, with smooth motion"
+
+
 def test_revise_prompt_with_multiple_violations(prompt_reviser):
     """Test revision with multiple violation types."""
     original = "A robot walks"
@@ -65,6 +85,17 @@ def test_analyze_prompt_quality(prompt_reviser):
     assert analysis['has_action'] is True
 
 
+def test_extractors_match_terms_case_insensitively(prompt_reviser):
+    """Test that the term extractors find vocabulary anywhere in the prompt."""
+    prompt = "Cinematic shot of a drone EXPLORING an abandoned Building"
+    
+    assert prompt_reviser._extract_action(prompt) == 'explor'
+    assert prompt_reviser._extract_environment(prompt) == 'building'
+    assert prompt_reviser._extract_style(prompt) == 'cinematic'
+    assert prompt_reviser._extract_style("A plain description") == ""
+    assert prompt_reviser.analyze_prompt_quality(prompt)['has_quality_terms'] is True
+
+
 def test_analyze_incomplete_prompt(prompt_reviser):
     """Test analysis of an incomplete prompt."""
     prompt = "Something"
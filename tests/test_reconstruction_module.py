@@ -0,0 +1,35 @@
+"""Tests for the Reconstruction Module."""
+import numpy as np
+
+from src.reconstruction_module import PLY_VERTEX_DTYPE, create_ply, write_ply
+
+
+def test_write_ply_round_trips(tmp_path):
+    """Test that binary PLY output has a matching header and the raw vertex records."""
+    vertices = np.zeros(3, dtype=PLY_VERTEX_DTYPE)
+    vertices['x'] = [1.0, 2.0, 3.0]
+    vertices['red'] = [10, 20, 30]
+    ply_path = tmp_path / "cloud.ply"
+    
+    write_ply(ply_path, vertices)
+    
+    header, body = ply_path.read_bytes().split(b'end_header\n', 1)
+    assert b'format binary_little_endian 1.0\nelement vertex 3\n' in header
+    assert b'property float x\n' in header and b'property uchar blue\n' in header
+    assert np.array_equal(np.frombuffer(body, dtype=PLY_VERTEX_DTYPE), vertices)
+
+
+def test_create_ply_maps_vertices_onto_file(tmp_path):
+    """Test that vertices filled through the memory map land in a readable PLY file."""
+    ply_path = tmp_path / "cloud.ply"
+    
+    vertices = create_ply(ply_path, 4)
+    vertices['y'] = [0.5, 1.5, 2.5, 3.5]
+    vertices['green'] = 7
+    vertices.flush()
+    
+    header, body = ply_path.read_bytes().split(b'end_header\n', 1)
+    assert b'element vertex 4\n' in header
+    written = np.frombuffer(body, dtype=PLY_VERTEX_DTYPE)
+    assert written['y'].tolist() == [0.5, 1.5, 2.5, 3.5]
+    assert (written['green'] == 7).all()
@@ -1,8 +1,8 @@
 """Tests for the Scoring Module."""
 import pytest
 from pathlib import Path
-import tempfile
 
+from src import scoring_module
 from src.scoring_module import VideoScorer, score_video
 
 
@@ -12,15 +12,12 @@ def video_scorer():
     return VideoScorer(use_mock=True)
 
 
-@pytest.fixture
-def temp_video():
-    """Create a temporary video file for testing."""
-    temp_file = tempfile.NamedTemporaryFile(suffix='.mp4', delete=False)
-    temp_path = Path(temp_file.name)
-    temp_file.write(b'mock video data')
-    temp_file.close()
-    yield temp_path
-    temp_path.unlink()
+@pytest.fixture(scope='session')
+def temp_video(tmp_path_factory):
+    """Create a temporary video file for testing, shared by the session."""
+    temp_path = tmp_path_factory.mktemp('videos') / 'video.mp4'
+    temp_path.write_bytes(b'mock video data')
+    return temp_path
 
 
 def test_score_video_returns_all_metrics(video_scorer, temp_video):
@@ -80,3 +77,72 @@ def test_convenience_function(temp_video):
     assert 'overall' in scores
     assert 0.0 <= scores['overall'] <= 1.0
 
+
+
+def test_score_videos_in_worker_processes(tmp_path):
+    """Test that production batch scoring returns one result per video, in order."""
+    video_paths = [tmp_path / 'missing.mp4']
+    for i in range(2):
+        video_path = tmp_path / f'take_{i}.mp4'
+        video_path.write_bytes(b'not a real video')
+        video_paths.append(video_path)
+    
+    scores_list = VideoScorer(use_mock=False).score_videos(video_paths)
+    
+    assert len(scores_list) == 3
+    assert all(scores['overall'] == 0.5 for scores in scores_list)
+
+
+@pytest.fixture
+def static_video(tmp_path, monkeypatch):
+    """Write a short video of identical frames, with the score cache under tmp_path."""
+    import cv2
+    import numpy as np
+    
+    monkeypatch.setattr(scoring_module, 'SCORE_CACHE_DIR', tmp_path / 'score_cache')
+    
+    video_path = tmp_path / 'static.avi'
+    writer = cv2.VideoWriter(str(video_path), cv2.VideoWriter_fourcc(*'MJPG'), 24, (64, 48))
+    ramp = np.tile(np.linspace(0, 255, 64, dtype=np.uint8), (48, 1))
+    frame = np.dstack([ramp, ramp[:, ::-1], np.full_like(ramp, 128)])
+    for _ in range(12):
+        writer.write(frame)
+    writer.release()
+    return video_path
+
+
+def test_real_scoring_of_static_video(static_video):
+    """Test that a video of identical frames scores full identity persistence and no motion."""
+    video_path = static_video
+    
+    scores = VideoScorer(use_mock=False).score_video(video_path)
+    
+    assert scores['identity_persistence'] == pytest.approx(1.0)
+    assert 0.5 <= scores['visual_quality'] <= 1.0
+    for metric in ('path_realism', 'motion_smoothness', 'temporal_coherence'):
+        assert scores[metric] == pytest.approx(1.0)
+    # Plain floats, not NumPy scalars, so results serialize without NumPy support
+    assert all(type(score) is float for score in scores.values())
+
+
+def test_real_scores_are_cached_by_content(static_video, tmp_path, monkeypatch):
+    """Test that a copy of an already scored video is served from the score cache."""
+    scorer = VideoScorer(use_mock=False)
+    first = scorer.score_video(static_video)
+    
+    copy_path = tmp_path / 'copy.avi'
+    copy_path.write_bytes(static_video.read_bytes())
+    monkeypatch.setattr(VideoScorer, '_frame_histogram', lambda self, frame: pytest.fail('video was decoded'))
+    
+    assert scorer.score_video(copy_path) == first
+
+
+def test_frame_histogram_correlates_with_itself(video_scorer):
+    """Test that a noisy frame's histogram has a correlation of 1 with itself."""
+    import cv2
+    import numpy as np
+    
+    frame = np.random.default_rng(0).integers(0, 256, (48, 64, 3), dtype=np.uint8)
+    histogram = video_scorer._frame_histogram(frame)
+    
+    assert cv2.compareHist(histogram, histogram, cv2.HISTCMP_CORREL) == pytest.approx(1.0)
@@ -1,18 +1,16 @@
 """Tests for the Sora Handler module."""
+import contextlib
 import pytest
-from pathlib import Path
-import tempfile
-import shutil
+import threading
 
+from src import sora_handler as sora_handler_module
 from src.sora_handler import SoraHandler
 
 
 @pytest.fixture
-def temp_dir():
+def temp_dir(tmp_path):
     """Create a temporary directory for test outputs."""
-    temp_path = Path(tempfile.mkdtemp())
-    yield temp_path
-    shutil.rmtree(temp_path)
+    return tmp_path
 
 
 @pytest.fixture
@@ -26,13 +24,14 @@ def test_generate_n_takes_creates_files(sora_handler, temp_dir):
     prompt = "A robot walks down a hallway"
     num_takes = 3
     
-    video_paths = sora_handler.generate_n_takes(
+    video_paths, mode = sora_handler.generate_n_takes(
         prompt=prompt,
         num_takes=num_takes,
         output_dir=temp_dir
     )
     
     assert len(video_paths) == num_takes
+    assert mode == 'MOCK'
     
     for i, video_path in enumerate(video_paths, start=1):
         assert video_path.exists()
@@ -42,7 +41,7 @@ def test_generate_n_takes_creates_files(sora_handler, temp_dir):
 
 def test_generate_n_takes_with_custom_params(sora_handler, temp_dir):
     """Test generation with custom parameters."""
-    video_paths = sora_handler.generate_n_takes(
+    video_paths, mode = sora_handler.generate_n_takes(
         prompt="Test scene",
         num_takes=2,
         output_dir=temp_dir,
@@ -59,7 +58,7 @@ def test_generate_n_takes_with_custom_params(sora_handler, temp_dir):
 def test_extend_video(sora_handler, temp_dir):
     """Test video extension functionality."""
     # First create a video
-    video_paths = sora_handler.generate_n_takes(
+    video_paths, mode = sora_handler.generate_n_takes(
         prompt="Test",
         num_takes=1,
         output_dir=temp_dir
@@ -81,7 +80,7 @@ def test_extend_video(sora_handler, temp_dir):
 def test_remix_video(sora_handler, temp_dir):
     """Test video remix functionality."""
     # Create a video
-    video_paths = sora_handler.generate_n_takes(
+    video_paths, mode = sora_handler.generate_n_takes(
         prompt="Test",
         num_takes=1,
         output_dir=temp_dir
@@ -98,3 +97,107 @@ def test_remix_video(sora_handler, temp_dir):
     assert remixed_video.exists()
     assert "_remix" in remixed_video.stem
 
+
+
+def test_generate_n_takes_reports_mock_fallback(temp_dir, monkeypatch):
+    """Test that a take falling back to mock marks the whole generation as mock."""
+    handler = SoraHandler(use_mock=True)
+    handler.use_mock = False
+    results = iter([True, False])
+    monkeypatch.setattr(handler, '_generate_real_video', lambda *args, **kwargs: next(results))
+    
+    video_paths, mode = handler.generate_n_takes(prompt="Test", num_takes=2, output_dir=temp_dir)
+    
+    assert len(video_paths) == 2
+    assert mode == 'MOCK'
+
+
+def test_real_takes_run_concurrently_with_monotonic_progress(temp_dir, monkeypatch):
+    """Test that real takes run in parallel and report the slowest take's progress as in progress."""
+    reports = []
+    statuses = set()
+    
+    def record(status, progress, message):
+        statuses.add(status)
+        reports.append(progress)
+    
+    handler = SoraHandler(use_mock=True, progress_callback=record)
+    handler.use_mock = False
+    barrier = threading.Barrier(3, timeout=5)
+    
+    def fake_real_video(prompt, output_path, duration, resolution, fps, seed=None, progress_callback=None):
+        barrier.wait()  # Only passes if all three takes are in flight at once
+        progress_callback(status='in_progress', progress=50, message='')
+        barrier.wait()
+        progress_callback(status='completed', progress=100, message='')
+        return True
+    
+    monkeypatch.setattr(handler, '_generate_real_video', fake_real_video)
+    
+    video_paths, mode = handler.generate_n_takes(prompt="Test", num_takes=3, output_dir=temp_dir)
+    
+    assert [p.name for p in video_paths] == ['take_1.mp4', 'take_2.mp4', 'take_3.mp4']
+    assert mode == 'REAL'
+    assert reports == sorted(reports)
+    assert reports[:3] == [0, 0, 50] and reports[-1] == 100
+    assert statuses == {'in_progress'}
+
+
+def test_real_video_polls_with_backoff(temp_dir, monkeypatch):
+    """Test that job status polls back off up to the cap and the video is streamed to disk."""
+    from types import SimpleNamespace
+    
+    statuses = iter(['in_progress'] * 6 + ['completed'])
+    
+    class FakeVideos:
+        def create(self, **kwargs):
+            return SimpleNamespace(id='video_1', status='queued')
+        
+        def retrieve(self, video_id):
+            return SimpleNamespace(id=video_id, status=next(statuses), progress=0)
+    
+    @contextlib.contextmanager
+    def streamed_download(video_id, variant):
+        yield SimpleNamespace(headers={'content-length': '10'}, iter_bytes=lambda chunk_size: [b'vid', b'eo'])
+    
+    delays = []
+    
+    @contextlib.contextmanager
+    def recording_watch(video_id):
+        yield SimpleNamespace(wait=delays.append, clear=lambda: None)
+    
+    videos = FakeVideos()
+    videos.with_streaming_response = SimpleNamespace(download_content=streamed_download)
+    monkeypatch.setattr(sora_handler_module, 'get_openai_client', lambda api_key: SimpleNamespace(videos=videos))
+    monkeypatch.setattr(sora_handler_module, '_watch_video_job', recording_watch)
+    monkeypatch.setattr(sora_handler_module, 'POLL_MAX_DELAY_SECONDS', 10)
+    
+    handler = SoraHandler(use_mock=True)
+    is_real = handler._generate_real_video("Test", temp_dir / "take_1.mp4", 8, '1280x720', 24)
+    
+    assert is_real
+    assert (temp_dir / "take_1.mp4").read_bytes() == b'video'
+    assert delays == [1, 2, 4, 8, 10, 10, 10]
+
+
+def test_notify_video_job_wakes_poller():
+    """Test that a webhook notification only reaches jobs being polled."""
+    assert not sora_handler_module.notify_video_job('video_1')
+    
+    with sora_handler_module._watch_video_job('video_1') as job_event:
+        assert sora_handler_module.notify_video_job('video_1')
+        assert job_event.is_set()
+    
+    assert not sora_handler_module.notify_video_job('video_1')
+
+
+def test_mock_generation_skips_simulated_latency(sora_handler, temp_dir, monkeypatch):
+    """Test that mock takes do not sleep unless MOCK_SIMULATE_LATENCY is enabled."""
+    def fail_sleep(seconds):
+        raise AssertionError("mock generation slept")
+    
+    monkeypatch.setattr(sora_handler_module.time, 'sleep', fail_sleep)
+    
+    video_paths, mode = sora_handler.generate_n_takes(prompt="Test", num_takes=2, output_dir=temp_dir)
+    
+    assert all(path.exists() for path in video_paths)
@@ -0,0 +1,96 @@
+"""Tests for the background generation tasks."""
+import threading
+
+import pytest
+
+from src import tasks
+from src.utils.progress_tracker import get_generation_progress, set_generation_progress
+
+
+@pytest.fixture
+def generation_dir(tmp_path, monkeypatch):
+    """Send generated takes and metadata to a temporary directory."""
+    monkeypatch.setattr(tasks, 'create_generation_directory', lambda prompt_hash: tmp_path)
+    monkeypatch.setattr(tasks, 'save_prompt_metadata', lambda *args, **kwargs: None)
+    return tmp_path
+
+
+def test_submit_generation_publishes_result(generation_dir):
+    """Test that a queued mock generation completes with ranked takes."""
+    future = tasks.submit_generation('task-test', 'A robot walks', 2, use_real_api=False)
+    future.result(timeout=30)
+    
+    progress = get_generation_progress('task-test')
+    assert progress['status'] == 'completed'
+    assert progress['result']['mode'] == 'MOCK'
+    assert sorted(take['rank'] for take in progress['result']['takes']) == [1, 2]
+
+
+def test_submit_generation_dedupes_in_flight_prompts(generation_dir, monkeypatch):
+    """Test that concurrent submissions of one prompt share a single run."""
+    release = threading.Event()
+    calls = []
+    
+    def blocking_run(*args):
+        calls.append(args)
+        release.wait(timeout=30)
+    
+    monkeypatch.setattr(tasks, 'run_generation', blocking_run)
+    
+    first = tasks.submit_generation('task-dedupe', 'A robot walks', 1, use_real_api=False)
+    second = tasks.submit_generation('task-dedupe', 'A robot walks', 1, use_real_api=False)
+    release.set()
+    first.result(timeout=30)
+    
+    assert second is first
+    assert len(calls) == 1
+    
+    # Once finished, the prompt can be generated again
+    third = tasks.submit_generation('task-dedupe', 'A robot walks', 1, use_real_api=False)
+    third.result(timeout=30)
+    assert third is not first
+    assert len(calls) == 2
+
+
+def test_run_generation_marks_failure(generation_dir, monkeypatch):
+    """Test that an exception in the pipeline is reported as a failed generation."""
+    def broken_directory(prompt_hash):
+        raise OSError("disk full")
+    
+    monkeypatch.setattr(tasks, 'create_generation_directory', broken_directory)
+    
+    tasks.run_generation('task-fail', 'A robot walks', 1, use_real_api=False)
+    
+    progress = get_generation_progress('task-fail')
+    assert progress['status'] == 'failed'
+    assert 'disk full' in progress['message']
+
+
+def test_take_status_does_not_end_generation(generation_dir, monkeypatch):
+    """Test that a take reporting completed does not publish a terminal state without a result."""
+    published = []
+    
+    def recording_progress(prompt_hash, status, progress, message, result=None):
+        published.append((status, result))
+        set_generation_progress(prompt_hash, status, progress, message, result=result)
+    
+    class FakeHandler:
+        def __init__(self, use_mock, progress_callback):
+            self.progress_callback = progress_callback
+        
+        def generate_n_takes(self, prompt, num_takes, output_dir):
+            self.progress_callback(status='in_progress', progress=50, message='Generating video: 50%')
+            self.progress_callback(status='completed', progress=100, message='Generating video: 100%')
+            video_path = output_dir / 'take_1.mp4'
+            video_path.write_bytes(b'video')
+            return [video_path], 'REAL'
+    
+    monkeypatch.setattr(tasks, 'set_generation_progress', recording_progress)
+    monkeypatch.setattr(tasks, 'SoraHandler', FakeHandler)
+    monkeypatch.setattr(tasks, 'get_generation_cache', lambda: type('Cache', (), {'put': lambda self, response: None})())
+    
+    tasks.run_generation('task-take-status', 'A robot walks', 1, use_real_api=True)
+    
+    terminal = [(status, result) for status, result in published if status in ('completed', 'failed')]
+    assert terminal[0][0] == 'completed'
+    assert terminal[0][1]['takes'][0]['take_id'] == 1
@@ -0,0 +1,22 @@
+"""Tests for the video frame sampling utilities."""
+import cv2
+import numpy as np
+
+from src.utils.video import iter_video_frames
+
+
+def test_iter_video_frames_reads_requested_frames(tmp_path):
+    """Test that sampled frames come back in order, including after a backwards jump."""
+    video_path = tmp_path / 'numbered.avi'
+    writer = cv2.VideoWriter(str(video_path), cv2.VideoWriter_fourcc(*'MJPG'), 24, (32, 32))
+    for i in range(20):
+        writer.write(np.full((32, 32, 3), i * 10, dtype=np.uint8))
+    writer.release()
+    
+    cap = cv2.VideoCapture(str(video_path))
+    frames = list(iter_video_frames(cap, [0, 3, 11, 2, 19, 25]))
+    cap.release()
+    
+    assert [idx for idx, _ in frames] == [0, 3, 11, 2, 19]
+    for idx, frame in frames:
+        assert abs(int(frame.mean()) - idx * 10) <= 2